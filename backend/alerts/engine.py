@@ -1,6 +1,6 @@
 """Alert engine for QuantStream RTQAE."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set
 from datetime import datetime
 from threading import Lock
 
@@ -32,6 +32,11 @@ class AlertEngine:
             self.rules.extend(rules)
             logger.info(f"Added {len(rules)} alert rules")
 
+    def get_required_metrics(self, symbol: str) -> Set[str]:
+        """Metrics ('stats', 'zscore') that the enabled rules for symbol evaluate."""
+        with self.lock:
+            return {m for r in self.rules if r.symbol == symbol and r.enabled for m in r.metrics}
+
     def evaluate_stats(self, stats: Dict[str, Any]):
         if not stats or 'symbol' not in stats:
             return
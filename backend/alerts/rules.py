@@ -17,6 +17,10 @@ class AlertType(str, Enum):
 
 
 class AlertRule:
+    # Analytics a rule reads: 'stats' (price stats dict) and/or 'zscore'.
+    # Only these are computed eagerly for the rule's symbol.
+    metrics = ('stats', 'zscore')
+
     def __init__(self, rule_type: AlertType, symbol: str, **params):
         self.rule_type = rule_type
         self.symbol = symbol
@@ -28,6 +32,8 @@ class AlertRule:
 
 
 class ZScoreThresholdRule(AlertRule):
+    metrics = ('zscore',)
+
     def __init__(self, symbol: str, threshold: float = 3.0):
         super().__init__(AlertType.ZSCORE_THRESHOLD, symbol, threshold=threshold)
 
@@ -50,6 +56,8 @@ class ZScoreThresholdRule(AlertRule):
 
 
 class PriceChangeRule(AlertRule):
+    metrics = ('stats',)
+
     def __init__(self, symbol: str, threshold_pct: float):
         super().__init__(AlertType.PRICE_CHANGE, symbol, threshold_pct=threshold_pct)
 
@@ -72,6 +80,8 @@ class PriceChangeRule(AlertRule):
 
 
 class VolumeSpikeRule(AlertRule):
+    metrics = ('stats',)
+
     def __init__(self, symbol: str, multiplier: float = 3.0):
         super().__init__(AlertType.VOLUME_SPIKE, symbol, multiplier=multiplier)
 
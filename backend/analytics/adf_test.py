@@ -1,86 +1,307 @@
 """ADF test for stationarity in QuantStream RTQAE."""
 
-from typing import Dict, Any, Optional
-from collections import deque
+from typing import Dict, Any, List, Optional, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import Lock
+import multiprocessing
+import time
 import numpy as np
 from statsmodels.tsa.stattools import adfuller
+from statsmodels.tsa.adfvalues import mackinnoncrit, mackinnonp
+from scipy.stats import norm
 
+from analytics.window_store import WindowStore
 from core.logger import get_logger
 from core.config import get_config
 
 logger = get_logger("analytics.adf_test")
 
+MIN_OBSERVATIONS = 30
+
+
+def run_adf(name: str, series: np.ndarray, max_lag: int) -> Optional[Dict[str, Any]]:
+    """adfuller with AIC lag selection; module-level so pool workers can run it."""
+    try:
+        result = adfuller(series, maxlag=max_lag, autolag='AIC')
+
+        adf_stat = result[0]
+        p_value = result[1]
+        used_lag = result[2]
+        nobs = result[3]
+        critical_values = result[4]
+
+        is_stationary = bool(p_value < 0.05)  # Convert numpy.bool to Python bool
+
+        return {
+            'series_name': name,
+            'adf_statistic': float(adf_stat),
+            'p_value': float(p_value),
+            'is_stationary': is_stationary,
+            'used_lag': int(used_lag),
+            'num_observations': int(nobs),
+            'critical_1pct': float(critical_values['1%']),
+            'critical_5pct': float(critical_values['5%']),
+            'critical_10pct': float(critical_values['10%']),
+            'sample_size': len(series)
+        }
+
+    except Exception as e:
+        logger.error(f"ADF test error for {name}: {e}")
+        return None
+
+
+# MacKinnon's response-surface tables are private to statsmodels
+# (requirements.txt pins the minor versions they were checked on).
+# mackinnon_pvalues() evaluates them over whole arrays, and compares
+# itself with the public mackinnonp() the first time each (regression, N)
+# is used. It uses mackinnonp() per element if the tables are gone or
+# disagree, which is correct but about 500x slower.
+try:
+    from statsmodels.tsa.adfvalues import _tau_maxs, _tau_mins, _tau_stars, _tau_smallps, _tau_largeps
+except ImportError:
+    _tau_maxs = None
+_TABLES_CHECKED: Dict[tuple, bool] = {}
+_CHECK_STATS = np.linspace(-25.0, 5.0, 61)
+
+
+def _table_pvalues(stats: np.ndarray, regression: str, N: int) -> np.ndarray:
+    small = np.polyval(np.asarray(_tau_smallps[regression][N - 1])[::-1], stats)
+    large = np.polyval(np.asarray(_tau_largeps[regression][N - 1])[::-1], stats)
+    p_values = norm.cdf(np.where(stats <= _tau_stars[regression][N - 1], small, large))
+    p_values = np.where(stats > _tau_maxs[regression][N - 1], 1.0, p_values)
+    return np.where(stats < _tau_mins[regression][N - 1], 0.0, p_values)
+
+
+def _tables_usable(regression: str, N: int) -> bool:
+    key = (regression, N)
+    usable = _TABLES_CHECKED.get(key)
+    if usable is None:
+        usable = False
+        if _tau_maxs is not None:
+            try:
+                expected = [mackinnonp(stat, regression=regression, N=N) for stat in _CHECK_STATS]
+                usable = bool(np.allclose(_table_pvalues(_CHECK_STATS, regression, N), expected, rtol=1e-9, atol=1e-12))
+            except (KeyError, IndexError, TypeError, ValueError):
+                pass
+        if not usable:
+            logger.warning(f"statsmodels MacKinnon tables unusable for regression={regression!r}, N={N}; "
+                           f"falling back to mackinnonp() per statistic")
+        _TABLES_CHECKED[key] = usable
+    return usable
+
+
+def mackinnon_pvalues(stats: np.ndarray, regression: str = 'c', N: int = 1) -> np.ndarray:
+    """statsmodels' mackinnonp() over an array of test statistics (NaN stays NaN)."""
+    stats = np.asarray(stats, dtype=np.float64)
+    if _tables_usable(regression, N):
+        return _table_pvalues(stats, regression, N)
+    out = np.full(stats.shape, np.nan)
+    finite = np.isfinite(stats)
+    out[finite] = [mackinnonp(stat, regression=regression, N=N) for stat in stats[finite]]
+    return out
+
+
+def batch_adf(series: np.ndarray, lag: int, regression: str = 'c') -> Dict[str, Any]:
+    """Fixed-lag ADF test of every row of a (series x observations) array in one pass.
+
+    Fits the same regression as adfuller(row, maxlag=lag, autolag=None,
+    regression=regression): the first difference on the lagged level,
+    lag lagged differences and the deterministic terms ('n', 'c' or
+    'ct'). All rows are fitted together with batched normal equations.
+    The constant and trend are partialled out by demeaning/detrending,
+    which leaves the level coefficient and its t-statistic unchanged and
+    keeps the small systems well conditioned.
+
+    Returns arrays 'adf_statistic' and 'p_value' (MacKinnon, one entry
+    per row), plus 'num_observations' and 'critical_values' (1%, 5%,
+    10%), which depend only on the shape and are shared by all rows.
+    Constant rows get NaN statistics.
+    """
+    series = np.asarray(series, dtype=np.float64)
+    if series.ndim == 1:
+        series = series[None, :]
+    m, length = series.shape
+    diff = np.diff(series, axis=1)
+    nobs = length - 1 - lag
+    trend_terms = {'n': 0, 'c': 1, 'ct': 2}[regression]
+    k = lag + 1
+    if nobs - k - trend_terms < 1:
+        raise ValueError(f"{length} observations are too few for an ADF test with {lag} lags")
+
+    y = diff[:, lag:]
+    columns = [series[:, lag:length - 1]] + [diff[:, lag - j:lag - j + nobs] for j in range(1, lag + 1)]
+    X = np.stack(columns, axis=2)
+    if trend_terms:
+        y = y - y.mean(axis=1, keepdims=True)
+        X = X - X.mean(axis=1, keepdims=True)
+        if trend_terms == 2:
+            t = np.arange(nobs, dtype=np.float64)
+            t = (t - t.mean()) / np.sqrt(np.sum((t - t.mean()) ** 2))
+            y = y - (y @ t)[:, None] * t
+            X = X - (t @ X)[:, None, :] * t[None, :, None]
+
+    Xt = X.transpose(0, 2, 1)
+    XtX = Xt @ X
+    Xty = (Xt @ y[:, :, None])[:, :, 0]
+    try:
+        inv = np.linalg.inv(XtX)
+    except np.linalg.LinAlgError:
+        inv = np.linalg.pinv(XtX)
+    params = (inv @ Xty[:, :, None])[:, :, 0]
+    resid = y - (X @ params[:, :, None])[:, :, 0]
+    sigma2 = np.sum(resid * resid, axis=1) / (nobs - k - trend_terms)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stat = params[:, 0] / np.sqrt(sigma2 * inv[:, 0, 0])
+    stat = np.where(np.isfinite(stat), stat, np.nan)
+
+    return {
+        'adf_statistic': stat,
+        'p_value': mackinnon_pvalues(stat, regression),
+        'num_observations': nobs,
+        'critical_values': mackinnoncrit(N=1, regression=regression, nobs=nobs)
+    }
+
 
 class ADFTest:
-    """Augmented Dickey-Fuller test for stationarity."""
+    """Augmented Dickey-Fuller test for stationarity.
+
+    Fits run off the request path. Each series has a version counter (the
+    number of observations ever appended to it) and a cached result
+    tagged with the version it was computed at. A read returns the cached
+    result right away, with its age, and schedules a refit on the process
+    pool (analytics.adf_workers processes) once analytics.adf_refresh_observations
+    new observations have arrived since. Only one fit per series is in
+    flight at a time. Until the first fit completes, reads return a
+    placeholder with pending set and no statistics.
+
+    With adf_workers = 0 fits run inline on the calling thread.
+    """
 
-    def __init__(self, window_size: int = None):
+    def __init__(self, window_size: int = None, store: WindowStore = None, workers: int = None):
         config = get_config().analytics
         self.window_size = window_size or config.default_window_size
         self.max_lag = config.adf_max_lag
-        self.price_windows: Dict[str, deque] = {}
-        self.spread_windows: Dict[str, deque] = {}
-        logger.info(f"ADF test initialized (window: {self.window_size})")
+        self.batch_lag = config.adf_batch_lag
+        self.refresh_observations = config.adf_refresh_observations
+        self.workers = config.adf_workers if workers is None else workers
+        self.store = store or WindowStore(self.window_size)
 
-    def update_price(self, symbol: str, price: float):
-        if symbol not in self.price_windows:
-            self.price_windows[symbol] = deque(maxlen=self.window_size)
-        self.price_windows[symbol].append(price)
+        # name -> {'version', 'result', 'computed_at', 'pending'}
+        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.lock = Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        logger.info(f"ADF test initialized (window: {self.window_size}, workers: {self.workers})")
 
-    def update_spread(self, pair_name: str, spread_value: float):
-        if pair_name not in self.spread_windows:
-            self.spread_windows[pair_name] = deque(maxlen=self.window_size)
-        self.spread_windows[pair_name].append(spread_value)
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the server process is multithreaded
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
 
     def test_price_series(self, symbol: str) -> Optional[Dict[str, Any]]:
-        if symbol not in self.price_windows or len(self.price_windows[symbol]) < 30:
+        if self.store.count(symbol) < MIN_OBSERVATIONS:
             return None
 
-        prices = np.array(self.price_windows[symbol])
-        return self._run_adf_test(symbol, prices)
+        version = self.store.ring(symbol).total
+        return self._cached(symbol, version, lambda: self.store.snapshot(symbol)['price'])
 
-    def test_spread_series(self, pair_name: str) -> Optional[Dict[str, Any]]:
-        if pair_name not in self.spread_windows or len(self.spread_windows[pair_name]) < 30:
-            return None
+    def test_batch(self, names: Sequence[str], series: np.ndarray, lag: int = None) -> List[Dict[str, Any]]:
+        """Fixed-lag ADF results, in run_adf()'s format, for equal-length series (one per row)."""
+        lag = self.batch_lag if lag is None else lag
+        out = batch_adf(series, lag)
+        critical = out['critical_values']
+        return [
+            {
+                'series_name': name,
+                'adf_statistic': float(stat),
+                'p_value': float(p_value),
+                'is_stationary': bool(p_value < 0.05),
+                'used_lag': lag,
+                'num_observations': out['num_observations'],
+                'critical_1pct': float(critical[0]),
+                'critical_5pct': float(critical[1]),
+                'critical_10pct': float(critical[2]),
+                'sample_size': series.shape[1]
+            }
+            for name, stat, p_value in zip(names, out['adf_statistic'], out['p_value'])
+            if np.isfinite(stat)
+        ]
 
-        spreads = np.array(self.spread_windows[pair_name])
-        return self._run_adf_test(pair_name, spreads)
+    def screen_prices(self, symbols: Sequence[str] = None, lag: int = None) -> List[Dict[str, Any]]:
+        """Batch ADF screen of the price windows, over the newest observations all symbols share."""
+        symbols = [s for s in (symbols or self.store.symbols()) if self.store.count(s) >= MIN_OBSERVATIONS]
+        if not symbols:
+            return []
+        windows = [self.store.snapshot(s)['price'] for s in symbols]
+        n = min(len(w) for w in windows)
+        return self.test_batch(symbols, np.stack([w[len(w) - n:] for w in windows]), lag)
 
-    def _run_adf_test(self, name: str, series: np.ndarray) -> Dict[str, Any]:
-        try:
-            result = adfuller(series, maxlag=self.max_lag, autolag='AIC')
+    def _cached(self, name: str, version: int, read_series) -> Dict[str, Any]:
+        """Latest result for the series, scheduling a refit if it is missing or too far behind."""
+        with self.lock:
+            entry = self.cache.get(name)
+            if entry is None:
+                entry = self.cache[name] = {'version': None, 'result': None, 'computed_at': None, 'pending': False}
+            stale = entry['version'] is None or version - entry['version'] >= self.refresh_observations
+            submit = stale and not entry['pending']
+            if submit:
+                entry['pending'] = True
 
-            adf_stat = result[0]
-            p_value = result[1]
-            used_lag = result[2]
-            nobs = result[3]
-            critical_values = result[4]
+        if submit:
+            self._submit(name, entry, version, read_series())
 
-            is_stationary = bool(p_value < 0.05)  # Convert numpy.bool to Python bool
+        with self.lock:
+            result, computed_at, cached_version = entry['result'], entry['computed_at'], entry['version']
+            pending = entry['pending']
+        if result is None:
+            return {'series_name': name, 'pending': pending}
+        return {
+            **result,
+            'age_seconds': time.time() - computed_at,
+            'window_version': cached_version,
+            'observations_behind': version - cached_version,
+            'pending': pending
+        }
 
-            return {
-                'series_name': name,
-                'adf_statistic': float(adf_stat),
-                'p_value': float(p_value),
-                'is_stationary': is_stationary,
-                'used_lag': int(used_lag),
-                'num_observations': int(nobs),
-                'critical_1pct': float(critical_values['1%']),
-                'critical_5pct': float(critical_values['5%']),
-                'critical_10pct': float(critical_values['10%']),
-                'sample_size': len(series)
-            }
+    def _submit(self, name: str, entry: Dict[str, Any], version: int, series: np.ndarray):
+        def store(result: Optional[Dict[str, Any]]):
+            with self.lock:
+                entry['pending'] = False
+                # Dropped by clear() while running, or failed: keep what we had
+                if self.cache.get(name) is not entry or result is None:
+                    return
+                entry['version'] = version
+                entry['result'] = result
+                entry['computed_at'] = time.time()
 
-        except Exception as e:
-            logger.error(f"ADF test error for {name}: {e}")
-            return None
+        if self.workers <= 0:
+            store(run_adf(name, series, self.max_lag))
+            return
+
+        def done(future: Future):
+            try:
+                store(future.result())
+            except Exception as e:
+                logger.error(f"ADF worker error for {name}: {e}")
+                store(None)
+
+        try:
+            self.pool.submit(run_adf, name, series, self.max_lag).add_done_callback(done)
+        except RuntimeError as e:
+            # Pool shut down
+            logger.warning(f"ADF test for {name} not scheduled: {e}")
+            store(None)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
 
     def clear(self, symbol: str = None):
-        if symbol:
-            if symbol in self.price_windows:
-                del self.price_windows[symbol]
-            if symbol in self.spread_windows:
-                del self.spread_windows[symbol]
-        else:
-            self.price_windows.clear()
-            self.spread_windows.clear()
+        self.store.clear(symbol)
+        with self.lock:
+            if symbol:
+                self.cache.pop(symbol, None)
+            else:
+                self.cache.clear()
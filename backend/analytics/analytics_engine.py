@@ -1,14 +1,20 @@
 """Main analytics engine coordinator for QuantStream RTQAE."""
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from threading import Lock
+from contextlib import contextmanager
 
 from analytics.price_stats import PriceStatsCalculator
 from analytics.zscore import ZScoreCalculator
 from analytics.correlation import CorrelationCalculator
+from analytics.correlation_matrix import StreamingCorrelationMatrix
 from analytics.spread import SpreadCalculator
 from analytics.regression import RegressionCalculator
+from analytics.hedge_ratio import StreamingHedgeRatios
+from analytics.ewma import EWMAStatsCalculator, EWMACorrelationCalculator
 from analytics.adf_test import ADFTest
+from analytics.window_store import WindowStore
+from analytics.price_panel import PricePanel
 from storage.models import Tick
 from core.logger import get_logger
 from core.config import get_config
@@ -17,120 +23,373 @@ logger = get_logger("analytics.engine")
 
 
 class AnalyticsEngine:
-    """Main analytics engine coordinating all analytics modules."""
+    """Main analytics engine coordinating all analytics modules.
 
-    def __init__(self, window_size: Optional[int] = None):
+    Every update bumps the symbol's version. Stats and z-scores are
+    memoized together with the version they were computed at, so a memo
+    whose version is behind marks the symbol dirty. By default (eager) an
+    update recomputes both right away. With lazy=True (analytics.lazy_evaluation)
+    an update only appends to the window, and a metric is computed on its
+    first read after a change. Callers that need a metric on every tick,
+    such as alert rules, simply read it after the update.
+    """
+
+    def __init__(self, window_size: Optional[int] = None, lazy: Optional[bool] = None):
         config = get_config().analytics
         self.window_size = window_size or config.default_window_size
+        self.lazy = config.lazy_evaluation if lazy is None else lazy
 
-        self.price_stats = PriceStatsCalculator(self.window_size)
+        # One window per symbol, appended once per tick and read by every
+        # calculator; extra horizons (analytics.window_horizons) are read off
+        # the same ring through its prefix-sum columns, and so are time
+        # windows (analytics.time_windows_seconds), which size the ring to
+        # analytics.time_window_max_ticks
+        self.time_windows = sorted(set(config.time_windows_seconds))
+        horizons = list(config.window_horizons) + ([config.time_window_max_ticks] if self.time_windows else [])
+        self.windows = WindowStore(self.window_size, horizons, writer_lock=self._symbol_lock)
+        # Every symbol's last price on a common clock; pair analytics read it
+        # unless analytics.pair_alignment is 'ticks'
+        self.panel = PricePanel(self.window_size)
+        pair_panel = self.panel if config.pair_alignment == 'clock' else None
+        self.price_stats = PriceStatsCalculator(self.window_size, store=self.windows, time_windows=self.time_windows)
         self.zscore_calc = ZScoreCalculator(self.window_size)
-        self.correlation_calc = CorrelationCalculator(self.window_size)
-        self.spread_calc = SpreadCalculator(self.window_size)
-        self.regression_calc = RegressionCalculator(self.window_size)
-        self.adf_test = ADFTest(self.window_size)
+        self.correlation_calc = CorrelationCalculator(self.window_size, store=self.windows, panel=pair_panel)
+        self.correlation_matrix = StreamingCorrelationMatrix(self.panel) if config.streaming_correlation else None
+        self.spread_calc = SpreadCalculator(self.window_size, store=self.windows, panel=pair_panel)
+        self.regression_calc = RegressionCalculator(self.window_size, store=self.windows, panel=pair_panel)
+        self.adf_test = ADFTest(self.window_size, store=self.windows)
+        # Live RLS / Kalman hedge ratios, updated on every panel row for the tracked pairs
+        self.hedge_ratios = StreamingHedgeRatios(self.panel)
+        # Exponentially weighted stats: O(1) state per symbol / pair and half-life,
+        # updated on every tick (lazy or not) since they have no window to replay
+        self.ewma_stats = EWMAStatsCalculator()
+        self.ewma_correlation = EWMACorrelationCalculator(self.panel)
 
-        self.latest_stats: Dict[str, Dict[str, Any]] = {}
-        self.latest_zscores: Dict[str, Dict[str, Any]] = {}
+        # symbol -> update count; memos are (version, result)
+        self.versions: Dict[str, int] = {}
+        self.stats_memo: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self.zscore_memo: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        # (symbol, window) -> (version, stats) for the other horizons, computed on
+        # read; time windows are keyed (symbol, '<seconds>s'). Time only moves
+        # with the symbol's ticks, so the version still tells when to recompute.
+        self.horizon_memo: Dict[Tuple[str, Any], Tuple[int, Dict[str, Any]]] = {}
 
+        # self.lock only guards symbol registration and clear(); per-tick
+        # work is serialized per symbol so readers and other symbols never wait.
         self.lock = Lock()
-        logger.info(f"Analytics engine initialized (window size: {self.window_size})")
+        self.symbol_locks: Dict[str, Lock] = {}
+        logger.info(f"Analytics engine initialized (window size: {self.window_size}, lazy: {self.lazy})")
+
+    def _symbol_lock(self, symbol: str) -> Lock:
+        lock = self.symbol_locks.get(symbol)
+        if lock is None:
+            with self.lock:
+                lock = self.symbol_locks.setdefault(symbol, Lock())
+        return lock
+
+    @contextmanager
+    def _locked(self, *symbols: str):
+        """Hold the locks of several symbols, acquired in sorted order to avoid deadlocks."""
+        locks = [self._symbol_lock(s) for s in sorted(set(symbols))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
 
     def update(self, tick: Tick):
-        with self.lock:
-            symbol = tick.symbol
-            price = tick.price
+        with self._symbol_lock(tick.symbol):
+            self._update(tick)
 
-            stats = self.price_stats.update(tick)
-            self.latest_stats[symbol] = stats
+    def update_batch(self, ticks: List[Tick]) -> List[str]:
+        """Apply a batch of ticks taking each symbol's lock once; returns the symbols touched."""
+        by_symbol: Dict[str, List[Tick]] = {}
+        for tick in ticks:
+            by_symbol.setdefault(tick.symbol, []).append(tick)
+        for symbol, symbol_ticks in by_symbol.items():
+            with self._symbol_lock(symbol):
+                for tick in symbol_ticks:
+                    self._update(tick)
+        return list(by_symbol)
 
-            if stats:
-                zscore_result = self.zscore_calc.calculate_from_stats(stats)
-                self.latest_zscores[symbol] = zscore_result
+    def _update(self, tick: Tick):
+        symbol = tick.symbol
+        self.windows.append(symbol, tick.price, tick.size, tick.timestamp)
+        version = self.versions[symbol] = self.versions.get(symbol, 0) + 1
+        self.panel.update(symbol, tick.price, tick.timestamp)
+        self.ewma_stats.update(symbol, tick.price)
 
-            self.correlation_calc.update_price(symbol, price)
-            self.spread_calc.update_price(symbol, price)
-            self.regression_calc.update_price(symbol, price)
-            self.adf_test.update_price(symbol, price)
+        if self.lazy:
+            self.price_stats.push(tick)
+            return
 
-    def get_stats(self, symbol: str) -> Dict[str, Any]:
-        with self.lock:
-            return self.latest_stats.get(symbol, {})
+        # Published stats/z-score dicts are freshly built and never mutated
+        # afterwards, so readers can hand them out without locking.
+        stats = self.price_stats.on_append(tick)
+        self.stats_memo[symbol] = (version, stats)
+        self.zscore_memo[symbol] = (version, self.zscore_calc.calculate_from_stats(stats))
 
-    def get_zscore(self, symbol: str) -> Dict[str, Any]:
-        with self.lock:
-            return self.latest_zscores.get(symbol, {})
+    def _horizon(self, window: Optional[int]) -> Optional[int]:
+        """None for the default window, else the validated horizon."""
+        if window is None or window == self.window_size:
+            return None
+        if not 2 <= window <= self.windows.max_window:
+            raise ValueError(f"window must be between 2 and {self.windows.max_window} ticks")
+        return window
+
+    def _period(self, seconds: Optional[float], window: Optional[int]) -> Optional[float]:
+        """None without a time window, else the validated period."""
+        if seconds is None:
+            return None
+        if window is not None:
+            raise ValueError("pass either window or seconds, not both")
+        if seconds not in self.time_windows:
+            raise ValueError(f"seconds must be one of the configured time windows: {self.time_windows}")
+        return seconds
+
+    def get_horizons(self) -> List[int]:
+        return sorted([self.window_size] + self.windows.horizons)
+
+    def get_time_windows(self) -> List[float]:
+        return list(self.time_windows)
+
+    def get_stats(self, symbol: str, window: Optional[int] = None, seconds: Optional[float] = None) -> Dict[str, Any]:
+        seconds = self._period(seconds, window)
+        if seconds is not None:
+            return self._horizon_stats(symbol, seconds=seconds)
+        window = self._horizon(window)
+        if window is not None:
+            return self._horizon_stats(symbol, window)
+        memo = self.stats_memo.get(symbol)
+        if memo is not None and memo[0] == self.versions.get(symbol):
+            return memo[1]
+        if symbol not in self.versions:
+            return {}
+        with self._symbol_lock(symbol):
+            return self._fresh_stats(symbol)
+
+    def get_zscore(self, symbol: str, window: Optional[int] = None, seconds: Optional[float] = None) -> Dict[str, Any]:
+        seconds = self._period(seconds, window)
+        if seconds is not None:
+            if symbol not in self.versions:
+                return {}
+            with self._symbol_lock(symbol):
+                moments = self.price_stats.calculate_period(symbol, seconds, moments_only=True)
+                return self.zscore_calc.calculate_from_stats(moments)
+        window = self._horizon(window)
+        if window is not None:
+            if symbol not in self.versions:
+                return {}
+            with self._symbol_lock(symbol):
+                return self.zscore_calc.calculate_from_stats(self.price_stats.calculate_moments(symbol, window))
+        memo = self.zscore_memo.get(symbol)
+        if memo is not None and memo[0] == self.versions.get(symbol):
+            return memo[1]
+        if symbol not in self.versions:
+            return {}
+        with self._symbol_lock(symbol):
+            return self._fresh_zscore(symbol)
+
+    def _horizon_stats(self, symbol: str, window: Optional[int] = None, seconds: Optional[float] = None) -> Dict[str, Any]:
+        if symbol not in self.versions:
+            return {}
+        key = (symbol, window) if seconds is None else (symbol, f'{seconds:g}s')
+        with self._symbol_lock(symbol):
+            version = self.versions.get(symbol)
+            memo = self.horizon_memo.get(key)
+            if memo is None or memo[0] != version:
+                if seconds is None:
+                    stats = self.price_stats.calculate(symbol, window)
+                else:
+                    stats = self.price_stats.calculate_period(symbol, seconds)
+                memo = self.horizon_memo[key] = (version, stats)
+            return memo[1]
+
+    def _fresh_stats(self, symbol: str) -> Dict[str, Any]:
+        """Memoized stats for the symbol's current version; caller holds the symbol lock."""
+        version = self.versions.get(symbol)
+        if version is None:
+            return {}
+        memo = self.stats_memo.get(symbol)
+        if memo is None or memo[0] != version:
+            memo = self.stats_memo[symbol] = (version, self.price_stats.calculate(symbol))
+        return memo[1]
+
+    def _fresh_zscore(self, symbol: str) -> Dict[str, Any]:
+        version = self.versions.get(symbol)
+        if version is None:
+            return {}
+        memo = self.zscore_memo.get(symbol)
+        if memo is None or memo[0] != version:
+            # A z-score only needs price, mean and std; skip the full stats
+            # dict unless it is already fresh
+            stats = self.stats_memo.get(symbol)
+            if stats is not None and stats[0] == version:
+                moments = stats[1]
+            else:
+                moments = self.price_stats.calculate_moments(symbol)
+            memo = self.zscore_memo[symbol] = (version, self.zscore_calc.calculate_from_stats(moments))
+        return memo[1]
 
     def get_correlation(self, symbol1: str, symbol2: str, corr_type: str = 'pearson') -> Optional[Dict[str, Any]]:
-        with self.lock:
+        with self._locked(symbol1, symbol2):
             if corr_type == 'spearman':
                 return self.correlation_calc.calculate_spearman(symbol1, symbol2)
             return self.correlation_calc.calculate_pearson(symbol1, symbol2)
 
+    # The all-pairs readers take no symbol locks: the streaming matrix has
+    # its own lock, and the window-scanning fallback snapshots each window
+    # with a lock-free WindowStore copy before computing on it.
     def get_all_correlations(self, corr_type: str = 'pearson') -> List[Dict[str, Any]]:
-        with self.lock:
-            return self.correlation_calc.calculate_all_pairs(corr_type)
+        if self.correlation_matrix and corr_type != 'spearman':
+            return self.correlation_matrix.all_pairs()
+        return self.correlation_calc.calculate_all_pairs(corr_type)
 
     def get_correlation_matrix(self) -> Optional[Any]:
-        with self.lock:
-            return self.correlation_calc.get_correlation_matrix()
+        if self.correlation_matrix:
+            return self.correlation_matrix.get_matrix()
+        return self.correlation_calc.get_correlation_matrix()
+
+    def get_correlation_snapshot(self) -> Dict[str, Any]:
+        """Correlation matrix with its symbol labels and a version that changes only when the matrix does."""
+        if self.correlation_matrix:
+            snapshot = self.correlation_matrix.snapshot()
+            matrix = snapshot['matrix'] if len(snapshot['symbols']) >= 2 else None
+            return {'symbols': snapshot['symbols'], 'matrix': matrix, 'version': snapshot['version']}
+        symbols = self.correlation_calc.get_symbols()
+        return {'symbols': symbols, 'matrix': self.correlation_calc.get_correlation_matrix(), 'version': None}
 
     def get_spread(self, symbol1: str, symbol2: str, hedge_ratio: float = 1.0) -> Optional[Dict[str, Any]]:
-        with self.lock:
+        with self._locked(symbol1, symbol2):
             return self.spread_calc.calculate_spread(symbol1, symbol2, hedge_ratio)
 
     def get_normalized_spread(self, symbol1: str, symbol2: str) -> Optional[Dict[str, Any]]:
-        with self.lock:
+        with self._locked(symbol1, symbol2):
             return self.spread_calc.calculate_normalized_spread(symbol1, symbol2)
 
     def get_regression(self, symbol_x: str, symbol_y: str) -> Optional[Dict[str, Any]]:
-        with self.lock:
+        with self._locked(symbol_x, symbol_y):
             return self.regression_calc.calculate_regression(symbol_x, symbol_y)
 
+    def get_all_regressions(self) -> List[Dict[str, Any]]:
+        # Lock-free like the all-pairs correlations (panel or WindowStore snapshots)
+        return self.regression_calc.calculate_all_pairs()
+
     def get_hedge_ratio(self, symbol_x: str, symbol_y: str) -> Optional[float]:
-        with self.lock:
+        with self._locked(symbol_x, symbol_y):
             return self.regression_calc.get_hedge_ratio(symbol_x, symbol_y)
 
+    def track_hedge_ratio(self, symbol_x: str, symbol_y: str) -> bool:
+        """Start the live hedge ratio of y on x; False if already tracked, ValueError if not allowed."""
+        return self.hedge_ratios.add_pair(symbol_x, symbol_y)
+
+    def untrack_hedge_ratio(self, symbol_x: str, symbol_y: str) -> bool:
+        return self.hedge_ratios.remove_pair(symbol_x, symbol_y)
+
+    def get_streaming_hedge_ratio(self, symbol_x: str, symbol_y: str) -> Optional[Dict[str, Any]]:
+        """Live hedge ratio of y on x, for a pair tracked with track_hedge_ratio()."""
+        return self.hedge_ratios.get(symbol_x, symbol_y)
+
+    def get_all_hedge_ratios(self) -> List[Dict[str, Any]]:
+        return self.hedge_ratios.get_all()
+
+    def get_ewma_stats(self, symbol: str, half_life: Optional[float] = None) -> Dict[str, Any]:
+        if symbol not in self.versions:
+            return {}
+        with self._symbol_lock(symbol):
+            return self.ewma_stats.calculate(symbol, half_life)
+
+    def get_ewma_zscore(self, symbol: str, half_life: Optional[float] = None) -> Dict[str, Any]:
+        stats = self.get_ewma_stats(symbol, half_life)
+        if not stats:
+            return {}
+        zscore = self.zscore_calc.calculate_from_stats(stats)
+        zscore['half_life'] = stats['half_life']
+        return zscore
+
+    def get_all_ewma_stats(self, half_life: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        stats = {symbol: self.get_ewma_stats(symbol, half_life) for symbol in list(self.versions)}
+        return {symbol: s for symbol, s in stats.items() if s}
+
+    def track_ewma_correlation(self, symbol1: str, symbol2: str) -> bool:
+        """Start the EW correlation of a pair; False if already tracked, ValueError if not allowed."""
+        return self.ewma_correlation.add_pair(symbol1, symbol2)
+
+    def untrack_ewma_correlation(self, symbol1: str, symbol2: str) -> bool:
+        return self.ewma_correlation.remove_pair(symbol1, symbol2)
+
+    def get_ewma_correlation(self, symbol1: str, symbol2: str, half_life: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """EW covariance / correlation on panel rows, for a pair tracked with track_ewma_correlation()."""
+        return self.ewma_correlation.get(symbol1, symbol2, half_life)
+
+    def get_all_ewma_correlations(self, half_life: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self.ewma_correlation.get_all(half_life)
+
     def get_adf_test(self, symbol: str) -> Optional[Dict[str, Any]]:
-        with self.lock:
-            return self.adf_test.test_price_series(symbol)
+        # Cached; the fit runs in ADFTest's process pool on a lock-free window snapshot
+        return self.adf_test.test_price_series(symbol)
 
-    def get_all_stats(self) -> Dict[str, Dict[str, Any]]:
-        with self.lock:
-            return self.latest_stats.copy()
+    def get_adf_screen(self, symbols: Optional[List[str]] = None, lag: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Fixed-lag ADF of many price windows in one vectorized pass (lock-free snapshots)."""
+        return self.adf_test.screen_prices(symbols, lag)
 
-    def get_all_zscores(self) -> Dict[str, Dict[str, Any]]:
-        with self.lock:
-            return self.latest_zscores.copy()
+    def get_all_stats(self, window: Optional[int] = None, seconds: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        return {symbol: self.get_stats(symbol, window, seconds) for symbol in list(self.versions)}
+
+    def get_all_zscores(self, window: Optional[int] = None, seconds: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        zscores = {symbol: self.get_zscore(symbol, window, seconds) for symbol in list(self.versions)}
+        return {symbol: zscore for symbol, zscore in zscores.items() if zscore}
 
     def get_symbols(self) -> List[str]:
-        with self.lock:
-            return list(self.latest_stats.keys())
+        return list(self.versions)
 
     def get_summary(self) -> Dict[str, Any]:
-        with self.lock:
-            symbols = list(self.latest_stats.keys())
-            latest_prices = {s: stats.get('current_price') for s, stats in self.latest_stats.items() if 'current_price' in stats}
+        latest_stats = self.get_all_stats()
+        symbols = list(latest_stats.keys())
+        latest_prices = {s: stats.get('current_price') for s, stats in latest_stats.items() if 'current_price' in stats}
+
+        return {
+            'symbols': symbols,
+            'symbol_count': len(symbols),
+            'window_size': self.window_size,
+            'window_horizons': self.get_horizons(),
+            'time_windows_seconds': self.get_time_windows(),
+            'ewma_half_lives': list(self.ewma_stats.half_lives),
+            'lazy': self.lazy,
+            'stats_available': len(latest_stats),
+            'latest_prices': latest_prices
+        }
 
-            return {
-                'symbols': symbols,
-                'symbol_count': len(symbols),
-                'window_size': self.window_size,
-                'stats_available': len(self.latest_stats),
-                'latest_prices': latest_prices
-            }
+    def shutdown(self):
+        self.adf_test.shutdown()
 
     def clear(self, symbol: str = None):
         with self.lock:
+            symbols = [symbol] if symbol else list(self.symbol_locks)
+        with self._locked(*symbols):
+            self.windows.clear(symbol)
             self.price_stats.clear(symbol)
             self.correlation_calc.clear(symbol)
             self.spread_calc.clear(symbol)
             self.regression_calc.clear(symbol)
             self.adf_test.clear(symbol)
+            self.panel.clear(symbol)
+            self.hedge_ratios.clear(symbol)
+            self.ewma_stats.clear(symbol)
+            self.ewma_correlation.clear(symbol)
+            if self.correlation_matrix:
+                self.correlation_matrix.resync()
 
             if symbol:
-                self.latest_stats.pop(symbol, None)
-                self.latest_zscores.pop(symbol, None)
+                self.versions.pop(symbol, None)
+                self.stats_memo.pop(symbol, None)
+                self.zscore_memo.pop(symbol, None)
+                for key in [key for key in self.horizon_memo if key[0] == symbol]:
+                    del self.horizon_memo[key]
             else:
-                self.latest_stats.clear()
-                self.latest_zscores.clear()
+                self.versions.clear()
+                self.stats_memo.clear()
+                self.zscore_memo.clear()
+                self.horizon_memo.clear()
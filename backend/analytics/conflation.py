@@ -0,0 +1,155 @@
+"""Per-symbol conflation in front of the analytics engine for QuantStream RTQAE."""
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+from threading import Condition, Thread
+
+from storage.models import Tick, TickRecord
+from core.logger import get_logger
+from core.config import get_config
+
+logger = get_logger("analytics.conflation")
+
+# Pending aggregate slots
+ARRIVED, TIMESTAMP, PRICE, SIZE, TRADE_COUNT, TRADE_ID, IS_BUYER_MAKER = range(7)
+
+
+class AnalyticsConflator:
+    """Rate-limits analytics recomputation per symbol.
+
+    Ticks submitted between two analytics updates of a symbol are merged
+    into one pending aggregate: the latest price, timestamp, trade id and
+    side plus the summed size and trade count. A worker thread applies an
+    aggregate to the engine once the symbol's last update is at least
+    1 / max_hz seconds old, then calls on_update with the symbols it
+    refreshed (e.g. to evaluate alerts).
+
+    Submitting is a dict update under a short lock, so the ingestion path
+    never waits on analytics. Work per symbol is capped at max_hz updates a
+    second and pending state at one aggregate per symbol, however fast
+    ticks arrive.
+    """
+
+    def __init__(self, engine, max_hz: float = None, on_update: Callable[[List[str]], None] = None):
+        config = get_config().analytics
+        self.engine = engine
+        self.max_hz = max_hz or config.conflation_max_hz
+        self.interval = 1.0 / self.max_hz
+        self.on_update = on_update
+
+        self._pending: Dict[str, List[Any]] = {}
+        self._last_update: Dict[str, float] = {}
+        self._cond = Condition()
+        self._thread: Optional[Thread] = None
+        self.running = False
+
+        self._received = 0
+        self._updates = 0
+        self._lag_sum = 0.0
+        self._max_lag = 0.0
+        logger.info(f"Analytics conflation initialized (max {self.max_hz:g} Hz per symbol)")
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = Thread(target=self._run, name="analytics-conflation", daemon=True)
+        self._thread.start()
+        logger.info("Analytics conflation worker started")
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        logger.info("Analytics conflation worker stopped")
+
+    def submit(self, tick: Tick):
+        with self._cond:
+            self._merge(tick)
+            self._cond.notify()
+
+    def submit_batch(self, ticks: List[Tick]):
+        with self._cond:
+            for tick in ticks:
+                self._merge(tick)
+            self._cond.notify()
+
+    def _merge(self, tick: Tick):
+        self._received += 1
+        pending = self._pending.get(tick.symbol)
+        if pending is None:
+            self._pending[tick.symbol] = [
+                time.perf_counter(), tick.timestamp, tick.price, tick.size,
+                tick.trade_count, tick.trade_id, tick.is_buyer_maker
+            ]
+            return
+        pending[TIMESTAMP] = tick.timestamp
+        pending[PRICE] = tick.price
+        pending[SIZE] += tick.size
+        pending[TRADE_COUNT] += tick.trade_count
+        pending[TRADE_ID] = tick.trade_id
+        pending[IS_BUYER_MAKER] = tick.is_buyer_maker
+
+    def _take_due(self) -> Dict[str, List[Any]]:
+        """Pop the aggregates of symbols whose interval has elapsed; waits until at least one is due."""
+        while True:
+            if not self._pending:
+                if not self.running:
+                    return {}
+                self._cond.wait(timeout=1.0)
+                continue
+            now = time.perf_counter()
+            due = {}
+            next_due = None
+            for symbol, pending in self._pending.items():
+                ready_at = self._last_update.get(symbol, 0.0) + self.interval
+                if ready_at <= now or not self.running:
+                    due[symbol] = pending
+                elif next_due is None or ready_at < next_due:
+                    next_due = ready_at
+            if due:
+                for symbol in due:
+                    del self._pending[symbol]
+                    self._last_update[symbol] = now
+                return due
+            self._cond.wait(timeout=next_due - now)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due = self._take_due()
+            if not due:
+                return
+            ticks = [
+                TickRecord(symbol, p[TIMESTAMP], p[PRICE], p[SIZE], p[TRADE_ID], p[IS_BUYER_MAKER], p[TRADE_COUNT])
+                for symbol, p in due.items()
+            ]
+            try:
+                symbols = self.engine.update_batch(ticks)
+                if self.on_update:
+                    self.on_update(symbols)
+            except Exception as e:
+                logger.error(f"Conflated analytics update error: {e}")
+            done = time.perf_counter()
+            for pending in due.values():
+                lag = done - pending[ARRIVED]
+                self._lag_sum += lag
+                if lag > self._max_lag:
+                    self._max_lag = lag
+            self._updates += len(ticks)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            received, updates = self._received, self._updates
+            return {
+                'running': self.running,
+                'max_hz': self.max_hz,
+                'pending_symbols': len(self._pending),
+                'ticks_received': received,
+                'analytics_updates': updates,
+                'conflation_ratio': received / updates if updates else None,
+                'avg_lag_ms': self._lag_sum / updates * 1000 if updates else None,
+                'max_lag_ms': self._max_lag * 1000
+            }
@@ -1,10 +1,11 @@
 """Correlation calculator for QuantStream RTQAE."""
 
-from typing import Dict, Any, List, Optional, Tuple
-from collections import deque
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import numpy as np
 from scipy import stats
 
+from analytics.window_store import WindowStore, align_tails
+from analytics.price_panel import PricePanel, pair_samples
 from core.logger import get_logger
 from core.config import get_config
 
@@ -12,34 +13,54 @@ logger = get_logger("analytics.correlation")
 
 
 class CorrelationCalculator:
-    """Calculates correlations between symbol pairs."""
-
-    def __init__(self, window_size: int = None):
+    """Calculates correlations between symbol pairs.
+
+    With a PricePanel, pairs are formed from prices sampled at the same
+    moments. Otherwise the newest common number of ticks of each symbol's
+    WindowStore window is paired; those pair methods read zero-copy views
+    and expect the caller to hold both symbols' writers off. The all-pairs
+    methods take one snapshot per symbol (or of the panel) instead.
+
+    A pair's sample size is the number of observations each symbol
+    contributes: on the panel, the rows where the less active symbol
+    actually ticked, since carried-forward prices add no information.
+    Pairs below correlation_min_periods or with a constant side get no
+    correlation.
+    """
+
+    def __init__(self, window_size: int = None, store: WindowStore = None, panel: PricePanel = None):
         config = get_config().analytics
         self.window_size = window_size or config.default_window_size
         self.min_periods = config.correlation_min_periods
-        self.price_windows: Dict[str, deque] = {}
+        self.store = store or WindowStore(self.window_size)
+        self.panel = panel
         logger.info(f"Correlation calculator initialized (window: {self.window_size})")
 
-    def update_price(self, symbol: str, price: float):
-        if symbol not in self.price_windows:
-            self.price_windows[symbol] = deque(maxlen=self.window_size)
-        self.price_windows[symbol].append(price)
+    def _pair(self, symbol1: str, symbol2: str) -> Optional[Tuple[np.ndarray, np.ndarray, int]]:
+        """Paired prices and their sample count."""
+        if self.panel is not None:
+            return self.panel.pair_samples(symbol1, symbol2)
+        if symbol1 not in self.store or symbol2 not in self.store:
+            return None
+        x, y = align_tails(self.store.prices(symbol1), self.store.prices(symbol2))
+        return x, y, len(x)
+
+    def _usable(self, arr1: np.ndarray, arr2: np.ndarray, samples: int) -> bool:
+        # A constant side has no variance to correlate (scipy would return NaN)
+        return samples >= self.min_periods and np.ptp(arr1) > 0 and np.ptp(arr2) > 0
 
     def calculate_pearson(self, symbol1: str, symbol2: str) -> Optional[Dict[str, Any]]:
-        if symbol1 not in self.price_windows or symbol2 not in self.price_windows:
-            return None
+        pair = self._pair(symbol1, symbol2)
+        return self._pearson(symbol1, symbol2, *pair) if pair else None
 
-        prices1 = list(self.price_windows[symbol1])
-        prices2 = list(self.price_windows[symbol2])
-        min_len = min(len(prices1), len(prices2))
+    def calculate_spearman(self, symbol1: str, symbol2: str) -> Optional[Dict[str, Any]]:
+        pair = self._pair(symbol1, symbol2)
+        return self._spearman(symbol1, symbol2, *pair) if pair else None
 
-        if min_len < self.min_periods:
+    def _pearson(self, symbol1: str, symbol2: str, arr1: np.ndarray, arr2: np.ndarray, samples: int) -> Optional[Dict[str, Any]]:
+        if not self._usable(arr1, arr2, samples):
             return None
 
-        arr1 = np.array(prices1[-min_len:])
-        arr2 = np.array(prices2[-min_len:])
-
         corr, p_value = stats.pearsonr(arr1, arr2)
 
         return {
@@ -47,24 +68,14 @@ class CorrelationCalculator:
             'symbol2': symbol2,
             'correlation': float(corr),
             'p_value': float(p_value),
-            'sample_size': min_len,
+            'sample_size': samples,
             'method': 'pearson'
         }
 
-    def calculate_spearman(self, symbol1: str, symbol2: str) -> Optional[Dict[str, Any]]:
-        if symbol1 not in self.price_windows or symbol2 not in self.price_windows:
+    def _spearman(self, symbol1: str, symbol2: str, arr1: np.ndarray, arr2: np.ndarray, samples: int) -> Optional[Dict[str, Any]]:
+        if not self._usable(arr1, arr2, samples):
             return None
 
-        prices1 = list(self.price_windows[symbol1])
-        prices2 = list(self.price_windows[symbol2])
-        min_len = min(len(prices1), len(prices2))
-
-        if min_len < self.min_periods:
-            return None
-
-        arr1 = np.array(prices1[-min_len:])
-        arr2 = np.array(prices2[-min_len:])
-
         corr, p_value = stats.spearmanr(arr1, arr2)
 
         return {
@@ -72,27 +83,38 @@ class CorrelationCalculator:
             'symbol2': symbol2,
             'correlation': float(corr),
             'p_value': float(p_value),
-            'sample_size': min_len,
+            'sample_size': samples,
             'method': 'spearman'
         }
 
+    def _snapshots(self) -> Tuple[List[str], Callable[[int, int], Tuple[np.ndarray, np.ndarray, int]]]:
+        """Symbols and a function giving the paired prices and sample count of two of them."""
+        if self.panel is not None:
+            symbols, values, ticked, _ = self.panel.snapshot_ticked()
+            return symbols, lambda i, j: pair_samples(values[:, i], values[:, j], ticked[:, i], ticked[:, j])
+        symbols = self.store.symbols()
+        windows = [self.store.snapshot(symbol)['price'] for symbol in symbols]
+
+        def pair(i: int, j: int) -> Tuple[np.ndarray, np.ndarray, int]:
+            x, y = align_tails(windows[i], windows[j])
+            return x, y, len(x)
+        return symbols, pair
+
     def calculate_all_pairs(self, method: str = 'pearson') -> List[Dict[str, Any]]:
-        symbols = list(self.price_windows.keys())
+        symbols, pair = self._snapshots()
+        calculate = self._spearman if method == 'spearman' else self._pearson
         results = []
 
         for i, sym1 in enumerate(symbols):
-            for sym2 in symbols[i+1:]:
-                if method == 'spearman':
-                    corr = self.calculate_spearman(sym1, sym2)
-                else:
-                    corr = self.calculate_pearson(sym1, sym2)
+            for j in range(i + 1, len(symbols)):
+                corr = calculate(sym1, symbols[j], *pair(i, j))
                 if corr:
                     results.append(corr)
 
         return results
 
     def get_correlation_matrix(self) -> Optional[np.ndarray]:
-        symbols = list(self.price_windows.keys())
+        symbols, pair = self._snapshots()
         if len(symbols) < 2:
             return None
 
@@ -102,7 +124,7 @@ class CorrelationCalculator:
         for i, sym1 in enumerate(symbols):
             for j, sym2 in enumerate(symbols):
                 if i < j:
-                    corr = self.calculate_pearson(sym1, sym2)
+                    corr = self._pearson(sym1, sym2, *pair(i, j))
                     if corr:
                         matrix[i, j] = corr['correlation']
                         matrix[j, i] = corr['correlation']
@@ -110,10 +132,7 @@ class CorrelationCalculator:
         return matrix
 
     def get_symbols(self) -> List[str]:
-        return list(self.price_windows.keys())
+        return self.panel.get_symbols() if self.panel is not None else self.store.symbols()
 
     def clear(self, symbol: str = None):
-        if symbol and symbol in self.price_windows:
-            del self.price_windows[symbol]
-        elif not symbol:
-            self.price_windows.clear()
+        self.store.clear(symbol)
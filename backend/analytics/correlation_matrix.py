@@ -0,0 +1,216 @@
+"""Streaming all-pairs correlation matrix for QuantStream RTQAE."""
+
+from typing import Any, Dict, List, Optional
+import numpy as np
+from scipy import stats
+
+from analytics.price_panel import PricePanel, cross_sums
+from core.logger import get_logger
+from core.config import get_config
+
+logger = get_logger("analytics.correlation_matrix")
+
+
+class StreamingCorrelationMatrix:
+    """Pearson correlations of every symbol pair, maintained from running cross-sums.
+
+    Reads rows from a PricePanel, which samples every symbol's last price
+    on a common clock. The panel only records the latest price on a tick.
+    When it closes a row, the row's outer products are added to the N x N
+    sums and those of the row leaving the window are subtracted, so the
+    cost is O(N^2) per interval, i.e. O(N) per tick when every symbol
+    trades once an interval. Reading the matrix is O(N^2) from the sums,
+    and the result is memoized until the panel changes.
+
+    Sums are kept per pair over the rows where both symbols have a price,
+    so symbols that join late are correlated over their common history.
+    Alongside them it counts the rows each symbol really ticked in: a
+    pair's sample size is that of its less active side, since a
+    carried-forward price repeats one observation.
+    Prices are shifted by a per-symbol reference to keep the sums of
+    squares precise, and the sums are rebuilt from the panel every
+    window_size rows to stop rounding drift.
+    """
+
+    def __init__(self, panel: PricePanel = None, min_periods: int = None):
+        config = get_config().analytics
+        self.panel = panel or PricePanel()
+        self.window_size = self.panel.window_size
+        self.min_periods = min_periods or config.correlation_min_periods
+        # Sums change only under the panel's lock, inside its row callback
+        self.lock = self.panel.lock
+
+        self.n = 0
+        self.capacity = 0
+        self._allocate(16)
+        self.rows_since_resync = 0
+        self._memo = None
+        self._pairs_memo = None
+        self.panel.add_listener(self._on_row)
+        logger.info(f"Streaming correlation matrix initialized (window: {self.window_size} x {self.panel.interval_ms}ms)")
+
+    def _allocate(self, capacity: int):
+        n = self.n
+        ref = np.zeros(capacity)
+        sums = [np.zeros((capacity, capacity)) for _ in range(5)]
+        if self.capacity:
+            ref[:n] = self.ref[:n]
+            for new, old in zip(sums, (self.count, self.sum_x, self.sum_xx, self.sum_xy, self.ticks)):
+                new[:n, :n] = old[:n, :n]
+        self.ref = ref
+        # [i, j]: rows with both i and j, and the sum of x_i / x_i^2 / x_i * x_j over them;
+        # ticks: rows where i ticked and j has a price
+        self.count, self.sum_x, self.sum_xx, self.sum_xy, self.ticks = sums
+        self.capacity = capacity
+
+    def update(self, symbol: str, price: float, timestamp: int):
+        """Feed a tick to the panel (when the matrix owns it)."""
+        self.panel.update(symbol, price, timestamp)
+
+    def _terms(self, prices: np.ndarray):
+        x = prices - self.ref[:prices.shape[-1]]
+        present = np.isfinite(x).astype(np.float64)
+        x = np.where(present > 0, x, 0.0)
+        return x, present
+
+    def _on_row(self, new: np.ndarray, evicted: Optional[np.ndarray]):
+        n = len(new)
+        if n < self.n:
+            # Symbols were removed from the panel and resync() has not run yet
+            self._rebuild(extra=new, drop_oldest=evicted is not None)
+            return
+        t_new, t_old = self.panel.closing_ticked()
+        if n > self.n:
+            # New symbols: reference them at their first price; their sums start at zero
+            while n > self.capacity:
+                self._allocate(2 * self.capacity)
+            self.ref[self.n:n] = np.where(np.isfinite(new[self.n:n]), new[self.n:n], 0.0)
+            self.n = n
+        x_new, m_new = self._terms(new)
+        if evicted is not None:
+            # Add the new row's outer products and subtract the evicted row's in one product each
+            x_old, m_old = self._terms(evicted)
+            a_x = np.stack([x_new, -x_old])
+            a_m = np.stack([m_new, -m_old])
+            b_x = np.stack([x_new, x_old])
+            b_m = np.stack([m_new, m_old])
+            a_xx = np.stack([x_new * x_new, -x_old * x_old])
+            a_t = np.stack([t_new, -t_old.astype(np.float64)])
+        else:
+            a_x = b_x = x_new[None, :]
+            a_m = b_m = m_new[None, :]
+            a_xx = (x_new * x_new)[None, :]
+            a_t = t_new[None, :].astype(np.float64)
+        self.count[:n, :n] += a_m.T @ b_m
+        self.ticks[:n, :n] += a_t.T @ b_m
+        self.sum_x[:n, :n] += a_x.T @ b_m
+        self.sum_xx[:n, :n] += a_xx.T @ b_m
+        self.sum_xy[:n, :n] += a_x.T @ b_x
+
+        self.rows_since_resync += 1
+        if self.rows_since_resync >= self.window_size:
+            self.rows_since_resync = 0
+            # Runs before the panel stores the new row, so add it on top
+            self._rebuild(extra=new, drop_oldest=evicted is not None)
+
+    def _rebuild(self, extra: np.ndarray = None, drop_oldest: bool = False):
+        """Recompute the sums from the panel rows, re-referencing each symbol at its latest price."""
+        values, ticked = self.panel.values(), self.panel.ticked_values()
+        if drop_oldest:
+            values, ticked = values[1:], ticked[1:]
+        if extra is not None:
+            values = np.vstack([values, extra[None, :values.shape[1]]])
+            ticked = np.vstack([ticked, self.panel.closing_ticked()[0][None, :ticked.shape[1]]])
+        n = values.shape[1]
+        while n > self.capacity:
+            self._allocate(2 * self.capacity)
+        self.n = n
+        latest = values[-1] if len(values) else np.full(n, np.nan)
+        self.ref[:n] = np.where(np.isfinite(latest), latest, 0.0)
+        self.count[:n, :n], self.sum_x[:n, :n], self.sum_xx[:n, :n], self.sum_xy[:n, :n] = cross_sums(values, self.ref[:n])
+        self.ticks[:n, :n] = ticked.astype(np.float64).T @ np.isfinite(values).astype(np.float64)
+
+    def resync(self):
+        """Rebuild the sums from the panel (e.g. after symbols were removed from it)."""
+        with self.lock:
+            self.rows_since_resync = 0
+            self._rebuild()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current matrix with its symbols, sample counts and version; cached until the next row closes."""
+        with self.lock:
+            memo = self._memo
+            if memo is not None and memo['version'] == self.panel.version:
+                return memo
+            symbols = list(self.panel.symbols)
+            version = self.panel.version
+            # Symbols without a closed row yet have no sums
+            n = len(symbols)
+            count = np.zeros((n, n))
+            sum_x, sum_xx, sum_xy, ticks = np.zeros((n, n)), np.zeros((n, n)), np.zeros((n, n)), np.zeros((n, n))
+            k = self.n
+            count[:k, :k] = self.count[:k, :k]
+            sum_x[:k, :k] = self.sum_x[:k, :k]
+            sum_xx[:k, :k] = self.sum_xx[:k, :k]
+            sum_xy[:k, :k] = self.sum_xy[:k, :k]
+            ticks[:k, :k] = self.ticks[:k, :k]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_i = sum_x / count
+            mean_j = mean_i.T
+            var_i = sum_xx / count - mean_i * mean_i
+            var_j = var_i.T
+            cov = sum_xy / count - mean_i * mean_j
+            matrix = cov / np.sqrt(var_i * var_j)
+        # A pair's samples are the ticked rows of its less active side, and
+        # a symbol that never moved has no correlation (variance compared to
+        # the second moment, since a constant's sums leave rounding residue)
+        samples = np.rint(np.minimum(ticks, ticks.T))
+        moving = var_i > 1e-12 * (sum_xx / count)
+        valid = (samples >= self.min_periods) & moving & moving.T & np.isfinite(matrix)
+        matrix = np.where(valid, np.clip(matrix, -1.0, 1.0), 0.0)
+        np.fill_diagonal(matrix, 1.0)
+
+        memo = {'version': version, 'symbols': symbols, 'matrix': matrix, 'sample_size': samples, 'valid': valid}
+        with self.lock:
+            if self._memo is None or self._memo['version'] <= version:
+                self._memo = memo
+        return memo
+
+    def get_matrix(self) -> Optional[np.ndarray]:
+        snapshot = self.snapshot()
+        return snapshot['matrix'] if len(snapshot['symbols']) >= 2 else None
+
+    def all_pairs(self) -> List[Dict[str, Any]]:
+        """Same records as CorrelationCalculator.calculate_all_pairs(), from the streaming state."""
+        snapshot = self.snapshot()
+        pairs = self._pairs_memo
+        if pairs is not None and pairs[0] == snapshot['version']:
+            return pairs[1]
+        symbols, matrix, sample_size = snapshot['symbols'], snapshot['matrix'], snapshot['sample_size']
+        i, j = np.nonzero(np.triu(snapshot['valid'], k=1))
+        r = matrix[i, j]
+        df = sample_size[i, j] - 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = r * np.sqrt(df / ((1.0 - r) * (1.0 + r)))
+        p_values = 2 * stats.t.sf(np.abs(t), df)
+        pairs = [
+            {
+                'symbol1': symbols[a],
+                'symbol2': symbols[b],
+                'correlation': float(corr),
+                'p_value': float(p),
+                'sample_size': int(size),
+                'method': 'pearson'
+            }
+            for a, b, corr, p, size in zip(i, j, r, p_values, sample_size[i, j])
+        ]
+        self._pairs_memo = (snapshot['version'], pairs)
+        return pairs
+
+    def get_symbols(self) -> List[str]:
+        return self.panel.get_symbols()
+
+    def clear(self, symbol: str = None):
+        self.panel.clear(symbol)
+        self.resync()
@@ -0,0 +1,219 @@
+"""Exponentially weighted statistics for QuantStream RTQAE."""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from threading import Lock
+import math
+import numpy as np
+
+from analytics.price_panel import PricePanel
+from analytics.panel_pairs import PanelPairs
+from analytics.price_stats import ANNUALIZATION, safe_float
+from core.logger import get_logger
+from core.config import get_config
+
+logger = get_logger("analytics.ewma")
+
+
+def ew_alpha(half_life: float) -> float:
+    """Weight of the newest observation for a half-life in observations."""
+    return 1.0 - 0.5 ** (1.0 / half_life)
+
+
+def half_life_slot(half_lives: List[float], half_life: Optional[float]) -> int:
+    """Position of half_life in the configured half-lives (None: the shortest)."""
+    if half_life is None:
+        return 0
+    if half_life not in half_lives:
+        raise ValueError(f"half_life must be one of the configured EWMA half-lives: {half_lives}")
+    return half_lives.index(half_life)
+
+
+class EWMoments:
+    """Exponentially weighted mean and variance of one series at one half-life.
+
+    The recursion is the one of pandas' ewm(adjust=False) with bias=True:
+    the first observation seeds the mean, and each later one moves the
+    mean by alpha times its deviation and the variance to
+    (1 - alpha) * (variance + alpha * deviation^2). Three floats, O(1)
+    per update.
+    """
+
+    __slots__ = ('alpha', 'mean', 'var', 'count')
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+
+    def update(self, x: float):
+        if not self.count:
+            self.mean = x
+        else:
+            diff = x - self.mean
+            step = self.alpha * diff
+            self.mean += step
+            self.var = (1.0 - self.alpha) * (self.var + diff * step)
+        self.count += 1
+
+
+class EWMAState:
+    """One symbol's EW price and return moments, one pair per half-life."""
+
+    __slots__ = ('last', 'count', 'prices', 'returns')
+
+    def __init__(self, alphas: Sequence[float]):
+        self.last = 0.0
+        self.count = 0
+        self.prices = [EWMoments(a) for a in alphas]
+        self.returns = [EWMoments(a) for a in alphas]
+
+    def update(self, price: float):
+        if self.count:
+            prev = self.last
+            r = (price - prev) / prev if prev > 0 and price > 0 else 0.0
+            for moments in self.returns:
+                moments.update(r)
+        for moments in self.prices:
+            moments.update(price)
+        self.last = price
+        self.count += 1
+
+
+class EWMAStatsCalculator:
+    """Exponentially weighted price statistics per symbol.
+
+    Counterpart of PriceStatsCalculator without a window: for every
+    half-life in analytics.ewma_half_lives (in ticks) a symbol keeps the
+    EW mean and variance of its prices and of its tick returns, so a tick
+    costs O(1) time and the state is a few floats per symbol and
+    half-life, however long the half-life. Volatility is the EW std of
+    returns, annualized like PriceStatsCalculator's.
+
+    Updates and reads of a symbol are expected to be serialized by the
+    caller (the engine's per-symbol lock).
+    """
+
+    def __init__(self, half_lives: List[float] = None):
+        config = get_config().analytics
+        self.half_lives = sorted(set(config.ewma_half_lives if half_lives is None else half_lives))
+        self.alphas = [ew_alpha(h) for h in self.half_lives]
+        self.states: Dict[str, EWMAState] = {}
+        self.lock = Lock()
+        logger.info(f"EWMA stats calculator initialized (half-lives: {self.half_lives})")
+
+    def update(self, symbol: str, price: float):
+        state = self.states.get(symbol)
+        if state is None:
+            with self.lock:
+                state = self.states.setdefault(symbol, EWMAState(self.alphas))
+        state.update(price)
+
+    def calculate(self, symbol: str, half_life: float = None) -> Dict[str, Any]:
+        """EW stats at one half-life (default: the shortest)."""
+        k = half_life_slot(self.half_lives, half_life) if self.half_lives else None
+        state = self.states.get(symbol)
+        if k is None or state is None or state.count < 2:
+            return {}
+        prices = state.prices[k]
+        returns = state.returns[k]
+        std = math.sqrt(max(prices.var, 0.0))
+        return {
+            'symbol': symbol,
+            'half_life': self.half_lives[k],
+            'current_price': safe_float(state.last),
+            'mean': safe_float(prices.mean),
+            'variance': safe_float(prices.var),
+            'std': safe_float(std),
+            'volatility': safe_float(math.sqrt(max(returns.var, 0.0)) * ANNUALIZATION),
+            'count': state.count
+        }
+
+    def get_symbols(self) -> List[str]:
+        return list(self.states)
+
+    def clear(self, symbol: str = None):
+        with self.lock:
+            if symbol:
+                self.states.pop(symbol, None)
+            else:
+                self.states.clear()
+
+
+class EWMACorrelationCalculator(PanelPairs):
+    """Exponentially weighted covariance and correlation of symbol pairs.
+
+    Counterpart of CorrelationCalculator on the PricePanel: pairs are
+    formed from prices sampled at the same moments, and every closed row
+    updates the EW means, variances and covariance of all tracked pairs
+    at every half-life (analytics.ewma_half_lives, here in panel rows)
+    with vectorized NumPy, O(1) per pair and half-life. Pairs are tracked
+    explicitly (see PanelPairs), up to analytics.ewma_max_pairs.
+    """
+
+    def __init__(self, panel: PricePanel, half_lives: List[float] = None, max_pairs: int = None):
+        config = get_config().analytics
+        self.half_lives = sorted(set(config.ewma_half_lives if half_lives is None else half_lives))
+        self.alpha = np.array([ew_alpha(h) for h in self.half_lives])
+        super().__init__(panel, max_pairs or config.ewma_max_pairs)
+        logger.info(f"EWMA correlation initialized (half-lives: {self.half_lives} rows)")
+
+    def _allocate(self, size: int):
+        shape = (size, len(self.half_lives))
+        self.mean_x = np.zeros(shape)
+        self.mean_y = np.zeros(shape)
+        self.var_x = np.zeros(shape)
+        self.var_y = np.zeros(shape)
+        self.cov = np.zeros(shape)
+        self.observations = np.zeros(size, dtype=np.int64)
+
+    def _state(self) -> Tuple[np.ndarray, ...]:
+        return self.mean_x, self.mean_y, self.var_x, self.var_y, self.cov, self.observations
+
+    def _step(self, slots: np.ndarray, x: np.ndarray, y: np.ndarray):
+        """One EW update of the given pair slots with observation (x, y) at every half-life."""
+        first = (self.observations[slots] == 0)[:, None]
+        x, y = x[:, None], y[:, None]
+        a = np.where(first, 1.0, self.alpha)
+        dx = x - self.mean_x[slots]
+        dy = y - self.mean_y[slots]
+        self.mean_x[slots] += a * dx
+        self.mean_y[slots] += a * dy
+        keep = 1.0 - a
+        self.var_x[slots] = keep * (self.var_x[slots] + a * dx * dx)
+        self.var_y[slots] = keep * (self.var_y[slots] + a * dy * dy)
+        self.cov[slots] = keep * (self.cov[slots] + a * dx * dy)
+        self.observations[slots] += 1
+
+    def _result(self, k: int, h: int) -> Dict[str, Any]:
+        symbol1, symbol2 = self.pairs[k]
+        var_x, var_y, cov = self.var_x[k, h], self.var_y[k, h], self.cov[k, h]
+        denom = math.sqrt(var_x * var_y) if var_x > 0 and var_y > 0 else 0.0
+        return {
+            'symbol1': symbol1,
+            'symbol2': symbol2,
+            'half_life': self.half_lives[h],
+            'covariance': safe_float(cov),
+            'correlation': safe_float(min(max(cov / denom, -1.0), 1.0)) if denom > 0 else 0.0,
+            'std1': safe_float(math.sqrt(max(var_x, 0.0))),
+            'std2': safe_float(math.sqrt(max(var_y, 0.0))),
+            'observations': int(self.observations[k])
+        }
+
+    def get(self, symbol1: str, symbol2: str, half_life: float = None) -> Optional[Dict[str, Any]]:
+        """Latest EW correlation of a tracked pair (None if untracked or not warmed up)."""
+        if not self.half_lives:
+            return None
+        h = half_life_slot(self.half_lives, half_life)
+        with self.lock:
+            k = self.pair_index.get((symbol1, symbol2))
+            if k is None or self.observations[k] < 2:
+                return None
+            return self._result(k, h)
+
+    def get_all(self, half_life: float = None) -> List[Dict[str, Any]]:
+        if not self.half_lives:
+            return []
+        h = half_life_slot(self.half_lives, half_life)
+        with self.lock:
+            return [self._result(k, h) for k in range(len(self.pairs)) if self.observations[k] >= 2]
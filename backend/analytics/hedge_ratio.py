@@ -0,0 +1,151 @@
+"""Streaming hedge-ratio estimation for QuantStream RTQAE."""
+
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from analytics.price_panel import PricePanel
+from analytics.panel_pairs import PanelPairs
+from core.logger import get_logger
+from core.config import get_config
+
+logger = get_logger("analytics.hedge_ratio")
+
+INITIAL_VARIANCE = 1e4
+METHODS = ('rls', 'kalman')
+
+
+class StreamingHedgeRatios(PanelPairs):
+    """Time-varying y = beta * x + alpha fits for a universe of symbol pairs.
+
+    Every pair is a two-parameter linear filter over synchronized
+    observations: the rows of a PricePanel, so both prices are sampled at
+    the same moment. Each closed row updates all tracked pairs at once
+    with vectorized NumPy, O(1) work per pair and row.
+
+    method 'rls' is recursive least squares with forgetting factor
+    analytics.hedge_forgetting (older observations are down-weighted by
+    that factor per row, an effective memory of 1 / (1 - factor) rows).
+    'kalman' treats beta and alpha as random walks with per-row variance
+    delta / (1 - delta) (analytics.kalman_delta) relative to the
+    observation noise, which is estimated from the exponentially weighted
+    innovation variance.
+
+    Prices are fitted relative to each pair's first observation to keep
+    the 2x2 covariance well conditioned; alpha is reported in price
+    units. Residual (spread) mean and std are exponentially weighted with
+    the forgetting factor.
+
+    Pairs are tracked explicitly (see PanelPairs), up to
+    analytics.hedge_ratio_max_pairs.
+    """
+
+    def __init__(self, panel: PricePanel, method: str = None, forgetting: float = None, delta: float = None,
+                 max_pairs: int = None):
+        config = get_config().analytics
+        self.method = method or config.hedge_ratio_method
+        if self.method not in METHODS:
+            raise ValueError(f"Unknown hedge ratio method: {self.method}")
+        self.forgetting = forgetting or config.hedge_forgetting
+        self.delta = delta or config.kalman_delta
+        super().__init__(panel, max_pairs or config.hedge_ratio_max_pairs)
+        logger.info(f"Streaming hedge ratios initialized (method: {self.method})")
+
+    def _allocate(self, size: int):
+        self.theta = np.zeros((size, 2))          # [beta, alpha relative to the reference prices]
+        self.cov = np.zeros((size, 2, 2))
+        self.x_ref = np.zeros(size)
+        self.y_ref = np.zeros(size)
+        self.observations = np.zeros(size, dtype=np.int64)
+        self.residual = np.zeros(size)
+        self.residual_mean = np.zeros(size)
+        self.residual_var = np.zeros(size)
+        self.innovation_var = np.zeros(size)
+
+    def _state(self) -> Tuple[np.ndarray, ...]:
+        return (self.theta, self.cov, self.x_ref, self.y_ref, self.observations,
+                self.residual, self.residual_mean, self.residual_var, self.innovation_var)
+
+    def _step(self, slots: np.ndarray, x: np.ndarray, y: np.ndarray):
+        """One filter update of the given pair slots with observation (x, y)."""
+        first = self.observations[slots] == 0
+        if first.any():
+            fresh = slots[first]
+            self.x_ref[fresh] = x[first]
+            self.y_ref[fresh] = y[first]
+            self.cov[fresh] = np.eye(2) * INITIAL_VARIANCE
+
+        hx = x - self.x_ref[slots]
+        hy = y - self.y_ref[slots]
+        theta = self.theta[slots]
+        cov = self.cov[slots]
+        lam = self.forgetting
+
+        if self.method == 'kalman':
+            # Observation noise: the EW innovation variance, floored relative to the price level
+            floor = (1e-4 * np.maximum(np.abs(self.y_ref[slots]), 1e-9)) ** 2
+            noise = np.maximum(self.innovation_var[slots], floor)
+            # State noise q * I on (beta, alpha) in price coordinates, mapped to
+            # (beta, alpha + beta * x_ref); scaled by the observation noise so
+            # that delta alone sets how fast the fit adapts
+            x0 = self.x_ref[slots]
+            q = self.delta / (1 - self.delta) * noise
+            cov_pred = cov.copy()
+            cov_pred[:, 0, 0] += q
+            cov_pred[:, 0, 1] += q * x0
+            cov_pred[:, 1, 0] += q * x0
+            cov_pred[:, 1, 1] += q * (1 + x0 * x0)
+        else:
+            noise = 1.0
+            cov_pred = cov / lam
+        # cov_pred @ h with h = [hx, 1]
+        ch = np.stack([cov_pred[:, 0, 0] * hx + cov_pred[:, 0, 1], cov_pred[:, 1, 0] * hx + cov_pred[:, 1, 1]], axis=1)
+        error = hy - (theta[:, 0] * hx + theta[:, 1])
+        s = hx * ch[:, 0] + ch[:, 1] + noise
+        gain = ch / s[:, None]
+        theta += gain * error[:, None]
+        cov = cov_pred - gain[:, :, None] * ch[:, None, :]
+
+        residual = hy - (theta[:, 0] * hx + theta[:, 1])
+        n = self.observations[slots]
+        w = np.where(n == 0, 1.0, 1 - lam)
+        mean = self.residual_mean[slots]
+        diff = residual - mean
+        self.residual_mean[slots] = mean + w * diff
+        self.residual_var[slots] = (1 - w) * (self.residual_var[slots] + w * diff * diff)
+        self.innovation_var[slots] = np.where(n == 0, 0.0, lam * self.innovation_var[slots] + (1 - lam) * error * error)
+
+        self.theta[slots] = theta
+        self.cov[slots] = cov
+        self.residual[slots] = residual
+        self.observations[slots] = n + 1
+
+    def _result(self, k: int) -> Dict[str, Any]:
+        symbol_x, symbol_y = self.pairs[k]
+        beta, alpha_rel = self.theta[k]
+        std = float(np.sqrt(self.residual_var[k]))
+        residual = float(self.residual[k])
+        return {
+            'symbol_x': symbol_x,
+            'symbol_y': symbol_y,
+            'method': self.method,
+            'beta': float(beta),
+            'alpha': float(self.y_ref[k] + alpha_rel - beta * self.x_ref[k]),
+            'beta_std': float(np.sqrt(max(self.cov[k, 0, 0], 0.0))),
+            'spread': residual,
+            'residual_mean': float(self.residual_mean[k]),
+            'residual_std': std,
+            'residual_zscore': (residual - float(self.residual_mean[k])) / std if std > 0 else 0.0,
+            'observations': int(self.observations[k])
+        }
+
+    def get(self, symbol_x: str, symbol_y: str) -> Optional[Dict[str, Any]]:
+        """Latest estimate for a tracked pair (None if untracked or not warmed up)."""
+        with self.lock:
+            k = self.pair_index.get((symbol_x, symbol_y))
+            if k is None or self.observations[k] < 2:
+                return None
+            return self._result(k)
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [self._result(k) for k in range(len(self.pairs)) if self.observations[k] >= 2]
@@ -0,0 +1,239 @@
+"""Pair-universe cointegration scanner for QuantStream RTQAE."""
+
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from threading import Event, Lock, Thread
+import multiprocessing
+import time
+import numpy as np
+from statsmodels.tsa.adfvalues import mackinnoncrit
+
+from analytics.adf_test import batch_adf, mackinnon_pvalues
+from analytics.price_panel import PricePanel
+from core.logger import get_logger
+from core.config import get_config
+
+logger = get_logger("analytics.pair_scanner")
+
+
+def scan_pairs(values: np.ndarray, x_index: np.ndarray, y_index: np.ndarray, lag: int, segments: int = 4) -> Dict[str, np.ndarray]:
+    """Engle-Granger statistics of y = beta * x + alpha for the given column pairs of a (rows x symbols) array.
+
+    Fits every pair's OLS hedge ratio, then a fixed-lag ADF on the
+    residuals (no deterministic terms) with the two-variable MacKinnon
+    p-value, as statsmodels' coint(y, x, maxlag=lag, autolag=None) does.
+    Also returns the residual half-life in rows (NaN unless it mean
+    reverts), the correlation, and beta_cv: the spread of the betas
+    fitted on `segments` consecutive sub-windows relative to the full
+    beta (lower is more stable). Module-level so pool workers can run it.
+    """
+    # Sums of squares and cross-products of every symbol pair from one matrix product
+    mean = values.mean(axis=0)
+    centered = values - mean
+    cross = centered.T @ centered
+    sxx = cross[x_index, x_index]
+    syy = cross[y_index, y_index]
+    sxy = cross[x_index, y_index]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = sxy / sxx
+        correlation = sxy / np.sqrt(sxx * syy)
+    alpha = mean[y_index] - beta * mean[x_index]
+    xc, yc = centered[:, x_index], centered[:, y_index]
+
+    # OLS residuals have zero mean, so the centered ones are the residuals
+    resid = (yc - beta * xc).T
+    stat = batch_adf(resid, lag, 'n')['adf_statistic']
+    p_value = mackinnon_pvalues(stat, 'c', N=2)
+
+    # Half-life from the AR(1) fit d(resid) = lambda * resid[-1] + c
+    lagged = resid[:, :-1] - resid[:, :-1].mean(axis=1, keepdims=True)
+    step = np.diff(resid, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        speed = np.sum(lagged * (step - step.mean(axis=1, keepdims=True)), axis=1) / np.sum(lagged * lagged, axis=1)
+        half_life = np.where(speed < 0, -np.log(2) / np.log1p(np.maximum(speed, -1 + 1e-12)), np.nan)
+
+    # Beta on consecutive sub-windows
+    betas = []
+    for rows in np.array_split(np.arange(len(values)), segments):
+        part = values[rows] - values[rows].mean(axis=0)
+        part_cross = part.T @ part
+        with np.errstate(divide='ignore', invalid='ignore'):
+            betas.append(part_cross[x_index, y_index] / part_cross[x_index, x_index])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta_cv = np.std(betas, axis=0) / np.abs(beta)
+
+    return {
+        'beta': beta,
+        'alpha': alpha,
+        'correlation': correlation,
+        'adf_statistic': stat,
+        'p_value': p_value,
+        'half_life': half_life,
+        'beta_cv': beta_cv
+    }
+
+
+class PairScanner:
+    """Periodic Engle-Granger cointegration scan over every pair of the tracked universe.
+
+    Each scan snapshots the PricePanel, keeps the symbols that ticked in
+    at least analytics.regression_min_periods rows and uses the rows they
+    all have prices for. A pair's sample size is the number of those rows
+    its less active side ticked in (carried-forward prices repeat one
+    observation), and pairs short of min_periods are not reported. Its
+    N * (N - 1) / 2 pairs are cut into chunks of
+    analytics.pair_scanner_chunk_size, and each chunk is fitted
+    vectorized by scan_pairs() in a process pool
+    (analytics.pair_scanner_workers processes; 0 = inline). Every task
+    gets the panel snapshot itself, which for a window of prices is only
+    rows x symbols floats.
+
+    Results are ranked by ADF p-value, then half-life. A background
+    thread rescans every analytics.pair_scanner_interval_seconds, and
+    readers get the latest ranking without waiting.
+    """
+
+    def __init__(self, panel: PricePanel, interval_seconds: float = None, workers: int = None,
+                 chunk_size: int = None, lag: int = None, min_periods: int = None):
+        config = get_config().analytics
+        self.panel = panel
+        self.interval_seconds = interval_seconds or config.pair_scanner_interval_seconds
+        self.workers = config.pair_scanner_workers if workers is None else workers
+        self.chunk_size = chunk_size or config.pair_scanner_chunk_size
+        self.lag = config.adf_batch_lag if lag is None else lag
+        self.min_periods = min_periods or config.regression_min_periods
+
+        self.lock = Lock()
+        self.scan_lock = Lock()
+        self.results: List[Dict[str, Any]] = []
+        self.summary: Dict[str, Any] = {'scanned_at': None}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self.running = False
+        logger.info(f"Pair scanner initialized (every {self.interval_seconds:g}s, workers: {self.workers})")
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the server process is multithreaded
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="pair-scanner", daemon=True)
+        self._thread.start()
+        logger.info("Pair scanner started")
+
+    def stop(self, timeout: float = 5.0):
+        self.running = False
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        logger.info("Pair scanner stopped")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+            except Exception as e:
+                logger.error(f"Pair scan error: {e}")
+            self._stop.wait(self.interval_seconds)
+
+    def scan(self) -> int:
+        """Run one scan now; returns the number of pairs tested."""
+        with self.scan_lock:
+            started = time.perf_counter()
+            symbols, values, ticked, version = self.panel.snapshot_ticked()
+            present = np.isfinite(values).sum(axis=0)
+            keep = np.nonzero(ticked.sum(axis=0) >= self.min_periods)[0]
+            if len(keep) < 2:
+                self._publish([], symbols=[], rows=0, version=version, started=started)
+                return 0
+
+            # Prices are carried forward, so the rows all kept symbols share are the newest min(present)
+            rows = int(present[keep].min())
+            values = np.ascontiguousarray(values[len(values) - rows:, keep])
+            ticks = ticked[len(ticked) - rows:, keep].sum(axis=0)
+            symbols = [symbols[k] for k in keep]
+            x_index, y_index = np.triu_indices(len(symbols), k=1)
+
+            chunks = [(x_index[start:start + self.chunk_size], y_index[start:start + self.chunk_size])
+                      for start in range(0, len(x_index), self.chunk_size)]
+            if self.workers > 0 and len(chunks) > 1:
+                futures = [self.pool.submit(scan_pairs, values, xi, yi, self.lag) for xi, yi in chunks]
+                parts = [future.result() for future in futures]
+            else:
+                parts = [scan_pairs(values, xi, yi, self.lag) for xi, yi in chunks]
+            out = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+            samples = np.minimum(ticks[x_index], ticks[y_index])
+            self._publish(self._rank(symbols, x_index, y_index, out, samples), symbols, rows, version, started)
+            return len(x_index)
+
+    def _rank(self, symbols: List[str], x_index: np.ndarray, y_index: np.ndarray,
+              out: Dict[str, np.ndarray], samples: np.ndarray) -> List[Dict[str, Any]]:
+        valid = np.isfinite(out['adf_statistic']) & np.isfinite(out['beta']) & (samples >= self.min_periods)
+        half_life = np.where(np.isfinite(out['half_life']), out['half_life'], np.inf)
+        order = [k for k in np.lexsort((half_life, out['p_value'])) if valid[k]]
+        interval_seconds = self.panel.interval_ms / 1000.0
+
+        def finite(value: float) -> Optional[float]:
+            return float(value) if np.isfinite(value) else None
+
+        return [
+            {
+                'symbol_x': symbols[x_index[k]],
+                'symbol_y': symbols[y_index[k]],
+                'beta': float(out['beta'][k]),
+                'alpha': float(out['alpha'][k]),
+                'correlation': finite(out['correlation'][k]),
+                'adf_statistic': float(out['adf_statistic'][k]),
+                'p_value': float(out['p_value'][k]),
+                'is_cointegrated': bool(out['p_value'][k] < 0.05),
+                'half_life': finite(out['half_life'][k]),
+                'half_life_seconds': finite(out['half_life'][k] * interval_seconds),
+                'beta_cv': finite(out['beta_cv'][k]),
+                'sample_size': int(samples[k])
+            }
+            for k in order
+        ]
+
+    def _publish(self, results: List[Dict[str, Any]], symbols: List[str], rows: int, version: int, started: float):
+        critical = mackinnoncrit(N=2, regression='c', nobs=rows - 1) if rows > 1 else [None] * 3
+        with self.lock:
+            self.results = results
+            self.summary = {
+                'scanned_at': time.time(),
+                'duration_ms': (time.perf_counter() - started) * 1000,
+                'panel_version': version,
+                'symbols': symbols,
+                'pairs_tested': len(symbols) * (len(symbols) - 1) // 2,
+                'rows': rows,
+                'lag': self.lag,
+                'critical_1pct': None if critical[0] is None else float(critical[0]),
+                'critical_5pct': None if critical[1] is None else float(critical[1]),
+                'critical_10pct': None if critical[2] is None else float(critical[2])
+            }
+
+    def get_results(self, limit: int = None, max_p_value: float = None) -> Dict[str, Any]:
+        """Latest ranking; empty (scanned_at None) until the first background scan is published."""
+        with self.lock:
+            results = self.results
+            summary = dict(self.summary)
+        if summary['scanned_at'] is None:
+            return dict(summary, age_seconds=None, results=[])
+        if max_p_value is not None:
+            results = [r for r in results if r['p_value'] <= max_p_value]
+        if limit is not None:
+            results = results[:limit]
+        summary['age_seconds'] = time.time() - summary['scanned_at']
+        summary['results'] = results
+        return summary
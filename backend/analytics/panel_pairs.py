@@ -0,0 +1,139 @@
+"""Registry of symbol pairs updated from PricePanel rows for QuantStream RTQAE."""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from analytics.price_panel import PricePanel
+
+
+class PanelPairs:
+    """Base for calculators that keep per-pair state updated on every panel row.
+
+    Pairs are tracked explicitly with add_pair() / remove_pair(), only for
+    symbols already in the panel and up to max_pairs, since every tracked
+    pair costs work on every row. A pair is warmed up from the rows
+    already in the panel when it is added. Per-pair state lives in arrays
+    indexed by slot (the pair's position in pairs), so each closed row
+    updates all pairs at once.
+
+    Subclasses allocate their arrays in _allocate(size), list them in
+    _state() and fold one observation of some slots into them in
+    _step(slots, x, y). All of it runs under the panel's lock: inside its
+    row callback, or in the methods here that take self.lock.
+    """
+
+    def __init__(self, panel: PricePanel, max_pairs: int):
+        self.panel = panel
+        self.max_pairs = max_pairs
+        self.lock = panel.lock
+
+        self.pairs: List[Tuple[str, str]] = []
+        self.pair_index: Dict[Tuple[str, str], int] = {}
+        self._allocate(0)
+        self._columns = None
+        self.panel.add_listener(self._on_row)
+
+    def _allocate(self, size: int):
+        raise NotImplementedError
+
+    def _state(self) -> Tuple[np.ndarray, ...]:
+        raise NotImplementedError
+
+    def _step(self, slots: np.ndarray, x: np.ndarray, y: np.ndarray):
+        raise NotImplementedError
+
+    def _resize(self, keep: np.ndarray):
+        """Keep only the pair slots in keep (in order), appending fresh slots for any new pairs."""
+        old = self._state()
+        self._allocate(len(self.pairs))
+        for new, values in zip(self._state(), old):
+            new[:len(keep)] = values[keep]
+        self._columns = None
+
+    def add_pair(self, symbol_x: str, symbol_y: str) -> bool:
+        """Start tracking a pair; returns False if it already was.
+
+        Raises ValueError for a symbol the panel has not seen or when
+        max_pairs pairs are already tracked.
+        """
+        with self.lock:
+            key = (symbol_x, symbol_y)
+            if key in self.pair_index:
+                return False
+            for symbol in key:
+                if symbol not in self.panel.index:
+                    raise ValueError(f"Unknown symbol: {symbol}")
+            if symbol_x == symbol_y:
+                raise ValueError("A pair needs two different symbols")
+            if len(self.pairs) >= self.max_pairs:
+                raise ValueError(f"Already tracking the maximum of {self.max_pairs} pairs")
+            self._add_pair(key)
+            return True
+
+    def remove_pair(self, symbol_x: str, symbol_y: str) -> bool:
+        """Stop tracking a pair; returns False if it was not tracked."""
+        with self.lock:
+            k = self.pair_index.get((symbol_x, symbol_y))
+            if k is None:
+                return False
+            self._drop([j for j in range(len(self.pairs)) if j != k])
+            return True
+
+    def is_tracked(self, symbol_x: str, symbol_y: str) -> bool:
+        return (symbol_x, symbol_y) in self.pair_index
+
+    def _add_pair(self, key: Tuple[str, str]):
+        slot = len(self.pairs)
+        self.pairs.append(key)
+        self.pair_index[key] = slot
+        self._resize(np.arange(slot))
+
+        # Warm up from the panel history
+        ix, iy = self.panel.index[key[0]], self.panel.index[key[1]]
+        slots = np.array([slot])
+        for row in self.panel.values():
+            if np.isfinite(row[ix]) and np.isfinite(row[iy]):
+                self._step(slots, row[ix:ix + 1], row[iy:iy + 1])
+
+    def _pair_columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Slots, and panel columns of x and y, of the pairs with both symbols in the panel."""
+        # The panel extends its index in place when a symbol joins and replaces it when one leaves
+        index = self.panel.index
+        if self._columns is None or self._columns[3] is not index or self._columns[4] != len(index):
+            slots = [k for k, (x, y) in enumerate(self.pairs) if x in index and y in index]
+            ix = np.array([index[self.pairs[k][0]] for k in slots], dtype=np.int64)
+            iy = np.array([index[self.pairs[k][1]] for k in slots], dtype=np.int64)
+            self._columns = (np.array(slots, dtype=np.int64), ix, iy, index, len(index))
+        return self._columns[:3]
+
+    def _on_row(self, new: np.ndarray, evicted: Optional[np.ndarray]):
+        if not self.pairs:
+            return
+        slots, ix, iy = self._pair_columns()
+        if not len(slots):
+            return
+        x, y = new[ix], new[iy]
+        ok = np.isfinite(x) & np.isfinite(y)
+        if not ok.all():
+            slots, x, y = slots[ok], x[ok], y[ok]
+        if len(slots):
+            self._step(slots, x, y)
+
+    def clear(self, symbol: str = None):
+        """Drop every pair involving symbol, or all pairs."""
+        with self.lock:
+            if symbol is None:
+                self.pairs = []
+                self.pair_index = {}
+                self._allocate(0)
+                self._columns = None
+                return
+            keep = [k for k, pair in enumerate(self.pairs) if symbol not in pair]
+            if len(keep) < len(self.pairs):
+                self._drop(keep)
+
+    def _drop(self, keep: List[int]):
+        """Keep only the pairs at the given slots; caller holds the lock."""
+        self.pairs = [self.pairs[k] for k in keep]
+        self.pair_index = {pair: k for k, pair in enumerate(self.pairs)}
+        self._resize(np.array(keep, dtype=np.int64))
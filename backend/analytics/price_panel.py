@@ -0,0 +1,225 @@
+"""Time-synchronized multi-symbol price panel for QuantStream RTQAE."""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from threading import Lock
+import numpy as np
+
+from core.logger import get_logger
+from core.config import get_config
+
+logger = get_logger("analytics.price_panel")
+
+# listener(new_row, evicted_row or None), both views over the current symbols
+RowListener = Callable[[np.ndarray, Optional[np.ndarray]], None]
+
+
+def cross_sums(values: np.ndarray, ref: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Pairwise sums over the rows where both columns are present (NaN = missing).
+
+    Returns (count, sum_x, sum_xx, sum_xy) where [i, j] of count is the
+    number of rows with both i and j, of sum_x / sum_xx the sum of x_i /
+    x_i^2 over those rows and of sum_xy the sum of x_i * x_j. Values are
+    shifted by ref (one reference per column) first, to keep the sums of
+    squares precise. Each is a single matrix product.
+    """
+    x = values - ref
+    present = np.isfinite(x).astype(np.float64)
+    x = np.where(present > 0, x, 0.0)
+    return present.T @ present, x.T @ present, (x * x).T @ present, x.T @ x
+
+
+def align_present(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Two panel columns restricted to the sample times where both have a price."""
+    both = np.isfinite(x) & np.isfinite(y)
+    return x[both], y[both]
+
+
+def pair_samples(x: np.ndarray, y: np.ndarray, ticked_x: np.ndarray, ticked_y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+    """align_present() plus the number of independent samples in the aligned rows.
+
+    Carried-forward prices repeat a single observation, so a pair has as
+    many samples as the less active symbol has rows it actually ticked in.
+    """
+    both = np.isfinite(x) & np.isfinite(y)
+    return x[both], y[both], int(min(np.count_nonzero(ticked_x[both]), np.count_nonzero(ticked_y[both])))
+
+
+class PricePanel:
+    """Every symbol's last price sampled on a common clock into one 2D array.
+
+    Each interval_ms bucket closes a row holding the last price of every
+    symbol (carried forward when it did not trade; NaN before its first
+    tick). A parallel boolean ring records which symbols ticked in each
+    row, so consumers can tell real samples from carried-forward copies.
+    The newest window_size rows are kept in a mirrored ring, so values()
+    is always a contiguous (rows x symbols) view, oldest row first, and
+    cross-sectional analytics are plain array operations on it. Symbols
+    with very different tick rates are compared at the same moments
+    instead of by tick count.
+
+    Listeners see every closed row together with the row it evicts, which
+    lets streaming consumers maintain their state incrementally. version
+    changes whenever the panel does.
+    """
+
+    def __init__(self, window_size: int = None, interval_ms: int = None):
+        config = get_config().analytics
+        self.window_size = window_size or config.default_window_size
+        self.interval_ms = interval_ms or config.panel_interval_ms
+        self.lock = Lock()
+        self.listeners: List[RowListener] = []
+
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.capacity = 0
+        self._allocate(16)
+
+        self.bucket: Optional[int] = None
+        self.row_pos = 0
+        self.row_count = 0
+        self.version = 0
+        logger.info(f"Price panel initialized ({self.window_size} rows x {self.interval_ms}ms)")
+
+    def _allocate(self, capacity: int):
+        n = len(self.symbols)
+        latest = np.full(capacity, np.nan)
+        rows = np.full((2 * self.window_size, capacity), np.nan)
+        fresh = np.zeros(capacity, dtype=bool)
+        ticked = np.zeros((2 * self.window_size, capacity), dtype=bool)
+        if self.capacity:
+            latest[:n] = self.latest[:n]
+            rows[:, :n] = self.rows[:, :n]
+            fresh[:n] = self.fresh[:n]
+            ticked[:, :n] = self.ticked[:, :n]
+        self.latest = latest
+        self.rows = rows
+        # fresh: ticked since the last row closed; ticked: the same per closed row
+        self.fresh = fresh
+        self.ticked = ticked
+        self.capacity = capacity
+
+    def add_listener(self, listener: RowListener):
+        with self.lock:
+            self.listeners.append(listener)
+
+    def update(self, symbol: str, price: float, timestamp: int) -> int:
+        """Record a tick; returns the number of rows it closed."""
+        with self.lock:
+            closed = 0
+            bucket = timestamp // self.interval_ms
+            if self.bucket is None:
+                self.bucket = bucket
+            elif bucket > self.bucket:
+                # Close the finished bucket plus any empty ones (carrying prices forward)
+                closed = min(bucket - self.bucket, self.window_size)
+                for _ in range(closed):
+                    self._close_row()
+                self.bucket = bucket
+
+            i = self.index.get(symbol)
+            if i is None:
+                i = self._add_symbol(symbol)
+            self.latest[i] = price
+            self.fresh[i] = True
+            return closed
+
+    def _add_symbol(self, symbol: str) -> int:
+        i = len(self.symbols)
+        if i == self.capacity:
+            self._allocate(2 * self.capacity)
+        self.symbols.append(symbol)
+        self.index[symbol] = i
+        self.version += 1
+        return i
+
+    def _close_row(self):
+        n = len(self.symbols)
+        new = self.latest[:n]
+        evicted = self.rows[self.row_pos, :n] if self.row_count == self.window_size else None
+        for listener in self.listeners:
+            listener(new, evicted)
+        self.rows[self.row_pos, :n] = new
+        self.rows[self.row_pos + self.window_size, :n] = new
+        self.ticked[self.row_pos, :n] = self.ticked[self.row_pos + self.window_size, :n] = self.fresh[:n]
+        self.fresh[:n] = False
+        self.row_pos = (self.row_pos + 1) % self.window_size
+        self.row_count = min(self.row_count + 1, self.window_size)
+        self.version += 1
+
+    def values(self) -> np.ndarray:
+        """Zero-copy (rows x symbols) view, oldest row first; hold self.lock while using it."""
+        end = self.row_pos + self.window_size
+        return self.rows[end - self.row_count:end, :len(self.symbols)]
+
+    def ticked_values(self) -> np.ndarray:
+        """Zero-copy (rows x symbols) view of which symbols ticked in each row of values()."""
+        end = self.row_pos + self.window_size
+        return self.ticked[end - self.row_count:end, :len(self.symbols)]
+
+    def closing_ticked(self) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Inside a row callback: which symbols ticked in the closing row and in the row it evicts (None if none)."""
+        n = len(self.symbols)
+        return self.fresh[:n], self.ticked[self.row_pos, :n] if self.row_count == self.window_size else None
+
+    def snapshot(self) -> Tuple[List[str], np.ndarray, int]:
+        """(symbols, copy of values(), version)."""
+        with self.lock:
+            return list(self.symbols), self.values().copy(), self.version
+
+    def snapshot_ticked(self) -> Tuple[List[str], np.ndarray, np.ndarray, int]:
+        """(symbols, copy of values(), copy of ticked_values(), version)."""
+        with self.lock:
+            return list(self.symbols), self.values().copy(), self.ticked_values().copy(), self.version
+
+    def column(self, symbol: str) -> Optional[np.ndarray]:
+        with self.lock:
+            i = self.index.get(symbol)
+            return None if i is None else self.values()[:, i].copy()
+
+    def pair(self, symbol1: str, symbol2: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Prices of two symbols at the sample times where both have one."""
+        with self.lock:
+            i, j = self.index.get(symbol1), self.index.get(symbol2)
+            if i is None or j is None:
+                return None
+            values = self.values()
+            return align_present(values[:, i], values[:, j])
+
+    def pair_samples(self, symbol1: str, symbol2: str) -> Optional[Tuple[np.ndarray, np.ndarray, int]]:
+        """pair() plus the number of rows in it that both symbols' samples really cover (see pair_samples())."""
+        with self.lock:
+            i, j = self.index.get(symbol1), self.index.get(symbol2)
+            if i is None or j is None:
+                return None
+            values, ticked = self.values(), self.ticked_values()
+            return pair_samples(values[:, i], values[:, j], ticked[:, i], ticked[:, j])
+
+    def get_symbols(self) -> List[str]:
+        with self.lock:
+            return list(self.symbols)
+
+    def clear(self, symbol: str = None):
+        with self.lock:
+            if symbol is None:
+                self.symbols = []
+                self.index = {}
+                self.capacity = 0
+                self._allocate(16)
+                self.bucket = None
+                self.row_pos = self.row_count = 0
+            elif symbol in self.index:
+                keep = [i for i, s in enumerate(self.symbols) if s != symbol]
+                n = len(keep)
+                self.latest[:n] = self.latest[keep]
+                self.latest[n] = np.nan
+                self.rows[:, :n] = self.rows[:, keep]
+                self.rows[:, n] = np.nan
+                self.fresh[:n] = self.fresh[keep]
+                self.fresh[n] = False
+                self.ticked[:, :n] = self.ticked[:, keep]
+                self.ticked[:, n] = False
+                self.symbols = [self.symbols[i] for i in keep]
+                self.index = {s: i for i, s in enumerate(self.symbols)}
+            else:
+                return
+            self.version += 1
@@ -2,14 +2,20 @@
 
 from typing import Dict, Any, List, Optional
 from collections import deque
+import heapq
 import numpy as np
 import math
 
+from core.ring import ColumnarRing
+from analytics.window_store import WindowStore
 from storage.models import Tick
 from core.logger import get_logger
+from core.config import get_config
 
 logger = get_logger("analytics.price_stats")
 
+ANNUALIZATION = np.sqrt(252 * 24 * 60)
+
 
 def safe_float(value):
     """Convert value to float, replacing NaN/Inf with None or 0."""
@@ -24,32 +30,501 @@ def safe_float(value):
         return 0.0
 
 
+class SlidingMedian:
+    """Median of a sliding window of floats in O(log W) per insert or removal.
+
+    The lower half lives in a max-heap (negated) and the upper half in a
+    min-heap. A removal only records the value; it is popped once it
+    reaches the top of its heap, and the live sizes keep the halves
+    balanced meanwhile.
+    """
+
+    def __init__(self, values: List[float] = ()):
+        self.reset(values)
+
+    def reset(self, values: List[float] = ()):
+        ordered = sorted(values)
+        half = (len(ordered) + 1) // 2
+        self.low = [-v for v in reversed(ordered[:half])]   # already a valid heap
+        self.high = ordered[half:]
+        self.low_size = half
+        self.high_size = len(ordered) - half
+        self.removed: Dict[float, int] = {}
+
+    def _prune(self, heap: List[float], sign: float):
+        removed = self.removed
+        while heap:
+            value = sign * heap[0]
+            pending = removed.get(value)
+            if not pending:
+                return
+            if pending == 1:
+                del removed[value]
+            else:
+                removed[value] = pending - 1
+            heapq.heappop(heap)
+
+    def _balance(self):
+        if self.low_size > self.high_size + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+            self.low_size -= 1
+            self.high_size += 1
+            self._prune(self.low, -1.0)
+        elif self.low_size < self.high_size:
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+            self.high_size -= 1
+            self.low_size += 1
+            self._prune(self.high, 1.0)
+
+    def add(self, value: float):
+        if not self.low or value <= -self.low[0]:
+            heapq.heappush(self.low, -value)
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, value)
+            self.high_size += 1
+        self._balance()
+
+    def remove(self, value: float):
+        """Remove one occurrence of a value that is in the window."""
+        self.removed[value] = self.removed.get(value, 0) + 1
+        if value <= -self.low[0]:
+            self.low_size -= 1
+            if value == -self.low[0]:
+                self._prune(self.low, -1.0)
+        else:
+            self.high_size -= 1
+            if value == self.high[0]:
+                self._prune(self.high, 1.0)
+        self._balance()
+
+    def median(self) -> float:
+        if self.low_size > self.high_size:
+            return -self.low[0]
+        return (-self.low[0] + self.high[0]) / 2
+
+
+class RollingStats:
+    """Rolling price and volume statistics for one symbol, updated incrementally on every tick.
+
+    Reads the symbol's window from its WindowStore ring and keeps running
+    sums that are adjusted on every append and eviction: price sums are
+    shifted by a reference price (the oldest price at the last resync) so
+    the sum of squares does not lose precision, monotonic deques track
+    min/max and running return sums give volatility. The sums are rebuilt
+    from the window every window_size evictions to stop rounding drift,
+    which keeps the amortized cost O(1). The median is the one exception:
+    a SlidingMedian over the window, O(log W) per tick.
+    """
+
+    def __init__(self, window_size: int, ring: ColumnarRing):
+        self.window_size = window_size
+        self.ring = ring
+        self.price_column = ring.columns['price']
+        self.volume_column = ring.columns['volume']
+        self.prices_median = SlidingMedian()
+        # (sequence number, value), values increasing / decreasing
+        self.mins: deque = deque()
+        self.maxs: deque = deque()
+        self.nonpositive = 0
+        self.evictions = 0
+        self.last = 0.0
+
+        self.shift = 0.0
+        self.price_sum = 0.0      # sum(p - shift)
+        self.price_sq_sum = 0.0   # sum((p - shift)^2)
+        self.pv_sum = 0.0         # sum((p - shift) * v)
+        self.volume_shift = 0.0
+        self.volume_sum = 0.0     # sum(v - volume_shift)
+        self.volume_sq_sum = 0.0  # sum((v - volume_shift)^2)
+        self.return_sum = 0.0
+        self.return_sq_sum = 0.0
+        self.rebuild()
+
+    def __len__(self) -> int:
+        return min(self.ring.count, self.window_size)
+
+    def push(self, price: float, volume: float):
+        """Fold in the row just appended to the ring (price and volume passed as Python floats)."""
+        ring = self.ring
+        count = ring.count
+        if count == 1:
+            self.shift = price
+            self.volume_shift = volume
+        elif count > self.window_size:
+            self._evict()
+
+        if min(count, self.window_size) >= 2:
+            prev = self.last
+            r = (price - prev) / prev if prev > 0 and price > 0 else 0.0
+            self.return_sum += r
+            self.return_sq_sum += r * r
+
+        d = price - self.shift
+        self.price_sum += d
+        self.price_sq_sum += d * d
+        self.pv_sum += d * volume
+        dv = volume - self.volume_shift
+        self.volume_sum += dv
+        self.volume_sq_sum += dv * dv
+        if not price > 0:
+            self.nonpositive += 1
+
+        seq = ring.total - 1
+        while self.mins and self.mins[-1][1] >= price:
+            self.mins.pop()
+        self.mins.append((seq, price))
+        while self.maxs and self.maxs[-1][1] <= price:
+            self.maxs.pop()
+        self.maxs.append((seq, price))
+        self.prices_median.add(price)
+        self.last = price
+
+        if self.evictions >= self.window_size:
+            self.resync()
+
+    def _evict(self):
+        # The ring holds one row beyond the window: the one leaving it now
+        ring = self.ring
+        i = ring.cursor[0] + ring.capacity - self.window_size - 1
+        oldest_seq = ring.total - self.window_size - 1
+        price = float(self.price_column[i])
+        volume = float(self.volume_column[i])
+        d = price - self.shift
+        self.price_sum -= d
+        self.price_sq_sum -= d * d
+        self.pv_sum -= d * volume
+        dv = volume - self.volume_shift
+        self.volume_sum -= dv
+        self.volume_sq_sum -= dv * dv
+        if self.window_size >= 2:
+            following = float(self.price_column[i + 1])
+            r = (following - price) / price if price > 0 and following > 0 else 0.0
+            self.return_sum -= r
+            self.return_sq_sum -= r * r
+        if not price > 0:
+            self.nonpositive -= 1
+            if not self.nonpositive:
+                # The shift may be a zero price; rebase now that the window is clean
+                self.evictions = self.window_size
+
+        if self.mins[0][0] == oldest_seq:
+            self.mins.popleft()
+        if self.maxs[0][0] == oldest_seq:
+            self.maxs.popleft()
+        self.prices_median.remove(price)
+        self.evictions += 1
+
+    def rebuild(self):
+        """Rebuild all state from the ring's current window."""
+        prices = self.ring.tail('price', self.window_size).tolist()
+        first_seq = self.ring.total - len(prices)
+        self.prices_median.reset(prices)
+        self.mins.clear()
+        self.maxs.clear()
+        for seq, price in enumerate(prices, first_seq):
+            while self.mins and self.mins[-1][1] >= price:
+                self.mins.pop()
+            self.mins.append((seq, price))
+            while self.maxs and self.maxs[-1][1] <= price:
+                self.maxs.pop()
+            self.maxs.append((seq, price))
+        self.nonpositive = sum(1 for p in prices if not p > 0)
+        self.last = prices[-1] if prices else 0.0
+        self.resync()
+
+    def resync(self):
+        """Rebuild the running sums exactly from the current window."""
+        self.evictions = 0
+        if not self.ring.count:
+            return
+        prices = self.ring.tail('price', self.window_size)
+        volumes = self.ring.tail('volume', self.window_size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prev, following = prices[:-1], prices[1:]
+            returns = np.where((prev > 0) & (following > 0), (following - prev) / prev, 0.0)
+        self.shift = float(prices[0])
+        self.volume_shift = float(volumes[0])
+        d = prices - self.shift
+        dv = volumes - self.volume_shift
+        self.price_sum = float(d.sum())
+        self.price_sq_sum = float((d * d).sum())
+        self.pv_sum = float((d * volumes).sum())
+        self.volume_sum = float(dv.sum())
+        self.volume_sq_sum = float((dv * dv).sum())
+        self.return_sum = float(returns.sum())
+        self.return_sq_sum = float((returns * returns).sum())
+
+    def median(self) -> float:
+        return self.prices_median.median()
+
+    def moments(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Just the current price, mean and std (what a z-score needs); None if the window needs the full path."""
+        n = len(self)
+        if n < 2:
+            return {}
+        if self.nonpositive:
+            return None
+        mean_d = self.price_sum / n
+        return {
+            'symbol': symbol,
+            'current_price': safe_float(self.last),
+            'mean': safe_float(self.shift + mean_d),
+            'std': safe_float(math.sqrt(max(self.price_sq_sum / n - mean_d * mean_d, 0.0)))
+        }
+
+    def stats(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Same dict as PriceStatsCalculator's full calculation; None if the window needs the full path."""
+        n = len(self)
+        if n < 2:
+            return {}
+        if self.nonpositive:
+            # Zero/negative prices change the return series; leave them to the full calculation
+            return None
+
+        current_price = self.last
+        first_price = float(self.ring.at('price', n))
+        mean_d = self.price_sum / n
+        mean_val = self.shift + mean_d
+        std_val = math.sqrt(max(self.price_sq_sum / n - mean_d * mean_d, 0.0))
+        min_val = self.mins[0][1]
+        max_val = self.maxs[0][1]
+
+        mean_dv = self.volume_sum / n
+        total_vol = self.volume_shift * n + self.volume_sum
+        volume_std = math.sqrt(max(self.volume_sq_sum / n - mean_dv * mean_dv, 0.0))
+
+        stats = {
+            'symbol': symbol,
+            'current_price': safe_float(current_price),
+            'mean': safe_float(mean_val),
+            'median': safe_float(self.median()),
+            'std': safe_float(std_val),
+            'min': safe_float(min_val),
+            'max': safe_float(max_val),
+            'range': safe_float(max_val - min_val),
+            'count': n,
+            'total_volume': safe_float(total_vol),
+            'avg_volume': safe_float(self.volume_shift + mean_dv),
+            'volume_std': safe_float(volume_std),
+            'price_change': safe_float(current_price - first_price),
+            'price_change_pct': safe_float((current_price - first_price) / first_price * 100)
+        }
+
+        if total_vol > 0:
+            stats['vwap'] = safe_float(self.shift + self.pv_sum / total_vol)
+        else:
+            stats['vwap'] = stats['mean']
+
+        m = n - 1
+        mean_r = self.return_sum / m
+        stats['volatility'] = safe_float(math.sqrt(max(self.return_sq_sum / m - mean_r * mean_r, 0.0)) * ANNUALIZATION)
+
+        return stats
+
+
+class TimeWindow:
+    """The ticks of one symbol within duration_ms of its latest tick timestamp.
+
+    Tracks the sequence number of the oldest row inside the window. Each
+    push moves it past the rows that have aged out, so every row is
+    evicted once: amortized O(1) per tick however many ticks the window
+    holds. Time only advances with the symbol's own ticks (the latest
+    timestamp seen), and the window's sums come from the WindowStore
+    prefix columns.
+
+    A window holds at most max_rows ticks; truncated is set while ticks
+    that are still inside the period have already left the ring.
+    """
+
+    def __init__(self, duration_ms: int, ring: ColumnarRing, max_rows: int):
+        self.duration_ms = duration_ms
+        self.ring = ring
+        self.max_rows = max_rows
+        self.timestamps = ring.columns['timestamp']
+        self.start = ring.total - ring.count
+        self.latest = int(ring.tail('timestamp', ring.count).max()) if ring.count else None
+        self.truncated = False
+        if ring.count:
+            self._advance()
+
+    def __len__(self) -> int:
+        return self.ring.total - self.start
+
+    def push(self, timestamp: int):
+        """Advance after a tick with this timestamp was appended to the ring."""
+        if self.latest is None or timestamp > self.latest:
+            self.latest = timestamp
+        self._advance()
+
+    def _advance(self):
+        ring = self.ring
+        total = ring.total
+        oldest = total - min(ring.count, self.max_rows)
+        start = max(self.start, oldest)
+        # Sequence number s sits at ring index offset + s (the newest, total - 1, at capacity + cursor - 1)
+        offset = ring.cursor[0] + ring.capacity - total
+        timestamps = self.timestamps
+        cutoff = self.latest - self.duration_ms
+        while start < total - 1 and timestamps[offset + start] <= cutoff:
+            start += 1
+        self.start = start
+        self.truncated = start == oldest and oldest > 0 and timestamps[offset + start] > cutoff
+
+
 class PriceStatsCalculator:
-    """Calculates rolling price statistics."""
+    """Calculates rolling price statistics.
+
+    Windows live in a WindowStore, normally the one the AnalyticsEngine
+    shares between all calculators. By default each symbol also gets a
+    RollingStats, so an update costs O(1) (O(log W) for the median)
+    instead of rebuilding arrays over the whole window. Set analytics.incremental_stats to False to recompute
+    from the window with NumPy on every tick.
+
+    Time windows (analytics.time_windows_seconds) cover the ticks of the
+    last N seconds of tick time rather than the last N ticks; each symbol
+    gets a TimeWindow per period. Their sums need the store's prefix
+    columns, so the store should have a horizon as long as the most ticks
+    a period may hold.
+    """
 
-    def __init__(self, window_size: int = 100):
+    def __init__(self, window_size: int = 100, incremental: bool = None, store: WindowStore = None,
+                 time_windows: List[float] = None):
+        config = get_config().analytics
         self.window_size = window_size
-        self.price_windows: Dict[str, deque] = {}
-        self.volume_windows: Dict[str, deque] = {}
-        logger.info(f"Price stats calculator initialized (window: {window_size})")
+        self.incremental = config.incremental_stats if incremental is None else incremental
+        self.store = store or WindowStore(window_size)
+        self.rolling: Dict[str, RollingStats] = {}
+        seconds = config.time_windows_seconds if time_windows is None else time_windows
+        self.time_windows_ms = sorted(set(int(s * 1000) for s in seconds))
+        # symbol -> duration_ms -> TimeWindow
+        self.timed: Dict[str, Dict[int, TimeWindow]] = {}
+        logger.info(f"Price stats calculator initialized (window: {window_size}, incremental: {self.incremental})")
 
     def update(self, tick: Tick) -> Dict[str, Any]:
-        symbol = tick.symbol
-        if symbol not in self.price_windows:
-            self.price_windows[symbol] = deque(maxlen=self.window_size)
-            self.volume_windows[symbol] = deque(maxlen=self.window_size)
+        self.store.append(tick.symbol, tick.price, tick.size, tick.timestamp)
+        return self.on_append(tick)
 
-        self.price_windows[symbol].append(tick.price)
-        self.volume_windows[symbol].append(tick.size)
+    def on_append(self, tick: Tick) -> Dict[str, Any]:
+        """Recalculate after tick has been appended to the store (by update() or the engine)."""
+        self.push(tick)
+        return self.calculate(tick.symbol)
 
-        return self.calculate(symbol)
+    def push(self, tick: Tick):
+        """Fold a tick already appended to the store into the rolling state without building the stats dict."""
+        ring = self.store.ring(tick.symbol)
+        if self.time_windows_ms:
+            windows = self.timed.get(tick.symbol)
+            if windows is None or windows[self.time_windows_ms[0]].ring is not ring:
+                self.timed[tick.symbol] = {d: TimeWindow(d, ring, self.store.max_window) for d in self.time_windows_ms}
+            else:
+                for window in windows.values():
+                    window.push(tick.timestamp)
+        if not self.incremental:
+            return
+        rolling = self.rolling.get(tick.symbol)
+        if rolling is None or rolling.ring is not ring:
+            self.rolling[tick.symbol] = RollingStats(self.window_size, ring)
+        else:
+            rolling.push(tick.price, tick.size)
+
+    def calculate(self, symbol: str, window: int = None) -> Dict[str, Any]:
+        """Stats over the newest window ticks (default: window_size; at most the store's max_window)."""
+        if window is not None and window != self.window_size:
+            return self._calculate_horizon(symbol, window)
+        rolling = self.rolling.get(symbol)
+        if rolling is not None:
+            stats = rolling.stats(symbol)
+            if stats is not None:
+                return stats
+        return self._calculate_full(symbol)
 
-    def calculate(self, symbol: str) -> Dict[str, Any]:
-        if symbol not in self.price_windows or len(self.price_windows[symbol]) < 2:
+    def calculate_moments(self, symbol: str, window: int = None) -> Dict[str, Any]:
+        """The symbol, current_price, mean and std entries of calculate(), computed without the rest."""
+        if window is not None and window != self.window_size:
+            return self._calculate_horizon(symbol, window, moments_only=True)
+        rolling = self.rolling.get(symbol)
+        if rolling is not None:
+            moments = rolling.moments(symbol)
+            if moments is not None:
+                return moments
+        return self._calculate_full(symbol)
+
+    def calculate_period(self, symbol: str, seconds: float, moments_only: bool = False) -> Dict[str, Any]:
+        """Stats (or just the moments) over the symbol's ticks in the last `seconds` of tick time."""
+        window = self.timed.get(symbol, {}).get(int(seconds * 1000))
+        if window is None:
             return {}
+        stats = self._calculate_horizon(symbol, len(window), moments_only)
+        if stats:
+            stats['period_seconds'] = seconds
+            stats['truncated'] = window.truncated
+        return stats
 
-        prices = np.array(self.price_windows[symbol])
-        volumes = np.array(self.volume_windows[symbol])
+    def _calculate_horizon(self, symbol: str, window: int, moments_only: bool = False) -> Dict[str, Any]:
+        """Stats over another horizon from the store's prefix sums (O(1), plus O(n) min/max/median)."""
+        n = self.store.count(symbol, window)
+        if n < 2:
+            return {}
+        sums = self.store.window_sums(symbol, n)
+        if sums is None or sums['nonpositive']:
+            # No prefix columns, or zero/negative prices: recompute from the window
+            return self._calculate_full(symbol, n)
+
+        prices = self.store.prices(symbol, n)
+        current_price = float(prices[-1])
+        ref = self.store.price_refs[symbol]
+        mean_d = sums['price'] / n
+        std_val = math.sqrt(max(sums['price_sq'] / n - mean_d * mean_d, 0.0))
+        if moments_only:
+            return {
+                'symbol': symbol,
+                'current_price': safe_float(current_price),
+                'mean': safe_float(ref + mean_d),
+                'std': safe_float(std_val)
+            }
+
+        first_price = float(prices[0])
+        min_val = float(prices.min())
+        max_val = float(prices.max())
+        total_vol = sums['volume']
+        avg_volume = total_vol / n
+        volume_std = math.sqrt(max(sums['volume_sq'] / n - avg_volume * avg_volume, 0.0))
+
+        stats = {
+            'symbol': symbol,
+            'current_price': safe_float(current_price),
+            'mean': safe_float(ref + mean_d),
+            'median': safe_float(np.median(prices)),
+            'std': safe_float(std_val),
+            'min': safe_float(min_val),
+            'max': safe_float(max_val),
+            'range': safe_float(max_val - min_val),
+            'count': n,
+            'total_volume': safe_float(total_vol),
+            'avg_volume': safe_float(avg_volume),
+            'volume_std': safe_float(volume_std),
+            'price_change': safe_float(current_price - first_price),
+            'price_change_pct': safe_float((current_price - first_price) / first_price * 100)
+        }
+
+        if total_vol > 0:
+            stats['vwap'] = safe_float(ref + sums['pv'] / total_vol)
+        else:
+            stats['vwap'] = stats['mean']
+
+        m = n - 1
+        mean_r = sums['return'] / m
+        stats['volatility'] = safe_float(math.sqrt(max(sums['return_sq'] / m - mean_r * mean_r, 0.0)) * ANNUALIZATION)
+
+        return stats
+
+    def _calculate_full(self, symbol: str, n: int = None) -> Dict[str, Any]:
+        if self.store.count(symbol, n) < 2:
+            return {}
+
+        prices = self.store.prices(symbol, n)
+        volumes = self.store.volumes(symbol, n)
 
         current_price = prices[-1]
         first_price = prices[0]
@@ -57,7 +532,7 @@ class PriceStatsCalculator:
         # Safely compute statistics
         mean_val = np.mean(prices)
         std_val = np.std(prices)
-        
+
         # Avoid division by zero for price change %
         if first_price > 0:
             price_change_pct = (current_price - first_price) / first_price * 100
@@ -111,11 +586,10 @@ class PriceStatsCalculator:
         return self.calculate(symbol)
 
     def clear(self, symbol: str = None):
+        self.store.clear(symbol)
         if symbol:
-            if symbol in self.price_windows:
-                del self.price_windows[symbol]
-            if symbol in self.volume_windows:
-                del self.volume_windows[symbol]
+            self.rolling.pop(symbol, None)
+            self.timed.pop(symbol, None)
         else:
-            self.price_windows.clear()
-            self.volume_windows.clear()
+            self.rolling.clear()
+            self.timed.clear()
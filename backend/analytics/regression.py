@@ -1,10 +1,11 @@
 """Linear regression calculator for QuantStream RTQAE."""
 
-from typing import Dict, Any, Optional
-from collections import deque
+from typing import Dict, Any, List, Optional
 import numpy as np
 from scipy import stats
 
+from analytics.window_store import WindowStore, align_tails
+from analytics.price_panel import PricePanel, cross_sums
 from core.logger import get_logger
 from core.config import get_config
 
@@ -14,32 +15,34 @@ logger = get_logger("analytics.regression")
 class RegressionCalculator:
     """Calculates linear regression for pairs trading."""
 
-    def __init__(self, window_size: int = None):
+    def __init__(self, window_size: int = None, store: WindowStore = None, panel: PricePanel = None):
         config = get_config().analytics
         self.window_size = window_size or config.default_window_size
         self.min_periods = config.regression_min_periods
-        self.price_windows: Dict[str, deque] = {}
+        self.store = store or WindowStore(self.window_size)
+        self.panel = panel
+        self._pairs_memo = None
         logger.info(f"Regression calculator initialized (window: {self.window_size})")
 
-    def update_price(self, symbol: str, price: float):
-        if symbol not in self.price_windows:
-            self.price_windows[symbol] = deque(maxlen=self.window_size)
-        self.price_windows[symbol].append(price)
-
     def calculate_regression(self, symbol_x: str, symbol_y: str) -> Optional[Dict[str, Any]]:
-        if symbol_x not in self.price_windows or symbol_y not in self.price_windows:
+        if self.panel is not None:
+            pair = self.panel.pair_samples(symbol_x, symbol_y)
+        elif symbol_x in self.store and symbol_y in self.store:
+            x, y = align_tails(self.store.prices(symbol_x), self.store.prices(symbol_y))
+            pair = (x, y, len(x))
+        else:
+            pair = None
+        if pair is None:
             return None
 
-        prices_x = list(self.price_windows[symbol_x])
-        prices_y = list(self.price_windows[symbol_y])
-        min_len = min(len(prices_x), len(prices_y))
+        return self._regress(symbol_x, symbol_y, *pair)
 
-        if min_len < self.min_periods:
+    def _regress(self, symbol_x: str, symbol_y: str, x: np.ndarray, y: np.ndarray, samples: int) -> Optional[Dict[str, Any]]:
+        # samples: observations behind the pair (panel rows both really ticked in), see PricePanel.pair_samples()
+        if samples < self.min_periods or not np.ptp(x) > 0:
+            # Too few samples, or a constant x (e.g. a stale symbol's carried-forward price)
             return None
 
-        x = np.array(prices_x[-min_len:])
-        y = np.array(prices_y[-min_len:])
-
         slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
 
         predictions = slope * x + intercept
@@ -56,9 +59,79 @@ class RegressionCalculator:
             'std_err': float(std_err),
             'residual_mean': float(np.mean(residuals)),
             'residual_std': float(np.std(residuals)),
-            'sample_size': min_len
+            'sample_size': samples
         }
 
+    def calculate_all_pairs(self) -> List[Dict[str, Any]]:
+        """Regression of every later symbol on every earlier one (same fields as calculate_regression).
+
+        With a panel, all pairs come from one set of matrix products over
+        the sampled prices (see cross_sums) instead of a fit per pair, and
+        the result is cached until the panel changes.
+        """
+        if self.panel is None:
+            symbols = self.store.symbols()
+            windows = [self.store.snapshot(symbol)['price'] for symbol in symbols]
+            results = []
+            for i, symbol_x in enumerate(symbols):
+                for j in range(i + 1, len(symbols)):
+                    x, y = align_tails(windows[i], windows[j])
+                    result = self._regress(symbol_x, symbols[j], x, y, len(x))
+                    if result:
+                        results.append(result)
+            return results
+
+        symbols, values, ticked, version = self.panel.snapshot_ticked()
+        memo = self._pairs_memo
+        if memo is not None and memo[0] == version:
+            return memo[1]
+
+        last = values[-1] if len(values) else np.full(len(symbols), np.nan)
+        ref = np.where(np.isfinite(last), last, 0.0)
+        count, sum_x, sum_xx, sum_xy = cross_sums(values, ref)
+        # [i, j]: rows where symbol i ticked and j has a price; a pair's
+        # samples are those of its less active side
+        present = np.isfinite(values).astype(np.float64)
+        ticks = ticked.astype(np.float64).T @ present
+        samples = np.minimum(ticks, ticks.T)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # [i, j]: x = symbol i, y = symbol j, over the rows where both are present
+            mean_x = sum_x / count
+            mean_y = mean_x.T
+            var_x = sum_xx / count - mean_x * mean_x
+            var_y = var_x.T
+            cov = sum_xy / count - mean_x * mean_y
+            beta = cov / var_x
+            alpha = (mean_y + ref[None, :]) - beta * (mean_x + ref[:, None])
+            r = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+            df = count - 2
+            std_err = np.sqrt((1 - r * r) * var_y / var_x / df)
+            t = r * np.sqrt(df / ((1.0 - r) * (1.0 + r)))
+            residual_mean = mean_y - beta * mean_x - (alpha - ref[None, :] + beta * ref[:, None])
+            residual_std = np.sqrt(np.maximum(var_y * (1 - r * r), 0.0))
+
+        valid = np.triu((samples >= self.min_periods) & (var_x > 0) & (var_y > 0) & np.isfinite(r), k=1)
+        i, j = np.nonzero(valid)
+        p_values = 2 * stats.t.sf(np.abs(t[i, j]), df[i, j])
+        results = [
+            {
+                'symbol_x': symbols[a],
+                'symbol_y': symbols[b],
+                'beta': float(beta[a, b]),
+                'alpha': float(alpha[a, b]),
+                'r_squared': float(r[a, b] ** 2),
+                'r_value': float(r[a, b]),
+                'p_value': float(p),
+                'std_err': float(std_err[a, b]),
+                'residual_mean': float(residual_mean[a, b]),
+                'residual_std': float(residual_std[a, b]),
+                'sample_size': int(samples[a, b])
+            }
+            for a, b, p in zip(i, j, p_values)
+        ]
+        self._pairs_memo = (version, results)
+        return results
+
     def get_hedge_ratio(self, symbol_x: str, symbol_y: str) -> Optional[float]:
         result = self.calculate_regression(symbol_x, symbol_y)
         if result:
@@ -66,7 +139,4 @@ class RegressionCalculator:
         return None
 
     def clear(self, symbol: str = None):
-        if symbol and symbol in self.price_windows:
-            del self.price_windows[symbol]
-        elif not symbol:
-            self.price_windows.clear()
+        self.store.clear(symbol)
@@ -1,9 +1,10 @@
 """Spread calculator for QuantStream RTQAE."""
 
-from typing import Dict, Any, Optional
-from collections import deque
+from typing import Dict, Any, Optional, Tuple
 import numpy as np
 
+from analytics.window_store import WindowStore, align_tails
+from analytics.price_panel import PricePanel
 from core.logger import get_logger
 from core.config import get_config
 
@@ -13,31 +14,32 @@ logger = get_logger("analytics.spread")
 class SpreadCalculator:
     """Calculates spreads for pairs trading."""
 
-    def __init__(self, window_size: int = None):
+    def __init__(self, window_size: int = None, store: WindowStore = None, panel: PricePanel = None):
         config = get_config().analytics
         self.window_size = window_size or config.default_window_size
-        self.price_windows: Dict[str, deque] = {}
-        self.spread_windows: Dict[str, deque] = {}
+        self.store = store or WindowStore(self.window_size)
+        self.panel = panel
         logger.info(f"Spread calculator initialized (window: {self.window_size})")
 
-    def update_price(self, symbol: str, price: float):
-        if symbol not in self.price_windows:
-            self.price_windows[symbol] = deque(maxlen=self.window_size)
-        self.price_windows[symbol].append(price)
+    def _pair(self, symbol1: str, symbol2: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Paired prices: panel samples where both have a price, else the newest common ticks."""
+        if self.panel is not None:
+            return self.panel.pair(symbol1, symbol2)
+        if symbol1 not in self.store or symbol2 not in self.store:
+            return None
+        return align_tails(self.store.prices(symbol1), self.store.prices(symbol2))
 
     def calculate_spread(self, symbol1: str, symbol2: str, hedge_ratio: float = 1.0) -> Optional[Dict[str, Any]]:
-        if symbol1 not in self.price_windows or symbol2 not in self.price_windows:
+        pair = self._pair(symbol1, symbol2)
+        if pair is None:
             return None
 
-        prices1 = list(self.price_windows[symbol1])
-        prices2 = list(self.price_windows[symbol2])
-        min_len = min(len(prices1), len(prices2))
+        arr1, arr2 = pair
+        min_len = len(arr1)
 
         if min_len < 10:
             return None
 
-        arr1 = np.array(prices1[-min_len:])
-        arr2 = np.array(prices2[-min_len:])
         spread = arr1 - hedge_ratio * arr2
 
         current_spread = spread[-1]
@@ -57,18 +59,16 @@ class SpreadCalculator:
         }
 
     def calculate_normalized_spread(self, symbol1: str, symbol2: str) -> Optional[Dict[str, Any]]:
-        if symbol1 not in self.price_windows or symbol2 not in self.price_windows:
+        pair = self._pair(symbol1, symbol2)
+        if pair is None:
             return None
 
-        prices1 = list(self.price_windows[symbol1])
-        prices2 = list(self.price_windows[symbol2])
-        min_len = min(len(prices1), len(prices2))
+        arr1, arr2 = pair
+        min_len = len(arr1)
 
         if min_len < 10:
             return None
 
-        arr1 = np.array(prices1[-min_len:])
-        arr2 = np.array(prices2[-min_len:])
         ratio = arr1 / arr2
 
         current_ratio = ratio[-1]
@@ -87,8 +87,4 @@ class SpreadCalculator:
         }
 
     def clear(self, symbol: str = None):
-        if symbol and symbol in self.price_windows:
-            del self.price_windows[symbol]
-        elif not symbol:
-            self.price_windows.clear()
-            self.spread_windows.clear()
+        self.store.clear(symbol)
@@ -0,0 +1,228 @@
+"""Shared per-symbol price windows for QuantStream RTQAE."""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from threading import Lock
+import numpy as np
+
+from core.ring import ColumnarRing
+from core.logger import get_logger
+
+logger = get_logger("analytics.window_store")
+
+WINDOW_COLUMNS = (
+    ('price', 'float64'),
+    ('volume', 'float64'),
+    ('timestamp', 'int64'),
+)
+
+# Running totals (prices relative to a per-symbol reference price), kept
+# as one 8-wide column; the sums over any horizon are the difference of
+# two rows
+PREFIX_FIELDS = (
+    'price', 'price_sq', 'pv', 'volume', 'volume_sq', 'return', 'return_sq', 'nonpositive'
+)
+PREFIX_COLUMN = ('prefix', f'({len(PREFIX_FIELDS)},)float64')
+
+def align_tails(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Views of the newest values two windows have in common (paired by tick count)."""
+    n = min(len(x), len(y))
+    return x[len(x) - n:], y[len(y) - n:]
+
+
+class WindowStore:
+    """One rolling window of recent ticks per symbol, shared by all calculators.
+
+    Each symbol's window is a ColumnarRing, so a tick is appended once and
+    every calculator reads the same memory: prices() and friends return
+    zero-copy contiguous views of the newest window_size rows. The ring
+    keeps one row beyond the window; right after an append, evicted() is
+    the row that just left it, which incremental consumers need to
+    subtract.
+
+    Views are only stable while the symbol's writer is held off (the
+    engine's per-symbol lock, which it passes in as writer_lock).
+    snapshot() gives a copy for readers that don't take that lock: it
+    reads lock-free and only takes the writer lock if a fast writer keeps
+    lapping the read.
+
+    Extra horizons (longer or shorter windows read off the same ring)
+    size the ring to the largest one and add the PREFIX_FIELDS running
+    totals to every row, so the sums over the newest n rows, for any n up
+    to max_window, are the difference of two rows. An append costs the
+    same however many horizons there are. Once per lap of the ring the
+    totals are rebuilt from the rows it still holds, relative to the
+    newest price, so they stay of the order of one ring's worth of
+    deviations instead of growing with the session (which would make
+    the variance cancel catastrophically).
+    """
+
+    def __init__(self, window_size: int, horizons: Iterable[int] = (),
+                 writer_lock: Callable[[str], Lock] = None):
+        self.window_size = window_size
+        self.horizons = sorted(set(h for h in horizons if h != window_size))
+        self.max_window = max([window_size] + self.horizons)
+        self.prefix = bool(self.horizons)
+        self.columns = WINDOW_COLUMNS + (PREFIX_COLUMN,) if self.prefix else WINDOW_COLUMNS
+        self.rings: Dict[str, ColumnarRing] = {}
+        # symbol -> reference price of the price totals (set at the last
+        # rebase), and the newest row's totals so an append doesn't read them back
+        self.price_refs: Dict[str, float] = {}
+        self.totals: Dict[str, List[float]] = {}
+        self._last_price: Dict[str, float] = {}
+        self.lock = Lock()
+        # symbol -> the lock its appends are made under (None: the caller
+        # appends and reads from one thread)
+        self.writer_lock = writer_lock
+
+    def ring(self, symbol: str) -> ColumnarRing:
+        ring = self.rings.get(symbol)
+        if ring is None:
+            with self.lock:
+                ring = self.rings.get(symbol)
+                if ring is None:
+                    ring = self.rings[symbol] = ColumnarRing(self.max_window + 1, self.columns)
+        return ring
+
+    def append(self, symbol: str, price: float, volume: float, timestamp: int = 0) -> ColumnarRing:
+        ring = self.ring(symbol)
+        if self.prefix:
+            self._append_prefixed(symbol, ring, price, volume, timestamp)
+        else:
+            ring.append(price=price, volume=volume, timestamp=timestamp)
+        return ring
+
+    def _append_prefixed(self, symbol: str, ring: ColumnarRing, price: float, volume: float, timestamp: int):
+        totals = self.totals.get(symbol) if ring.count else None
+        if totals is None:
+            ref = self.price_refs[symbol] = price
+            totals = self.totals[symbol] = [0.0] * len(PREFIX_FIELDS)
+            r = 0.0
+        else:
+            ref = self.price_refs[symbol]
+            prev = self._last_price[symbol]
+            r = (price - prev) / prev if prev > 0 and price > 0 else 0.0
+        self._last_price[symbol] = price
+        d = price - ref
+        totals[0] += d
+        totals[1] += d * d
+        totals[2] += d * volume
+        totals[3] += volume
+        totals[4] += volume * volume
+        totals[5] += r
+        totals[6] += r * r
+        if not price > 0:
+            totals[7] += 1
+        ring.append(price=price, volume=volume, timestamp=timestamp, prefix=totals)
+        if ring.total % ring.capacity == 0:
+            self._rebase(symbol, ring)
+
+    def _rebase(self, symbol: str, ring: ColumnarRing):
+        """Rebuild the prefix column from the retained rows, relative to the newest price.
+
+        The oldest row's return reaches back before the ring and is never
+        read (window_sums() takes returns from the row after a window's
+        start), so it is left at zero.
+        """
+        count = ring.count
+        prices = ring.tail('price', count)
+        volumes = ring.tail('volume', count)
+        ref = float(prices[-1])
+        returns = np.zeros(count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prev, following = prices[:-1], prices[1:]
+            returns[1:] = np.where((prev > 0) & (following > 0), (following - prev) / prev, 0.0)
+        d = prices - ref
+        fields = np.stack([d, d * d, d * volumes, volumes, volumes * volumes,
+                           returns, returns * returns, (~(prices > 0)).astype(np.float64)], axis=1)
+        prefix = np.cumsum(fields, axis=0)
+
+        positions = (ring.cursor[0] - count + np.arange(count)) % ring.capacity
+        column = ring.columns['prefix']
+        column[positions] = prefix
+        column[positions + ring.capacity] = prefix
+        self.price_refs[symbol] = ref
+        self.totals[symbol] = prefix[-1].tolist()
+
+    def window_sums(self, symbol: str, n: int) -> Optional[Dict[str, float]]:
+        """PREFIX_FIELDS totals over the newest n rows (returns: the n - 1 inside them); None without prefix columns."""
+        ring = self.rings.get(symbol)
+        if ring is None or not self.prefix or not 0 < n <= min(ring.count, self.max_window):
+            return None
+        column = ring.columns['prefix']
+        newest = ring.cursor[0] + ring.capacity - 1
+        # The ring keeps a row beyond max_window, so a window shorter than
+        # the ring has a row before it; otherwise it starts at the first tick
+        sums = column[newest] - column[newest - n] if ring.count > n else column[newest].copy()
+        # The oldest row's return reaches back outside the window
+        sums[5:7] = column[newest, 5:7] - column[newest - n + 1, 5:7]
+        return dict(zip(PREFIX_FIELDS, sums.tolist()))
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.rings
+
+    def count(self, symbol: str, n: int = None) -> int:
+        """Rows in the newest-n window (default: window_size)."""
+        ring = self.rings.get(symbol)
+        return min(ring.count, self.window_size if n is None else min(n, self.max_window)) if ring is not None else 0
+
+    def evicted(self, symbol: str, name: str = 'price') -> Optional[float]:
+        """The value that the last append pushed out of the window, if any."""
+        ring = self.rings.get(symbol)
+        if ring is None or ring.count <= self.window_size:
+            return None
+        return ring.at(name, self.window_size + 1)
+
+    def view(self, symbol: str, name: str, n: int = None) -> np.ndarray:
+        """Zero-copy view of the newest n (default: the whole window, at most max_window) values of a column."""
+        ring = self.rings.get(symbol)
+        if ring is None:
+            return np.empty(0)
+        return ring.tail(name, self.window_size if n is None else min(n, self.max_window))
+
+    def prices(self, symbol: str, n: int = None) -> np.ndarray:
+        return self.view(symbol, 'price', n)
+
+    def volumes(self, symbol: str, n: int = None) -> np.ndarray:
+        return self.view(symbol, 'volume', n)
+
+    def timestamps(self, symbol: str, n: int = None) -> np.ndarray:
+        return self.view(symbol, 'timestamp', n)
+
+    def snapshot(self, symbol: str, names: Iterable[str] = ('price',), n: int = None) -> Dict[str, np.ndarray]:
+        """Consistent copy of the newest n rows of the given columns.
+
+        Must not be called holding the symbol's writer lock.
+        """
+        ring = self.rings.get(symbol)
+        names = tuple(names)
+        if ring is None:
+            return {name: np.empty(0) for name in names}
+        n = self.window_size if n is None else min(n, self.max_window)
+        out = ring.read(names, n)
+        if out is None:
+            # Lapped on every retry; copy with the writer held off
+            if self.writer_lock is None:
+                return {name: ring.tail(name, n).copy() for name in names}
+            with self.writer_lock(symbol):
+                out = {name: ring.tail(name, n).copy() for name in names}
+        return out
+
+    def symbols(self) -> List[str]:
+        return list(self.rings)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ring.nbytes for ring in list(self.rings.values()))
+
+    def clear(self, symbol: str = None):
+        with self.lock:
+            if symbol:
+                self.rings.pop(symbol, None)
+                self.price_refs.pop(symbol, None)
+                self.totals.pop(symbol, None)
+                self._last_price.pop(symbol, None)
+            else:
+                self.rings.clear()
+                self.price_refs.clear()
+                self.totals.clear()
+                self._last_price.clear()
@@ -1,6 +1,8 @@
 """Analytics API routes for QuantStream RTQAE."""
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
 from typing import Optional
 
 from api.server import get_app_state
@@ -11,54 +13,76 @@ logger = get_logger("api.routes_analytics")
 router = APIRouter()
 
 
+class PairRequest(BaseModel):
+    symbol_x: str
+    symbol_y: str
+
+
+class CorrelationPairRequest(BaseModel):
+    symbol1: str
+    symbol2: str
+
+
 @router.get("/stats/{symbol}")
-async def get_stats(symbol: str):
+async def get_stats(symbol: str, window: Optional[int] = None, seconds: Optional[float] = None):
     state = get_app_state()
     analytics_engine = state.get('analytics_engine')
 
     if not analytics_engine:
         raise HTTPException(status_code=500, detail="Analytics engine not initialized")
 
-    stats = analytics_engine.get_stats(symbol.upper())
+    try:
+        stats = analytics_engine.get_stats(symbol.upper(), window, seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not stats:
         raise HTTPException(status_code=404, detail=f"No statistics for {symbol}")
     return stats
 
 
 @router.get("/stats")
-async def get_all_stats():
+async def get_all_stats(window: Optional[int] = None, seconds: Optional[float] = None):
     state = get_app_state()
     analytics_engine = state.get('analytics_engine')
 
     if not analytics_engine:
         raise HTTPException(status_code=500, detail="Analytics engine not initialized")
 
-    return analytics_engine.get_all_stats()
+    try:
+        return analytics_engine.get_all_stats(window, seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/zscore/{symbol}")
-async def get_zscore(symbol: str):
+async def get_zscore(symbol: str, window: Optional[int] = None, seconds: Optional[float] = None):
     state = get_app_state()
     analytics_engine = state.get('analytics_engine')
 
     if not analytics_engine:
         raise HTTPException(status_code=500, detail="Analytics engine not initialized")
 
-    zscore = analytics_engine.get_zscore(symbol.upper())
+    try:
+        zscore = analytics_engine.get_zscore(symbol.upper(), window, seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not zscore:
         raise HTTPException(status_code=404, detail=f"No z-score for {symbol}")
     return zscore
 
 
 @router.get("/zscores")
-async def get_all_zscores():
+async def get_all_zscores(window: Optional[int] = None, seconds: Optional[float] = None):
     state = get_app_state()
     analytics_engine = state.get('analytics_engine')
 
     if not analytics_engine:
         raise HTTPException(status_code=500, detail="Analytics engine not initialized")
 
-    return analytics_engine.get_all_zscores()
+    try:
+        return analytics_engine.get_all_zscores(window, seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/correlation")
@@ -79,17 +103,20 @@ async def get_correlations(symbol1: Optional[str] = None, symbol2: Optional[str]
 
 
 @router.get("/correlation/matrix")
-async def get_correlation_matrix():
+async def get_correlation_matrix(since_version: Optional[int] = None):
     state = get_app_state()
     analytics_engine = state.get('analytics_engine')
 
     if not analytics_engine:
         raise HTTPException(status_code=500, detail="Analytics engine not initialized")
 
-    matrix = analytics_engine.get_correlation_matrix()
-    symbols = analytics_engine.correlation_calc.get_symbols()
+    snapshot = analytics_engine.get_correlation_snapshot()
+    version = snapshot['version']
+    if since_version is not None and version == since_version:
+        return {"version": version, "unchanged": True}
 
-    return {"symbols": symbols, "matrix": matrix.tolist() if matrix is not None else []}
+    matrix = snapshot['matrix']
+    return {"symbols": snapshot['symbols'], "matrix": matrix.tolist() if matrix is not None else [], "version": version}
 
 
 @router.get("/spread")
@@ -106,6 +133,17 @@ async def get_spread(symbol1: str, symbol2: str, hedge_ratio: float = 1.0):
     return spread
 
 
+@router.get("/regression/all")
+async def get_all_regressions():
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    return {"regressions": analytics_engine.get_all_regressions()}
+
+
 @router.get("/regression")
 async def get_regression(symbol_x: str, symbol_y: str):
     state = get_app_state()
@@ -120,6 +158,183 @@ async def get_regression(symbol_x: str, symbol_y: str):
     return regression
 
 
+@router.get("/hedge-ratio/all")
+async def get_all_hedge_ratios():
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    return {"hedge_ratios": analytics_engine.get_all_hedge_ratios()}
+
+
+@router.get("/hedge-ratio")
+async def get_hedge_ratio(symbol_x: str, symbol_y: str):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    hedge_ratio = analytics_engine.get_streaming_hedge_ratio(symbol_x.upper(), symbol_y.upper())
+    if not hedge_ratio:
+        raise HTTPException(status_code=404, detail=f"No hedge ratio for {symbol_x}/{symbol_y} (track the pair with POST first)")
+    return hedge_ratio
+
+
+@router.post("/hedge-ratio")
+async def track_hedge_ratio(request: PairRequest):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    symbol_x, symbol_y = request.symbol_x.upper(), request.symbol_y.upper()
+    try:
+        added = analytics_engine.track_hedge_ratio(symbol_x, symbol_y)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"symbol_x": symbol_x, "symbol_y": symbol_y, "tracked": True, "added": added}
+
+
+@router.delete("/hedge-ratio")
+async def untrack_hedge_ratio(symbol_x: str, symbol_y: str):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    if not analytics_engine.untrack_hedge_ratio(symbol_x.upper(), symbol_y.upper()):
+        raise HTTPException(status_code=404, detail=f"Pair {symbol_x}/{symbol_y} is not tracked")
+    return {"symbol_x": symbol_x.upper(), "symbol_y": symbol_y.upper(), "tracked": False}
+
+
+@router.get("/ewma/stats")
+async def get_all_ewma_stats(half_life: Optional[float] = None):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    try:
+        return analytics_engine.get_all_ewma_stats(half_life)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/ewma/stats/{symbol}")
+async def get_ewma_stats(symbol: str, half_life: Optional[float] = None):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    try:
+        stats = analytics_engine.get_ewma_stats(symbol.upper(), half_life)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not stats:
+        raise HTTPException(status_code=404, detail=f"No EWMA statistics for {symbol}")
+    return stats
+
+
+@router.get("/ewma/zscore/{symbol}")
+async def get_ewma_zscore(symbol: str, half_life: Optional[float] = None):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    try:
+        zscore = analytics_engine.get_ewma_zscore(symbol.upper(), half_life)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not zscore:
+        raise HTTPException(status_code=404, detail=f"No EWMA z-score for {symbol}")
+    return zscore
+
+
+@router.get("/ewma/correlation/all")
+async def get_all_ewma_correlations(half_life: Optional[float] = None):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    try:
+        return {"correlations": analytics_engine.get_all_ewma_correlations(half_life)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/ewma/correlation")
+async def get_ewma_correlation(symbol1: str, symbol2: str, half_life: Optional[float] = None):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    try:
+        correlation = analytics_engine.get_ewma_correlation(symbol1.upper(), symbol2.upper(), half_life)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not correlation:
+        raise HTTPException(status_code=404, detail=f"No EWMA correlation for {symbol1}/{symbol2} (track the pair with POST first)")
+    return correlation
+
+
+@router.post("/ewma/correlation")
+async def track_ewma_correlation(request: CorrelationPairRequest):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    symbol1, symbol2 = request.symbol1.upper(), request.symbol2.upper()
+    try:
+        added = analytics_engine.track_ewma_correlation(symbol1, symbol2)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"symbol1": symbol1, "symbol2": symbol2, "tracked": True, "added": added}
+
+
+@router.delete("/ewma/correlation")
+async def untrack_ewma_correlation(symbol1: str, symbol2: str):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    if not analytics_engine.untrack_ewma_correlation(symbol1.upper(), symbol2.upper()):
+        raise HTTPException(status_code=404, detail=f"Pair {symbol1}/{symbol2} is not tracked")
+    return {"symbol1": symbol1.upper(), "symbol2": symbol2.upper(), "tracked": False}
+
+
+@router.get("/adf/screen")
+async def get_adf_screen(symbols: Optional[str] = None, lag: Optional[int] = None):
+    state = get_app_state()
+    analytics_engine = state.get('analytics_engine')
+
+    if not analytics_engine:
+        raise HTTPException(status_code=500, detail="Analytics engine not initialized")
+
+    symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()] if symbols else None
+    try:
+        return {"results": analytics_engine.get_adf_screen(symbol_list, lag)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/adf/{symbol}")
 async def get_adf_test(symbol: str):
     state = get_app_state()
@@ -131,9 +346,23 @@ async def get_adf_test(symbol: str):
     adf = analytics_engine.get_adf_test(symbol.upper())
     if not adf:
         raise HTTPException(status_code=404, detail=f"No ADF test for {symbol}")
+    if 'adf_statistic' not in adf:
+        # First fit still running in the pool: {'series_name', 'pending': True}
+        return JSONResponse(status_code=202, content=adf)
     return adf
 
 
+@router.get("/pairs/scan")
+async def get_pair_scan(limit: Optional[int] = 50, max_p_value: Optional[float] = None):
+    state = get_app_state()
+    pair_scanner = state.get('pair_scanner')
+
+    if not pair_scanner:
+        raise HTTPException(status_code=500, detail="Pair scanner not initialized (analytics.pair_scanner_enabled)")
+
+    return pair_scanner.get_results(limit=limit, max_p_value=max_p_value)
+
+
 @router.get("/summary")
 async def get_analytics_summary():
     state = get_app_state()
@@ -142,7 +371,11 @@ async def get_analytics_summary():
     if not analytics_engine:
         raise HTTPException(status_code=500, detail="Analytics engine not initialized")
 
-    return analytics_engine.get_summary()
+    summary = analytics_engine.get_summary()
+    conflator = state.get('conflator')
+    if conflator:
+        summary['conflation'] = conflator.get_stats()
+    return summary
 
 
 @router.get("/alerts")
@@ -8,12 +8,22 @@ import io
 
 from api.server import get_app_state
 from core.logger import get_logger
+from core.utils import iso_to_timestamp, with_iso_timestamp
 
 logger = get_logger("api.routes_export")
 
 router = APIRouter()
 
 
+def _parse_time(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(value) if value.isdigit() else iso_to_timestamp(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid timestamp: {value}")
+
+
 @router.get("/ticks")
 async def export_ticks(symbol: Optional[str] = None, start_time: Optional[str] = None, end_time: Optional[str] = None, limit: int = 1000, format: str = "json"):
     state = get_app_state()
@@ -22,7 +32,7 @@ async def export_ticks(symbol: Optional[str] = None, start_time: Optional[str] =
     if not db_client:
         raise HTTPException(status_code=500, detail="Database client not initialized")
 
-    ticks = db_client.query_ticks(symbol, start_time, end_time, limit)
+    ticks = [with_iso_timestamp(t) for t in db_client.query_ticks(symbol, _parse_time(start_time), _parse_time(end_time), limit)]
 
     if format == "csv":
         output = io.StringIO()
@@ -43,7 +53,7 @@ async def export_ohlcv(symbol: str, timeframe: str = "1min", start_time: Optiona
     if not db_client:
         raise HTTPException(status_code=500, detail="Database client not initialized")
 
-    ohlcv = db_client.query_ohlcv(symbol, timeframe, start_time, end_time, limit)
+    ohlcv = [with_iso_timestamp(c) for c in db_client.query_ohlcv(symbol, timeframe, _parse_time(start_time), _parse_time(end_time), limit)]
 
     if format == "csv":
         output = io.StringIO()
@@ -6,6 +6,7 @@ from typing import List, Optional
 
 from api.server import get_app_state
 from core.logger import get_logger
+from core.utils import with_iso_timestamp
 
 logger = get_logger("api.routes_ingestion")
 
@@ -49,11 +50,67 @@ async def stop_ingestion():
     return {"status": "stopped"}
 
 
+class StartReplayRequest(BaseModel):
+    paths: List[str]
+    speed: Optional[float] = None
+
+
+@router.post("/replay/start")
+async def start_replay(request: StartReplayRequest):
+    state = get_app_state()
+    replay_source = state.get('replay_source')
+
+    if not replay_source:
+        raise HTTPException(status_code=500, detail="Replay source not initialized")
+
+    if replay_source.running:
+        return {"status": "already_running", "paths": replay_source.paths}
+
+    replay_source.paths = request.paths
+    if request.speed is not None:
+        replay_source.speed = request.speed
+    try:
+        replay_source.start()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Started replay of: {request.paths}")
+    return {"status": "started", "paths": request.paths, "speed": replay_source.speed}
+
+
+@router.post("/replay/stop")
+async def stop_replay():
+    state = get_app_state()
+    replay_source = state.get('replay_source')
+
+    if not replay_source:
+        raise HTTPException(status_code=500, detail="Replay source not initialized")
+
+    if not replay_source.running:
+        return {"status": "not_running"}
+
+    replay_source.stop()
+    return {"status": "stopped"}
+
+
+@router.get("/replay/status")
+async def get_replay_status():
+    state = get_app_state()
+    replay_source = state.get('replay_source')
+
+    if not replay_source:
+        raise HTTPException(status_code=500, detail="Replay source not initialized")
+
+    return replay_source.get_stats()
+
+
 @router.get("/status")
 async def get_ingestion_status():
     state = get_app_state()
     ws_client = state.get('ws_client')
     buffer = state.get('buffer')
+    handoff_queue = state.get('handoff_queue')
+    shm_ring = state.get('shm_ring')
 
     if not ws_client:
         raise HTTPException(status_code=500, detail="WebSocket client not initialized")
@@ -62,29 +119,39 @@ async def get_ingestion_status():
         "running": ws_client.running,
         "symbols": ws_client.symbols,
         "connected_symbols": ws_client.get_connected_symbols(),
-        "tick_count": ws_client.get_tick_count()
+        "tick_count": ws_client.get_tick_count(),
+        "shards": ws_client.get_shard_status()
     }
 
     if buffer:
         status["buffer_stats"] = buffer.get_stats()
 
+    if handoff_queue:
+        status["queue_stats"] = handoff_queue.get_stats()
+
+    if shm_ring:
+        status["shm_ring"] = shm_ring.get_stats()
+
     return status
 
 
 @router.get("/buffer")
-async def get_buffer_contents(symbol: Optional[str] = None, limit: int = 100):
+async def get_buffer_contents(symbol: Optional[str] = None, limit: int = 100, start: Optional[int] = None, end: Optional[int] = None):
     state = get_app_state()
     buffer = state.get('buffer')
 
     if not buffer:
         raise HTTPException(status_code=500, detail="Buffer not initialized")
 
-    if symbol:
+    if symbol and (start is not None or end is not None):
+        ticks = buffer.get_range(symbol, start, end)[-limit:]
+        return {"symbol": symbol, "count": len(ticks), "ticks": [with_iso_timestamp(t.dict()) for t in ticks]}
+    elif symbol:
         ticks = buffer.get_recent(symbol, limit)
-        return {"symbol": symbol, "count": len(ticks), "ticks": [t.dict() for t in ticks]}
+        return {"symbol": symbol, "count": len(ticks), "ticks": [with_iso_timestamp(t.dict()) for t in ticks]}
     else:
         symbols = buffer.get_all_symbols()
-        return {"symbols": symbols, "data": {s: [t.dict() for t in buffer.get_recent(s, limit)] for s in symbols}}
+        return {"symbols": symbols, "data": {s: [with_iso_timestamp(t.dict()) for t in buffer.get_recent(s, limit)] for s in symbols}}
 
 
 @router.get("/latest_prices")
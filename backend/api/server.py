@@ -13,7 +13,12 @@ logger = get_logger("api.server")
 app_state = {
     'ws_client': None,
     'buffer': None,
+    'handoff_queue': None,
+    'shm_ring': None,
+    'replay_source': None,
     'analytics_engine': None,
+    'conflator': None,
+    'pair_scanner': None,
     'alert_engine': None,
     'db_client': None,
     'resampler': None
@@ -4,6 +4,7 @@ import signal
 import sys
 import uvicorn
 from pathlib import Path
+from functools import partial
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -15,7 +16,12 @@ from storage.resampler import Resampler
 from ingestion.ws_client import BinanceWSClient
 from ingestion.buffer import TickBuffer
 from ingestion.router import DataRouter
+from ingestion.handoff import TickHandoffQueue
+from ingestion.shm_ring import SharedTickRing
+from ingestion.replay import ReplaySource
 from analytics.analytics_engine import AnalyticsEngine
+from analytics.conflation import AnalyticsConflator
+from analytics.pair_scanner import PairScanner
 from alerts.engine import AlertEngine
 from alerts.rules import create_default_rules
 from api.server import create_app, set_app_state
@@ -37,9 +43,14 @@ class QuantStreamApp:
         self.resampler = None
         self.buffer = None
         self.router = None
+        self.handoff_queue = None
+        self.shm_ring = None
         self.analytics_engine = None
+        self.conflator = None
+        self.pair_scanner = None
         self.alert_engine = None
         self.ws_client = None
+        self.replay_source = None
         self.app = None
         
         logger.info("="*60)
@@ -78,15 +89,55 @@ class QuantStreamApp:
             cooldown_seconds=self.config.alerts.cooldown_seconds
         )
         
+        # Conflation so analytics runs at a bounded rate per symbol under load
+        if self.config.analytics.conflation_enabled:
+            logger.info("Initializing analytics conflation...")
+            self.conflator = AnalyticsConflator(self.analytics_engine, on_update=self._evaluate_alerts)
+            self.conflator.start()
+        
+        # Background cointegration scan over every pair of the price panel
+        if self.config.analytics.pair_scanner_enabled:
+            logger.info("Initializing pair scanner...")
+            self.pair_scanner = PairScanner(self.analytics_engine.panel)
+            self.pair_scanner.start()
+        
         # Register handlers with router
-        self.router.register_handler(self._handle_tick)
+        if self.router.batching:
+            self.router.register_batch_handler(self._handle_batch)
+            self.router.start()
+        else:
+            self.router.register_handler(self._handle_tick)
+        
+        # Shared-memory ring so other local processes can follow the stream
+        if self.config.shared_memory.enabled:
+            logger.info("Initializing shared-memory tick ring...")
+            self.shm_ring = SharedTickRing()
+            self.router.register_batch_handler(self.shm_ring.publish_batch)
+        
+        # Handoff queue so the socket reader never waits on tick processing
+        on_tick = self.router.route_tick
+        if self.config.queue.enabled:
+            logger.info("Initializing handoff queue...")
+            self.handoff_queue = TickHandoffQueue(
+                self.router.route_tick,
+                batch_consumer=self.router.route_batch if self.router.batching else None
+            )
+            self.handoff_queue.start()
+            on_tick = self.handoff_queue.put
         
         # WebSocket client (initialized but not started)
         logger.info("Initializing WebSocket client...")
         default_symbols = ['btcusdt', 'ethusdt']  # Default symbols
         self.ws_client = BinanceWSClient(
             symbols=default_symbols,
-            on_tick_callback=self.router.route_tick
+            on_tick_callback=on_tick
+        )
+        
+        # Replay source for recorded NDJSON ticks (started via the API)
+        self.replay_source = ReplaySource(
+            on_tick_callback=on_tick,
+            # A max-speed replay waits for the queue instead of overflowing it
+            on_batch_callback=partial(self.handoff_queue.put_many, block=True) if self.handoff_queue else self.router.route_batch
         )
         
         # Create FastAPI app
@@ -96,8 +147,13 @@ class QuantStreamApp:
         # Set global state for API access
         set_app_state(
             ws_client=self.ws_client,
+            replay_source=self.replay_source,
             buffer=self.buffer,
+            handoff_queue=self.handoff_queue,
+            shm_ring=self.shm_ring,
             analytics_engine=self.analytics_engine,
+            conflator=self.conflator,
+            pair_scanner=self.pair_scanner,
             alert_engine=self.alert_engine,
             db_client=self.db_client,
             resampler=self.resampler
@@ -116,19 +172,12 @@ class QuantStreamApp:
             # Add to buffer
             self.buffer.add(tick)
             
-            # Update analytics
-            self.analytics_engine.update(tick)
-            
-            # Get latest stats and z-score
-            stats = self.analytics_engine.get_stats(tick.symbol)
-            zscore_data = self.analytics_engine.get_zscore(tick.symbol)
-            
-            # Evaluate alerts
-            if stats:
-                self.alert_engine.evaluate_stats(stats)
-            
-            if zscore_data:
-                self.alert_engine.evaluate_zscore(zscore_data)
+            # Update analytics and evaluate alerts
+            if self.conflator:
+                self.conflator.submit(tick)
+            else:
+                self.analytics_engine.update(tick)
+                self._evaluate_alerts([tick.symbol])
             
             # Resample to OHLCV
             candles = self.resampler.add_tick(tick)
@@ -147,6 +196,55 @@ class QuantStreamApp:
         except Exception as e:
             logger.error(f"Error handling tick: {e}")
     
+    def _handle_batch(self, ticks):
+        """
+        Handle a micro-batch of ticks.
+        
+        Buffer and analytics locks are taken once per batch, alerts are
+        evaluated on each touched symbol's latest stats, and candles and
+        ticks are written in one transaction each.
+        
+        Args:
+            ticks: List of tick data
+        """
+        try:
+            self.buffer.add_many(ticks)
+            
+            if self.conflator:
+                self.conflator.submit_batch(ticks)
+            else:
+                self._evaluate_alerts(self.analytics_engine.update_batch(ticks))
+            
+            candles = []
+            for tick in ticks:
+                candles.extend(self.resampler.add_tick(tick))
+            
+            self.db_client.insert_ohlcv_bulk(candles)
+            self.db_client.insert_ticks_bulk(ticks)
+        
+        except Exception as e:
+            logger.error(f"Error handling tick batch: {e}")
+    
+    def _evaluate_alerts(self, symbols):
+        """
+        Evaluate alert rules on the latest stats and z-scores of symbols.
+        
+        Args:
+            symbols: Symbols whose analytics were just updated
+        """
+        for symbol in symbols:
+            # Only read what the symbol's rules need; with lazy analytics
+            # everything else is left uncomputed until someone asks for it
+            metrics = self.alert_engine.get_required_metrics(symbol)
+            if 'stats' in metrics:
+                stats = self.analytics_engine.get_stats(symbol)
+                if stats:
+                    self.alert_engine.evaluate_stats(stats)
+            if 'zscore' in metrics:
+                zscore_data = self.analytics_engine.get_zscore(symbol)
+                if zscore_data:
+                    self.alert_engine.evaluate_zscore(zscore_data)
+    
     def run(self):
         """Run the application."""
         try:
@@ -196,6 +294,29 @@ class QuantStreamApp:
             logger.info("Stopping WebSocket client...")
             self.ws_client.stop()
         
+        if self.replay_source and self.replay_source.running:
+            logger.info("Stopping replay...")
+            self.replay_source.stop()
+        
+        if self.handoff_queue and self.handoff_queue.running:
+            logger.info("Draining handoff queue...")
+            self.handoff_queue.stop()
+        
+        if self.router:
+            self.router.stop()
+        
+        if self.conflator and self.conflator.running:
+            self.conflator.stop()
+        
+        if self.pair_scanner and self.pair_scanner.running:
+            self.pair_scanner.stop()
+        
+        if self.analytics_engine:
+            self.analytics_engine.shutdown()
+        
+        if self.shm_ring:
+            self.shm_ring.close()
+        
         if self.db_client:
             logger.info("Cleaning up old data...")
             self.db_client.delete_old_ticks(self.config.database.tick_retention_days)
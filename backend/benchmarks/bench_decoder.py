@@ -0,0 +1,77 @@
+"""Microbenchmark for trade message decoding in QuantStream RTQAE.
+
+Compares messages/sec of the default pydantic decoding path against the
+fast decoder paths. Run from the backend directory:
+
+    python benchmarks/bench_decoder.py --messages 200000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import get_config
+from ingestion.decoder import decode_trade, parse_trade, JSON_BACKEND
+from ingestion.ws_client import BinanceWSClient
+
+
+def make_messages(count: int, combined: bool = False):
+    symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT']
+    messages = []
+    trade_time = 1700000000000
+    for i in range(count):
+        symbol = random.choice(symbols)
+        trade_time += random.randint(0, 3)
+        payload = {
+            "e": "trade", "E": trade_time + 1, "T": trade_time, "s": symbol,
+            "t": 5000000000 + i, "p": f"{60000 + random.random() * 100:.2f}",
+            "q": f"{random.random():.3f}", "X": "MARKET", "m": random.random() < 0.5
+        }
+        if combined:
+            payload = {"stream": f"{symbol.lower()}@trade", "data": payload}
+        messages.append(json.dumps(payload, separators=(',', ':')))
+    return messages
+
+
+def run(name: str, fn, messages):
+    start = time.perf_counter()
+    for message in messages:
+        fn(message)
+    elapsed = time.perf_counter() - start
+    rate = len(messages) / elapsed
+    print(f"{name:<28} {rate:>12,.0f} msg/s  ({elapsed * 1e9 / len(messages):,.0f} ns/msg)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark trade message decoding")
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--combined", action="store_true", help="Use combined-stream frames")
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, args.combined)
+    config = get_config().binance
+    client = BinanceWSClient(['btcusdt'])
+
+    print(f"Decoding {len(messages):,} messages (JSON backend: {JSON_BACKEND})")
+    config.fast_decode = False
+    baseline = run("pydantic Tick (current)", client._process_message, messages)
+    results = {
+        "decode_trade": run("decode_trade", decode_trade, messages),
+        "parse_trade (regex)": run("parse_trade (regex)", parse_trade, messages),
+    }
+    config.fast_decode = True
+    results["client fast path"] = run("client fast path", client._process_message, messages)
+
+    print()
+    for name, rate in results.items():
+        print(f"{name:<28} {rate / baseline:>6.1f}x vs current")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""Local fake Binance Futures WebSocket server for QuantStream RTQAE.
+
+Speaks the trade and aggTrade wire formats on both endpoints the client uses:
+
+    ws://host:port/ws/btcusdt@trade/ethusdt@trade       raw trade payloads
+    ws://host:port/stream?streams=btcusdt@aggTrade/...  {"stream", "data"} frames
+
+Each connection generates ticks for its subscribed symbols at a fixed
+per-symbol rate, optionally with periodic bursts and forced disconnects.
+Trade ids (aggregate ids for aggTrade) are a single sequence across all
+connections. FakeBinanceProcess runs the server in a child process (so
+it does not compete with the pipeline for the GIL) and shares its
+counters and per-trade send times through shared memory, letting a
+harness measure end-to-end latency and detect missing frames.
+
+Run standalone from the backend directory:
+
+    python benchmarks/fake_binance.py --port 9443 --rate 200
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import socket
+import sys
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import websockets
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.logger import get_logger
+
+logger = get_logger("benchmarks.fake_binance")
+
+SEND_INTERVAL = 0.002
+FIRST_TRADE_ID = 1000000
+
+# Shared state layout: counters followed by a ring of send times (ns) indexed by trade id
+SENT, CONNECTIONS, DISCONNECTS, PAUSED = range(4)
+COUNTER_FIELDS = 4
+SEND_TIMES_CAPACITY = 1 << 22
+
+
+def parse_streams(path: str) -> List[Tuple[str, str]]:
+    """Extract (upper-case symbol, stream type) pairs from a /ws/... or /stream?streams=... request path."""
+    url = urlparse(path)
+    if url.path.rstrip('/') == '/stream':
+        streams = parse_qs(url.query).get('streams', [''])[0].split('/')
+    else:
+        streams = url.path[len('/ws'):].strip('/').split('/')
+    return [(s.partition('@')[0].upper(), s.partition('@')[2] or 'trade') for s in streams if s]
+
+
+def _state_arrays(buf) -> tuple:
+    counters = np.ndarray((COUNTER_FIELDS,), dtype=np.int64, buffer=buf)
+    send_times = np.ndarray((SEND_TIMES_CAPACITY,), dtype=np.int64, buffer=buf, offset=COUNTER_FIELDS * 8)
+    return counters, send_times
+
+
+class FakeBinanceServer:
+    """Configurable trade stream generator behind a real WebSocket server.
+
+    rate is ticks per second per symbol. Every burst_interval seconds each
+    connection sends burst_size extra ticks at once; every
+    disconnect_interval seconds it closes the connection so the client has
+    to reconnect. aggTrade events collapse on average fills_per_agg
+    fills. Counters and send times live in plain arrays unless a shared
+    buffer is passed in.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9443, rate: float = 100.0,
+                 burst_interval: float = 0.0, burst_size: int = 0, disconnect_interval: float = 0.0,
+                 fills_per_agg: int = 4, state_buffer=None):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.burst_interval = burst_interval
+        self.burst_size = burst_size
+        self.disconnect_interval = disconnect_interval
+        self.fills_per_agg = fills_per_agg
+        self._fill_id = 0
+        if state_buffer is None:
+            state_buffer = bytearray((COUNTER_FIELDS + SEND_TIMES_CAPACITY) * 8)
+        self.counters, self.send_times = _state_arrays(state_buffer)
+        self.prices: Dict[str, float] = {}
+
+    async def serve(self, stop: Optional[asyncio.Event] = None):
+        stop = stop or asyncio.Event()
+        self._stop = stop
+        async with websockets.serve(self._handle, self.host, self.port, max_queue=None):
+            logger.info(f"Fake Binance server listening on ws://{self.host}:{self.port}")
+            await stop.wait()
+
+    def _trade(self, symbol: str, stream_type: str, combined: bool) -> str:
+        price = self.prices.get(symbol) or random.uniform(10, 1000)
+        price *= 1 + random.gauss(0, 1e-4)
+        self.prices[symbol] = price
+        now_ms = int(time.time() * 1000)
+        seq = int(self.counters[SENT])
+        if stream_type == 'aggTrade':
+            fills = random.randint(1, 2 * self.fills_per_agg - 1)
+            payload = {
+                "e": "aggTrade", "E": now_ms, "s": symbol, "a": FIRST_TRADE_ID + seq,
+                "p": f"{price:.4f}", "q": f"{random.random() * fills:.3f}",
+                "f": self._fill_id, "l": self._fill_id + fills - 1, "T": now_ms,
+                "m": random.random() < 0.5
+            }
+            self._fill_id += fills
+        else:
+            payload = {
+                "e": "trade", "E": now_ms, "T": now_ms, "s": symbol, "t": FIRST_TRADE_ID + seq,
+                "p": f"{price:.4f}", "q": f"{random.random():.3f}", "X": "MARKET",
+                "m": random.random() < 0.5
+            }
+        if combined:
+            payload = {"stream": f"{symbol.lower()}@{stream_type}", "data": payload}
+        self.send_times[seq % SEND_TIMES_CAPACITY] = time.perf_counter_ns()
+        self.counters[SENT] = seq + 1
+        return json.dumps(payload, separators=(',', ':'))
+
+    async def _handle(self, ws):
+        path = ws.request.path
+        streams = parse_streams(path)
+        combined = urlparse(path).path.rstrip('/') == '/stream'
+        if not streams:
+            await ws.close(1008, "no streams")
+            return
+        self.counters[CONNECTIONS] += 1
+        logger.info(f"Client connected ({len(streams)} streams, combined={combined})")
+
+        total_rate = self.rate * len(streams)
+        opened = last_send = last_burst = time.perf_counter()
+        due = 0.0
+        try:
+            while not self._stop.is_set():
+                await asyncio.sleep(SEND_INTERVAL)
+                now = time.perf_counter()
+                if self.disconnect_interval and now - opened >= self.disconnect_interval:
+                    self.counters[DISCONNECTS] += 1
+                    await ws.close(1001, "forced disconnect")
+                    return
+                due += total_rate * (now - last_send)
+                last_send = now
+                count = int(due)
+                due -= count
+                if self.counters[PAUSED]:
+                    continue
+                if self.burst_interval and now - last_burst >= self.burst_interval:
+                    count += self.burst_size
+                    last_burst = now
+                for _ in range(count):
+                    symbol, stream_type = random.choice(streams)
+                    await ws.send(self._trade(symbol, stream_type, combined))
+        except websockets.ConnectionClosed:
+            pass
+
+
+def _run_server(shm_name: str, stop_event, kwargs: Dict):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    server = None
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(server.serve(stop))
+        while not stop_event.is_set():
+            await asyncio.sleep(0.1)
+        stop.set()
+        await task
+
+    try:
+        server = FakeBinanceServer(state_buffer=shm.buf, **kwargs)
+        asyncio.run(run())
+    finally:
+        # Release the server's views of the buffer before closing it
+        server = None
+        shm.close()
+
+
+class FakeBinanceProcess:
+    """Runs a FakeBinanceServer in a child process with its state in shared memory."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9443, **kwargs):
+        self.host = host
+        self.port = port
+        self._kwargs = dict(host=host, port=port, **kwargs)
+        self._shm = shared_memory.SharedMemory(create=True, size=(COUNTER_FIELDS + SEND_TIMES_CAPACITY) * 8)
+        self.counters, self.send_times = _state_arrays(self._shm.buf)
+        self.counters[:] = 0
+        self._stop_event = multiprocessing.Event()
+        self._process: Optional[multiprocessing.Process] = None
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws"
+
+    @property
+    def combined_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/stream"
+
+    @property
+    def sent(self) -> int:
+        return int(self.counters[SENT])
+
+    @property
+    def connections(self) -> int:
+        return int(self.counters[CONNECTIONS])
+
+    @property
+    def disconnects(self) -> int:
+        return int(self.counters[DISCONNECTS])
+
+    def send_time_ns(self, trade_id: int) -> int:
+        """perf_counter_ns() at which the server sent trade_id (valid for the last SEND_TIMES_CAPACITY trades)."""
+        return int(self.send_times[(trade_id - FIRST_TRADE_ID) % SEND_TIMES_CAPACITY])
+
+    def start(self, timeout: float = 10.0):
+        self._process = multiprocessing.Process(
+            target=_run_server, args=(self._shm.name, self._stop_event, self._kwargs),
+            name="fake-binance", daemon=True
+        )
+        self._process.start()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                with socket.create_connection((self.host, self.port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError(f"Fake Binance server did not start on {self.host}:{self.port}")
+
+    def pause(self, paused: bool = True):
+        """Stop (or resume) generating ticks while keeping connections open."""
+        self.counters[PAUSED] = int(paused)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._process:
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+        del self.counters, self.send_times
+        self._shm.close()
+        self._shm.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Binance trade stream server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--rate", type=float, default=100.0, help="Ticks per second per symbol")
+    parser.add_argument("--burst-interval", type=float, default=0.0, help="Seconds between bursts")
+    parser.add_argument("--burst-size", type=int, default=0, help="Extra ticks per burst")
+    parser.add_argument("--disconnect-interval", type=float, default=0.0, help="Seconds between forced disconnects")
+    parser.add_argument("--fills-per-agg", type=int, default=4, help="Mean fills per aggTrade event")
+    args = parser.parse_args()
+
+    server = FakeBinanceServer(args.host, args.port, args.rate, args.burst_interval, args.burst_size,
+                               args.disconnect_interval, args.fills_per_agg)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
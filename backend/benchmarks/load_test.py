@@ -0,0 +1,170 @@
+"""Offline load test for the QuantStream RTQAE ingestion pipeline.
+
+Starts the fake Binance server in a child process, points BinanceConfig at it and
+runs the full application pipeline (WebSocket client, handoff queue,
+router, buffer, analytics, alerts, resampler, SQLite) against it. Reports
+sustained ingest rate, send-to-handled latency percentiles and frames that
+were sent but never handled. Run from the backend directory:
+
+    python benchmarks/load_test.py --symbols 50 --rate 100 --duration 30
+    python benchmarks/load_test.py --symbols 400 --sharded --batch-size 256 --fast-decode
+
+Latency is measured from the fake server's send to the end of the app's
+tick handler, so it includes loopback transit, decoding, queueing and
+processing.
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import QueueConfig, get_config
+from core.logger import setup_logger
+from benchmarks.fake_binance import FakeBinanceProcess
+import app as app_module
+
+
+class LatencyRecorder:
+    """Batch handler registered after the app's own handler to timestamp handled ticks."""
+
+    def __init__(self, server: FakeBinanceProcess):
+        self.server = server
+        self.latencies_ns = []
+        self.handled = 0
+
+    def __call__(self, ticks):
+        now = time.perf_counter_ns()
+        send_time_ns = self.server.send_time_ns
+        for tick in ticks:
+            if tick.trade_id is not None:
+                self.latencies_ns.append(now - send_time_ns(tick.trade_id))
+        self.handled += len(ticks)
+
+
+def configure(args, server: FakeBinanceProcess, data_dir: str):
+    config = get_config()
+    config.binance.base_stream_url = server.ws_url
+    config.binance.combined_stream_url = server.combined_url
+    config.binance.reconnect_delay = 1
+    config.binance.sharded = args.sharded
+    config.binance.max_streams_per_connection = args.max_streams
+    config.binance.fast_decode = args.fast_decode
+    config.binance.stream_type = args.stream_type
+    config.router.batch_size = args.batch_size
+    config.queue.enabled = not args.no_queue
+    config.queue.max_size = args.queue_size
+    config.queue.overflow_policy = args.queue_policy
+    if args.conflation_hz:
+        config.analytics.conflation_enabled = True
+        config.analytics.conflation_max_hz = args.conflation_hz
+    config.database.db_path = str(Path(data_dir) / "load_test.db")
+
+
+def percentiles_ms(latencies_ns):
+    if not latencies_ns:
+        return {}
+    values = np.asarray(latencies_ns, dtype=np.float64) / 1e6
+    return {
+        'p50': np.percentile(values, 50),
+        'p90': np.percentile(values, 90),
+        'p99': np.percentile(values, 99),
+        'p99.9': np.percentile(values, 99.9),
+        'max': values.max()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingestion load test against a fake Binance server")
+    parser.add_argument("--symbols", type=int, default=10, help="Number of symbols to subscribe")
+    parser.add_argument("--rate", type=float, default=100.0, help="Ticks per second per symbol")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--burst-interval", type=float, default=0.0)
+    parser.add_argument("--burst-size", type=int, default=0)
+    parser.add_argument("--disconnect-interval", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--sharded", action="store_true")
+    parser.add_argument("--max-streams", type=int, default=100, help="Streams per connection when sharded")
+    parser.add_argument("--fast-decode", action="store_true")
+    parser.add_argument("--stream-type", default="trade", choices=["trade", "aggTrade"])
+    parser.add_argument("--batch-size", type=int, default=1, help="Router micro-batch size")
+    parser.add_argument("--no-queue", action="store_true", help="Disable the handoff queue")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--queue-policy", default=QueueConfig.overflow_policy, choices=["block", "drop_oldest", "conflate"],
+                        help="Handoff queue overflow policy (default: the app's); block loses nothing but stalls the socket reader")
+    parser.add_argument("--conflation-hz", type=float, default=0.0, help="Conflate analytics to this rate per symbol")
+    args = parser.parse_args()
+
+    server = FakeBinanceProcess(port=args.port, rate=args.rate, burst_interval=args.burst_interval,
+                               burst_size=args.burst_size, disconnect_interval=args.disconnect_interval)
+    data_dir = tempfile.mkdtemp(prefix="quantstream_load_")
+    configure(args, server, data_dir)
+    setup_logger(level=logging.WARNING, log_to_file=False)
+
+    quant_app = app_module.QuantStreamApp()
+    quant_app.setup()
+    recorder = LatencyRecorder(server)
+    quant_app.router.register_batch_handler(recorder)
+
+    symbols = [f"sym{i:04d}usdt" for i in range(args.symbols)]
+    offered = args.symbols * args.rate
+    print(f"Load test: {args.symbols} symbols x {args.rate:g} ticks/s = {offered:,.0f} ticks/s offered "
+          f"(stream={args.stream_type}, sharded={args.sharded}, batch={args.batch_size}, fast_decode={args.fast_decode}, "
+          f"queue={'off' if args.no_queue else args.queue_policy})")
+
+    server.start()
+    ws_client = quant_app.ws_client
+    ws_client.symbols = symbols
+    ws_client.start()
+
+    time.sleep(args.warmup)
+    handled_start, sent_start, latency_start = recorder.handled, server.sent, len(recorder.latencies_ns)
+    start = time.perf_counter()
+    time.sleep(args.duration)
+    elapsed = time.perf_counter() - start
+    handled_end, sent_end, latency_end = recorder.handled, server.sent, len(recorder.latencies_ns)
+
+    # Stop generating, then give frames already in flight time to be handled
+    server.pause()
+    last_progress, handled = time.time(), recorder.handled
+    while recorder.handled < server.sent and time.time() - last_progress < 2:
+        time.sleep(0.05)
+        quant_app.router.flush()
+        if recorder.handled != handled:
+            last_progress, handled = time.time(), recorder.handled
+    ws_client.stop()
+    sent, connections, disconnects = server.sent, server.connections, server.disconnects
+    server.stop()
+
+    latency = percentiles_ms(recorder.latencies_ns[latency_start:latency_end])
+    received = ws_client.get_tick_count()
+    print()
+    print(f"Sent rate            {(sent_end - sent_start) / elapsed:>12,.0f} ticks/s")
+    print(f"Sustained ingest     {(handled_end - handled_start) / elapsed:>12,.0f} ticks/s")
+    print("Latency (ms)         " + "  ".join(f"{k}={v:.2f}" for k, v in latency.items()))
+    print(f"Frames sent          {sent:>12,}")
+    print(f"Frames received      {received:>12,}")
+    print(f"Ticks handled        {recorder.handled:>12,}")
+    print(f"Dropped frames       {sent - recorder.handled:>12,}  (lost in transit: {sent - received:,})")
+    print(f"Connections          {connections:>12,}  (forced disconnects: {disconnects:,})")
+    if quant_app.handoff_queue:
+        stats = quant_app.handoff_queue.get_stats()
+        print(f"Queue                high watermark={stats['high_watermark']:,}  dropped={stats['dropped']:,}  "
+              f"conflated={stats['conflated']:,}  blocked puts={stats['blocked_puts']:,}")
+    if quant_app.conflator:
+        stats = quant_app.conflator.get_stats()
+        print(f"Analytics conflation updates={stats['analytics_updates']:,}  ratio={stats['conflation_ratio'] or 0:.1f}  "
+              f"avg lag={stats['avg_lag_ms'] or 0:.1f}ms  max lag={stats['max_lag_ms']:.1f}ms")
+
+    quant_app.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Long-run precision check of the prefix-sum stats horizons for QuantStream RTQAE.
+
+Feeds a long BTC-like random walk through a WindowStore with extra
+horizons and time windows, then a quiet tail where the price only
+chatters by a tick, and compares the std of every horizon and time
+window (read off the prefix sums) with np.std over the same window view.
+Run from the backend directory:
+
+    python benchmarks/precision_check.py --ticks 3000000
+
+Exits non-zero if any relative std error exceeds --tolerance.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.logger import setup_logger
+from analytics.window_store import WindowStore
+from analytics.price_stats import PriceStatsCalculator
+from storage.models import Tick
+
+SYMBOL = 'BTCUSDT'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ticks', type=int, default=3_000_000, help='random-walk ticks before the quiet tail')
+    parser.add_argument('--tail', type=int, default=2000, help='quiet ticks at the end')
+    parser.add_argument('--interval-ms', type=int, default=100, help='milliseconds between ticks')
+    parser.add_argument('--tolerance', type=float, default=1e-6, help='largest accepted relative std error')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    setup_logger()
+
+    rng = np.random.default_rng(args.seed)
+    walk = 30000 + np.cumsum(rng.normal(0, 5, args.ticks))
+    level = walk[-1] if args.ticks else 30000.0
+    tail = np.round(level, 1) + rng.choice([-0.1, 0.0, 0.1], args.tail)
+    prices = np.concatenate([walk, tail])
+    volumes = rng.exponential(1, len(prices))
+
+    horizons = [100, 1000, 10000]
+    seconds = [10, 60]
+    store = WindowStore(100, horizons)
+    stats = PriceStatsCalculator(100, store=store, time_windows=seconds)
+
+    for t, (price, volume) in enumerate(zip(prices.tolist(), volumes.tolist())):
+        timestamp = t * args.interval_ms
+        store.append(SYMBOL, price, volume, timestamp)
+        stats.push(Tick(symbol=SYMBOL, timestamp=timestamp, price=price, size=volume))
+
+    worst = 0.0
+    for label, result in ([(f'{n} ticks', stats.calculate(SYMBOL, n)) for n in horizons] +
+                          [(f'{s}s', stats.calculate_period(SYMBOL, s)) for s in seconds]):
+        expected = float(np.std(store.prices(SYMBOL, result['count'])))
+        error = abs(result['std'] - expected) / expected
+        worst = max(worst, error)
+        print(f"{label:>12}: std {result['std']:.6f}  np.std {expected:.6f}  relative error {error:.1e}")
+
+    print(f"worst relative error {worst:.1e} (tolerance {args.tolerance:.0e})")
+    sys.exit(0 if worst <= args.tolerance else 1)
+
+
+if __name__ == "__main__":
+    main()
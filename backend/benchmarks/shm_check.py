@@ -0,0 +1,83 @@
+"""Lagging-reader check of the shared-memory tick ring for QuantStream RTQAE.
+
+A writer thread publishes batches into a small SharedTickRing (every
+tick's trade_id is its sequence number) while a reader polls it slowly
+enough to keep falling more than a ring behind. Every poll must return
+consecutive ticks ending at the reader's cursor, and the ticks it reports
+lost plus the ones it returns must account for every sequence number; a
+row overwritten mid-batch would show up as a trade_id a ring ahead.
+Run from the backend directory:
+
+    python benchmarks/shm_check.py --seconds 5
+
+Exits non-zero on the first inconsistent poll.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from threading import Event, Thread
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.logger import setup_logger
+from ingestion.shm_ring import SharedTickRing, SharedTickReader
+from storage.models import Tick
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--capacity', type=int, default=256, help='ring size in ticks')
+    parser.add_argument('--batch', type=int, default=64, help='ticks per publish_batch()')
+    parser.add_argument('--name', default='quantstream_shm_check')
+    args = parser.parse_args()
+    setup_logger()
+    # Switch threads often so the reader lands in the middle of batches
+    sys.setswitchinterval(1e-5)
+
+    ring = SharedTickRing(args.name, args.capacity)
+    reader = SharedTickReader(args.name)
+    stop = Event()
+
+    def write():
+        seq = 0
+        while not stop.is_set():
+            ring.publish_batch([Tick(symbol='BTCUSDT', timestamp=seq + k, price=1.0, size=1.0, trade_id=seq + k)
+                                for k in range(args.batch)])
+            seq += args.batch
+
+    writer = Thread(target=write, daemon=True)
+    writer.start()
+    polls = returned = lost = errors = 0
+    deadline = time.perf_counter() + args.seconds
+    try:
+        while time.perf_counter() < deadline:
+            start = reader.cursor
+            records, dropped = reader.poll()
+            ids = records['trade_id']
+            polls += 1
+            returned += len(ids)
+            lost += dropped
+            expected = np.arange(reader.cursor - len(ids), reader.cursor)
+            if not np.array_equal(ids, expected) or start + dropped + len(ids) != reader.cursor:
+                errors += 1
+                print(f"poll {polls}: cursor {start} -> {reader.cursor}, lost {dropped}, "
+                      f"got trade_ids {ids[:3].tolist()}..{ids[-3:].tolist()}")
+                break
+            time.sleep(0.0005)
+    finally:
+        stop.set()
+        writer.join()
+        reader.close()
+        ring.close()
+
+    print(f"{polls} polls, {returned} ticks returned, {lost} reported lost, {errors} inconsistent")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,14 @@ from typing import List
 class BinanceConfig:
     """Binance WebSocket configuration."""
     base_stream_url: str = "wss://fstream.binance.com/ws"
+    combined_stream_url: str = "wss://fstream.binance.com/stream"
     reconnect_delay: int = 5
     ping_interval: int = 20
     max_reconnect_attempts: int = 10
+    sharded: bool = False
+    max_streams_per_connection: int = 100
+    fast_decode: bool = False
+    stream_type: str = "trade"  # trade | aggTrade
 
 
 @dataclass
@@ -28,14 +33,75 @@ class BufferConfig:
     cleanup_interval: int = 60
 
 
+@dataclass
+class RouterConfig:
+    """Tick router micro-batching configuration (batch_size 1 disables batching)."""
+    batch_size: int = 1
+    batch_max_delay_us: int = 2000
+
+
+@dataclass
+class QueueConfig:
+    """Handoff queue between WebSocket receive and tick processing."""
+    enabled: bool = True
+    max_size: int = 10000
+    overflow_policy: str = "drop_oldest"  # drop_oldest | conflate | block (stalls the socket reader when full)
+
+
+@dataclass
+class SharedMemoryConfig:
+    """Shared-memory tick ring for out-of-process consumers."""
+    enabled: bool = False
+    name: str = "quantstream_ticks"
+    capacity: int = 1048576
+
+
+@dataclass
+class ReplayConfig:
+    """NDJSON replay source configuration."""
+    speed: float = 1.0  # 1.0 = real time, N = N times faster, 0 = as fast as possible
+    batch_size: int = 500
+
+
 @dataclass
 class AnalyticsConfig:
     """Analytics engine configuration."""
     default_window_size: int = 100
+    window_horizons: List[int] = None  # extra stats horizons in ticks off the same ring, e.g. [1000, 10000]
+    time_windows_seconds: List[float] = None  # stats over the last N seconds of tick time, e.g. [60, 300]
+    time_window_max_ticks: int = 10000  # most ticks a time window holds (sizes the ring)
+    ewma_half_lives: List[float] = None  # EW stats half-lives (ticks; panel rows for pairs)
+    ewma_max_pairs: int = 100  # pairs the EW correlation may track
     zscore_threshold: float = 3.0
     correlation_min_periods: int = 30
     regression_min_periods: int = 30
     adf_max_lag: int = 10
+    adf_batch_lag: int = 1  # fixed lag of the vectorized batch ADF screen
+    adf_workers: int = 2  # ADF fits run in a process pool; 0 = inline
+    adf_refresh_observations: int = 10  # new observations before a cached ADF result is refit
+    pair_scanner_enabled: bool = False  # O(symbols^2) ADF fits per scan; opt in
+    pair_scanner_interval_seconds: float = 60.0
+    pair_scanner_workers: int = 2  # 0 = scan inline
+    pair_scanner_chunk_size: int = 1000  # pairs per pool task
+    panel_interval_ms: int = 1000
+    pair_alignment: str = "clock"  # clock (sampled price panel) | ticks (last N ticks of each symbol)
+    streaming_correlation: bool = True
+    hedge_ratio_method: str = "rls"  # rls (forgetting factor) | kalman (random-walk beta)
+    hedge_forgetting: float = 0.99
+    kalman_delta: float = 1e-5
+    hedge_ratio_max_pairs: int = 100  # pairs the streaming hedge ratios may track
+    incremental_stats: bool = True
+    lazy_evaluation: bool = False
+    conflation_enabled: bool = False
+    conflation_max_hz: float = 20.0
+
+    def __post_init__(self):
+        if self.window_horizons is None:
+            self.window_horizons = []
+        if self.time_windows_seconds is None:
+            self.time_windows_seconds = []
+        if self.ewma_half_lives is None:
+            self.ewma_half_lives = [100, 1000, 10000]
 
 
 @dataclass
@@ -67,6 +133,10 @@ class Config:
     binance: BinanceConfig
     database: DatabaseConfig
     buffer: BufferConfig
+    router: RouterConfig
+    queue: QueueConfig
+    shared_memory: SharedMemoryConfig
+    replay: ReplayConfig
     analytics: AnalyticsConfig
     alerts: AlertConfig
     api: APIConfig
@@ -75,6 +145,10 @@ class Config:
         self.binance = BinanceConfig()
         self.database = DatabaseConfig()
         self.buffer = BufferConfig()
+        self.router = RouterConfig()
+        self.queue = QueueConfig()
+        self.shared_memory = SharedMemoryConfig()
+        self.replay = ReplayConfig()
         self.analytics = AnalyticsConfig()
         self.alerts = AlertConfig()
         self.api = APIConfig()
@@ -0,0 +1,112 @@
+"""Columnar ring buffer for QuantStream RTQAE."""
+
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+
+# (next write position, row count, total appends)
+Cursor = Tuple[int, int, int]
+
+
+class ColumnarRing:
+    """Fixed-capacity ring of typed NumPy columns.
+
+    Every column is allocated at twice the capacity and each append writes
+    the value at position i and its mirror i + capacity. The newest n rows
+    are therefore always one contiguous slice, so tail() returns a zero-copy
+    view without ever re-arranging the data.
+
+    The ring supports a single writer with lock-free readers. The writer
+    publishes an immutable cursor only after the row data is in place.
+    read() copies rows against one cursor and then checks that the writer
+    has not since wrapped around onto them.
+    """
+
+    def __init__(self, capacity: int, columns: Iterable[Tuple[str, str]]):
+        self.capacity = capacity
+        self.columns: Dict[str, np.ndarray] = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in columns}
+        self.cursor: Cursor = (0, 0, 0)
+
+    def __len__(self) -> int:
+        return self.cursor[1]
+
+    @property
+    def count(self) -> int:
+        return self.cursor[1]
+
+    @property
+    def total(self) -> int:
+        """Total appends ever made; lets readers detect that rows were overwritten."""
+        return self.cursor[2]
+
+    def append(self, **values):
+        i, count, total = self.cursor
+        j = i + self.capacity
+        for name, value in values.items():
+            column = self.columns[name]
+            column[i] = value
+            column[j] = value
+        self.cursor = (i + 1 if i + 1 < self.capacity else 0, min(count + 1, self.capacity), total + 1)
+
+    def extend(self, **arrays: np.ndarray):
+        """Append many rows at once; all arrays must have the same length."""
+        n = len(next(iter(arrays.values())))
+        if n == 0:
+            return
+        i, count, total = self.cursor
+        if n > self.capacity:
+            arrays = {name: values[-self.capacity:] for name, values in arrays.items()}
+            total += n - self.capacity
+            n = self.capacity
+        positions = (i + np.arange(n)) % self.capacity
+        for name, values in arrays.items():
+            column = self.columns[name]
+            column[positions] = values
+            column[positions + self.capacity] = values
+        self.cursor = (int((i + n) % self.capacity), min(self.capacity, count + n), total + n)
+
+    def rows(self, name: str, cursor: Cursor = None) -> np.ndarray:
+        """Zero-copy view of every row visible at cursor (oldest first)."""
+        next_pos, count, _ = cursor or self.cursor
+        end = next_pos + self.capacity
+        return self.columns[name][end - count:end]
+
+    def tail(self, name: str, n: int = None) -> np.ndarray:
+        """Zero-copy view of the newest n values (oldest first)."""
+        view = self.rows(name)
+        return view if n is None else view[len(view) - max(0, min(n, len(view))):]
+
+    def is_intact(self, cursor: Cursor, oldest_age: int) -> bool:
+        """True if rows up to oldest_age (1 = newest) at cursor can't have been overwritten since.
+
+        Write m after the cursor lands on the row of age capacity - m. The
+        strict inequality also covers one write in flight that has not yet
+        published its cursor.
+        """
+        return self.cursor[2] - cursor[2] < self.capacity - oldest_age
+
+    def read(self, names: Iterable[str], n: int = None, retries: int = 3) -> Optional[Dict[str, np.ndarray]]:
+        """Lock-free copy of the newest n rows; None if a concurrent writer kept lapping the read."""
+        for _ in range(retries):
+            cursor = self.cursor
+            k = cursor[1] if n is None else max(0, min(n, cursor[1]))
+            out = {}
+            for name in names:
+                view = self.rows(name, cursor)
+                out[name] = view[len(view) - k:].copy()
+            if self.is_intact(cursor, k):
+                return out
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def last(self, name: str):
+        return self.columns[name][self.cursor[0] + self.capacity - 1]
+
+    def at(self, name: str, age: int):
+        """Value of the row at age (1 = newest, count = oldest)."""
+        return self.columns[name][self.cursor[0] + self.capacity - age]
+
+    def clear(self):
+        self.cursor = (0, 0, self.cursor[2])
@@ -28,6 +28,13 @@ def current_timestamp_ms() -> int:
     return int(datetime.now(timezone.utc).timestamp() * 1000)
 
 
+def with_iso_timestamp(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a record with its epoch-millisecond timestamp formatted as ISO 8601."""
+    if isinstance(record.get('timestamp'), int):
+        return {**record, 'timestamp': timestamp_to_iso(record['timestamp'])}
+    return record
+
+
 def validate_symbol(symbol: str) -> bool:
     """Validate cryptocurrency symbol format."""
     if not symbol or not isinstance(symbol, str):
@@ -86,7 +93,10 @@ def ticks_to_dataframe(ticks: List[Dict[str, Any]]) -> pd.DataFrame:
         return pd.DataFrame(columns=['symbol', 'timestamp', 'price', 'size'])
     df = pd.DataFrame(ticks)
     if 'timestamp' in df.columns:
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        if pd.api.types.is_numeric_dtype(df['timestamp']):
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
+        else:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
     return df
 
 
@@ -1,77 +1,173 @@
 """Tick buffer for QuantStream RTQAE."""
 
 from typing import Dict, List, Optional
-from collections import deque
 from threading import Lock
-from datetime import datetime, timedelta
+import numpy as np
 
-from storage.models import Tick
+from storage.models import Tick, TickRecord
 from core.logger import get_logger
 from core.config import get_config
+from core.ring import ColumnarRing
+from core.utils import current_timestamp_ms
 
 logger = get_logger("ingestion.buffer")
 
+TICK_COLUMNS = (
+    ('timestamp', 'int64'),
+    # Running max of timestamp: a non-decreasing key for binary search
+    ('time_index', 'int64'),
+    ('price', 'float64'),
+    ('size', 'float64'),
+    ('trade_id', 'int64'),
+    ('side', 'int8'),
+    ('trade_count', 'int32'),
+)
+
+# Sentinels for optional fields in the integer columns
+NO_TRADE_ID = -1
+SIDE_UNKNOWN = -1
+
 
 class TickBuffer:
-    """Thread-safe circular buffer for tick data."""
+    """Thread-safe columnar ring buffer for tick data.
+
+    Each symbol gets preallocated NumPy columns (timestamp, price, size,
+    trade_id, side, trade_count) instead of a deque of Tick objects. Tick
+    objects are only materialized when a caller asks for them.
+
+    A monotonic time_index column lets time-window lookups binary search
+    the ring instead of scanning it.
+
+    Writers are serialized per symbol (lock striping); self.lock only guards
+    creation of new symbols. Tail reads copy rows lock-free against the ring's
+    published cursor and fall back to the symbol lock only if the writer
+    lapped them.
+    """
 
     def __init__(self, max_ticks_per_symbol: int = None):
         config = get_config().buffer
         self.max_ticks = max_ticks_per_symbol or config.max_ticks_per_symbol
-        self.buffers: Dict[str, deque] = {}
+        self.buffers: Dict[str, ColumnarRing] = {}
+        self.symbol_locks: Dict[str, Lock] = {}
         self.lock = Lock()
         logger.info(f"Tick buffer initialized (max per symbol: {self.max_ticks})")
 
+    def _ring(self, symbol: str) -> ColumnarRing:
+        ring = self.buffers.get(symbol)
+        if ring is None:
+            with self.lock:
+                if symbol not in self.buffers:
+                    self.symbol_locks.setdefault(symbol, Lock())
+                    self.buffers[symbol] = ColumnarRing(self.max_ticks, TICK_COLUMNS)
+                ring = self.buffers[symbol]
+        return ring
+
+    def _append(self, ring: ColumnarRing, tick: Tick):
+        time_index = tick.timestamp
+        if ring.count and ring.last('time_index') > time_index:
+            time_index = int(ring.last('time_index'))
+        ring.append(
+            timestamp=tick.timestamp,
+            time_index=time_index,
+            price=tick.price,
+            size=tick.size,
+            trade_id=NO_TRADE_ID if tick.trade_id is None else tick.trade_id,
+            side=SIDE_UNKNOWN if tick.is_buyer_maker is None else int(tick.is_buyer_maker),
+            trade_count=tick.trade_count
+        )
+
     def add(self, tick: Tick):
-        with self.lock:
-            if tick.symbol not in self.buffers:
-                self.buffers[tick.symbol] = deque(maxlen=self.max_ticks)
-            self.buffers[tick.symbol].append(tick)
+        ring = self._ring(tick.symbol)
+        with self.symbol_locks[tick.symbol]:
+            self._append(ring, tick)
 
-    def get_recent(self, symbol: str, count: int = 100) -> List[Tick]:
-        with self.lock:
-            if symbol not in self.buffers:
-                return []
-            buffer = self.buffers[symbol]
-            return list(buffer)[-count:]
+    def add_many(self, ticks: List[Tick]):
+        by_symbol: Dict[str, List[Tick]] = {}
+        for tick in ticks:
+            by_symbol.setdefault(tick.symbol, []).append(tick)
+        for symbol, symbol_ticks in by_symbol.items():
+            ring = self._ring(symbol)
+            with self.symbol_locks[symbol]:
+                for tick in symbol_ticks:
+                    self._append(ring, tick)
 
-    def get_by_time(self, symbol: str, seconds: int = 60) -> List[Tick]:
-        with self.lock:
-            if symbol not in self.buffers:
-                return []
-            cutoff = datetime.now() - timedelta(seconds=seconds)
-            result = []
-            for tick in self.buffers[symbol]:
-                try:
-                    tick_time = datetime.fromisoformat(tick.timestamp.replace('Z', '+00:00'))
-                    if tick_time.replace(tzinfo=None) >= cutoff:
-                        result.append(tick)
-                except:
-                    continue
-            return result
+    def get_columns(self, symbol: str, count: int = None) -> Dict[str, np.ndarray]:
+        """Newest count rows per column as contiguous arrays (copied, oldest first)."""
+        ring = self.buffers.get(symbol)
+        if ring is None:
+            return self._empty_columns()
+        names = [name for name, _ in TICK_COLUMNS]
+        columns = ring.read(names, count)
+        if columns is None:
+            with self.symbol_locks[symbol]:
+                columns = {name: ring.tail(name, count).copy() for name in names}
+        return columns
+
+    def get_range_columns(self, symbol: str, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Columns for ticks with start <= timestamp <= end (epoch ms, either bound optional)."""
+        ring = self.buffers.get(symbol)
+        if ring is None:
+            return self._empty_columns()
+        with self.symbol_locks[symbol]:
+            index = ring.tail('time_index')
+            lo = 0 if start is None else int(np.searchsorted(index, start, side='left'))
+            hi = len(index) if end is None else int(np.searchsorted(index, end, side='right'))
+            return {name: ring.tail(name)[lo:hi].copy() for name, _ in TICK_COLUMNS}
+
+    @staticmethod
+    def _empty_columns() -> Dict[str, np.ndarray]:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in TICK_COLUMNS}
+
+    def get_recent(self, symbol: str, count: int = 100) -> List[TickRecord]:
+        return self._materialize(symbol, self.get_columns(symbol, count))
+
+    def get_by_time(self, symbol: str, seconds: int = 60) -> List[TickRecord]:
+        return self.get_range(symbol, current_timestamp_ms() - seconds * 1000)
+
+    def get_range(self, symbol: str, start: Optional[int] = None, end: Optional[int] = None) -> List[TickRecord]:
+        return self._materialize(symbol, self.get_range_columns(symbol, start, end))
+
+    @staticmethod
+    def _materialize(symbol: str, columns: Dict[str, np.ndarray]) -> List[TickRecord]:
+        return [
+            TickRecord(
+                symbol,
+                timestamp,
+                price,
+                size,
+                None if trade_id == NO_TRADE_ID else trade_id,
+                None if side == SIDE_UNKNOWN else bool(side),
+                trade_count
+            )
+            for timestamp, price, size, trade_id, side, trade_count in zip(
+                columns['timestamp'].tolist(), columns['price'].tolist(), columns['size'].tolist(),
+                columns['trade_id'].tolist(), columns['side'].tolist(), columns['trade_count'].tolist()
+            )
+        ]
 
     def get_latest_price(self, symbol: str) -> Optional[float]:
-        with self.lock:
-            if symbol not in self.buffers or len(self.buffers[symbol]) == 0:
-                return None
-            return self.buffers[symbol][-1].price
+        ring = self.buffers.get(symbol)
+        if ring is None or len(ring) == 0:
+            return None
+        return float(ring.last('price'))
 
     def get_all_symbols(self) -> List[str]:
-        with self.lock:
-            return list(self.buffers.keys())
+        return list(self.buffers)
 
     def get_stats(self) -> Dict[str, int]:
-        with self.lock:
-            return {
-                'symbols': len(self.buffers),
-                'total_ticks': sum(len(b) for b in self.buffers.values()),
-                'per_symbol': {s: len(b) for s, b in self.buffers.items()}
-            }
+        buffers = dict(self.buffers)
+        return {
+            'symbols': len(buffers),
+            'total_ticks': sum(len(b) for b in buffers.values()),
+            'per_symbol': {s: len(b) for s, b in buffers.items()},
+            'memory_bytes': sum(b.nbytes for b in buffers.values())
+        }
 
     def clear(self, symbol: str = None):
         with self.lock:
             if symbol:
                 if symbol in self.buffers:
-                    self.buffers[symbol].clear()
+                    with self.symbol_locks[symbol]:
+                        self.buffers[symbol].clear()
             else:
                 self.buffers.clear()
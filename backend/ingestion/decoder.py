@@ -0,0 +1,86 @@
+"""Fast trade message decoding for QuantStream RTQAE."""
+
+import json
+import re
+from typing import Callable, Optional, Union
+
+from storage.models import TickRecord
+
+try:
+    import orjson
+    _loads: Callable[[Union[str, bytes]], dict] = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    _loads = json.loads
+    JSON_BACKEND = "json"
+
+
+def loads(message: Union[str, bytes]) -> dict:
+    """Parse a JSON frame with the fastest available backend."""
+    return _loads(message)
+
+
+# Binance trade frames keep a stable field order (e, E, T, s, t, p, q, X, m),
+# so a single regex pass pulls out the six fields we need.
+_TRADE_RE = re.compile(
+    r'"e":"trade".*?"T":(\d+),"s":"([^"]+)","t":(\d+),"p":"([^"]+)","q":"([^"]+)".*?"m":(t|f)'
+)
+
+# aggTrade frames: e, E, s, a, p, q, f, l, T, m
+_AGG_TRADE_RE = re.compile(
+    r'"e":"aggTrade".*?"s":"([^"]+)","a":(\d+),"p":"([^"]+)","q":"([^"]+)","f":(\d+),"l":(\d+),"T":(\d+),"m":(t|f)'
+)
+
+
+def parse_trade(message: Union[str, bytes]) -> Optional[TickRecord]:
+    """Extract the tick fields from a raw trade or aggTrade frame without building a dict.
+
+    Works for both raw (/ws) and combined (/stream) frames. Falls back to a
+    full JSON parse if the frame does not match the expected field order.
+    Returns None for other events.
+    """
+    if isinstance(message, bytes):
+        message = message.decode()
+    match = _TRADE_RE.search(message)
+    if match is not None:
+        timestamp, symbol, trade_id, price, size, maker = match.groups()
+        return TickRecord(symbol, int(timestamp), float(price), float(size), int(trade_id), maker == 't')
+    match = _AGG_TRADE_RE.search(message)
+    if match is not None:
+        symbol, agg_id, price, size, first_id, last_id, timestamp, maker = match.groups()
+        return TickRecord(symbol, int(timestamp), float(price), float(size), int(agg_id), maker == 't',
+                          int(last_id) - int(first_id) + 1)
+    return _from_dict(_loads(message))
+
+
+def _from_dict(data: dict) -> Optional[TickRecord]:
+    if 'data' in data and 'stream' in data:
+        data = data['data']
+    event = data.get('e')
+    if event == 'trade':
+        return TickRecord(
+            symbol=data['s'],
+            timestamp=data['T'],
+            price=float(data['p']),
+            size=float(data['q']),
+            trade_id=data.get('t'),
+            is_buyer_maker=data.get('m', False)
+        )
+    if event == 'aggTrade':
+        return TickRecord(
+            symbol=data['s'],
+            timestamp=data['T'],
+            price=float(data['p']),
+            size=float(data['q']),
+            trade_id=data.get('a'),
+            is_buyer_maker=data.get('m', False),
+            trade_count=data['l'] - data['f'] + 1
+        )
+    return None
+
+
+def decode_trade(message: Union[str, bytes]) -> Optional[TickRecord]:
+    """Decode a trade or aggTrade frame into a TickRecord using the fastest available path."""
+    if JSON_BACKEND == "json":
+        return parse_trade(message)
+    return _from_dict(_loads(message))
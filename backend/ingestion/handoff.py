@@ -0,0 +1,173 @@
+"""Bounded handoff queue between WebSocket receive and tick processing for QuantStream RTQAE."""
+
+from typing import Any, Callable, Dict, List, Optional
+from collections import deque
+from enum import Enum
+from threading import Condition, Thread
+
+from storage.models import Tick
+from core.logger import get_logger
+from core.config import get_config
+
+logger = get_logger("ingestion.handoff")
+
+
+class OverflowPolicy(str, Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    CONFLATE = "conflate"
+
+
+class TickHandoffQueue:
+    """Bounded queue that decouples the socket reader from downstream tick processing.
+
+    The producer (WebSocket thread) calls put(); a dedicated worker thread
+    drains the queue into the consumer. When the queue is full the overflow
+    policy decides what happens:
+
+    - drop_oldest (default): the oldest queued tick is discarded.
+    - conflate: the newest queued tick of the same symbol is overwritten in
+      place; if none is queued, the oldest tick is discarded.
+    - block: put() waits until the worker frees a slot. Nothing is lost, but
+      the socket reader stalls with it: the exchange keeps sending, the
+      kernel buffer fills and the server may drop the connection as a slow
+      consumer. Only for benchmarks that must see every tick.
+
+    put_many(block=True) waits for room whatever the policy, for producers
+    that can be paced (a max-speed replay) rather than lose ticks. A waiting
+    put gives up once the queue is stopped: the tick is counted as dropped
+    and never appended past max_size.
+
+    If a batch_consumer is given, the worker drains up to max_batch ticks per
+    wakeup and hands them over as one list.
+    """
+
+    def __init__(self, consumer: Callable[[Tick], None], max_size: int = None, overflow_policy: str = None,
+                 batch_consumer: Callable[[List[Tick]], None] = None, max_batch: int = None):
+        config = get_config().queue
+        self.consumer = consumer
+        self.batch_consumer = batch_consumer
+        self.max_batch = max_batch or get_config().router.batch_size
+        self.max_size = max_size or config.max_size
+        self.policy = OverflowPolicy(overflow_policy or config.overflow_policy)
+        # Entries are [tick] slots so a conflating put can overwrite in place.
+        self._queue: deque = deque()
+        self._latest_slot: Dict[str, List[Any]] = {}
+        self._cond = Condition()
+        self._thread: Optional[Thread] = None
+        self.running = False
+
+        self._enqueued = 0
+        self._processed = 0
+        self._dropped = 0
+        self._conflated = 0
+        self._blocked = 0
+        self._high_watermark = 0
+        logger.info(f"Handoff queue initialized (max size: {self.max_size}, policy: {self.policy.value})")
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = Thread(target=self._run, name="tick-handoff", daemon=True)
+        self._thread.start()
+        logger.info("Handoff queue worker started")
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        logger.info("Handoff queue worker stopped")
+
+    def put(self, tick: Tick) -> bool:
+        """Enqueue a tick; False if it was dropped because the queue stopped while full."""
+        with self._cond:
+            return self._put(tick)
+
+    def put_many(self, ticks: List[Tick], block: bool = False) -> int:
+        """Enqueue several ticks under one lock acquisition, applying the overflow policy per tick.
+
+        Returns how many were accepted (the rest were dropped because the
+        queue stopped while full).
+        """
+        with self._cond:
+            return sum(self._put(tick, block) for tick in ticks)
+
+    def _put(self, tick: Tick, block: bool = False) -> bool:
+        if len(self._queue) >= self.max_size:
+            if block or self.policy == OverflowPolicy.BLOCK:
+                self._blocked += 1
+                while self.running and len(self._queue) >= self.max_size:
+                    self._cond.wait(timeout=1.0)
+                if len(self._queue) >= self.max_size:
+                    # Stopped while still full: nothing will make room
+                    self._dropped += 1
+                    return False
+            elif self.policy == OverflowPolicy.CONFLATE and tick.symbol in self._latest_slot:
+                self._latest_slot[tick.symbol][0] = tick
+                self._conflated += 1
+                return True
+            else:
+                self._discard_oldest()
+
+        slot = [tick]
+        self._queue.append(slot)
+        if self.policy == OverflowPolicy.CONFLATE:
+            self._latest_slot[tick.symbol] = slot
+        self._enqueued += 1
+        if len(self._queue) > self._high_watermark:
+            self._high_watermark = len(self._queue)
+        self._cond.notify_all()
+        return True
+
+    def _discard_oldest(self):
+        slot = self._queue.popleft()
+        self._release(slot)
+        self._dropped += 1
+
+    def _release(self, slot: List[Any]):
+        if self.policy == OverflowPolicy.CONFLATE and self._latest_slot.get(slot[0].symbol) is slot:
+            del self._latest_slot[slot[0].symbol]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self.running and not self._queue:
+                    self._cond.wait(timeout=1.0)
+                if not self._queue:
+                    return
+                count = min(len(self._queue), self.max_batch) if self.batch_consumer else 1
+                ticks = []
+                for _ in range(count):
+                    slot = self._queue.popleft()
+                    self._release(slot)
+                    ticks.append(slot[0])
+                self._cond.notify_all()
+            try:
+                if self.batch_consumer:
+                    self.batch_consumer(ticks)
+                else:
+                    self.consumer(ticks[0])
+            except Exception as e:
+                logger.error(f"Handoff consumer error: {e}")
+            self._processed += count
+
+    def get_depth(self) -> int:
+        return len(self._queue)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'running': self.running,
+                'policy': self.policy.value,
+                'max_size': self.max_size,
+                'depth': len(self._queue),
+                'high_watermark': self._high_watermark,
+                'enqueued': self._enqueued,
+                'processed': self._processed,
+                'dropped': self._dropped,
+                'conflated': self._conflated,
+                'blocked_puts': self._blocked
+            }
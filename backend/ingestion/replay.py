@@ -0,0 +1,190 @@
+"""NDJSON tick replay source for QuantStream RTQAE."""
+
+import heapq
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from storage.models import Tick, TickRecord
+from core.logger import get_logger
+from core.config import get_config
+from core.utils import iso_to_timestamp
+from ingestion.decoder import loads
+
+logger = get_logger("ingestion.replay")
+
+
+def parse_line(line: str) -> Optional[TickRecord]:
+    """Parse one NDJSON trade line.
+
+    Accepts the browser collector format ({"symbol", "ts" (ISO 8601),
+    "price", "size"}) as well as records with an epoch-ms "timestamp".
+    """
+    data = loads(line)
+    ts = data.get('timestamp')
+    if ts is None:
+        ts = iso_to_timestamp(data['ts'])
+    return TickRecord(
+        symbol=data['symbol'].upper(),
+        timestamp=int(ts),
+        price=float(data['price']),
+        size=float(data['size']),
+        trade_id=data.get('trade_id'),
+        is_buyer_maker=data.get('is_buyer_maker'),
+        trade_count=data.get('trade_count', 1)
+    )
+
+
+class ReplaySource:
+    """Streams recorded NDJSON ticks into the pipeline as if they came from the exchange.
+
+    Multiple files are merged by timestamp (each file is assumed to be in
+    time order, as the collector writes it). speed controls pacing: 1.0 is
+    real time, N replays N times faster and 0 replays as fast as possible.
+    In as-fast-as-possible mode ticks are delivered in lists of batch_size
+    when an on_batch_callback is given.
+
+    Exposes the same start/stop/running interface as BinanceWSClient.
+    """
+
+    def __init__(self, paths: List[str] = None, on_tick_callback: Callable[[Tick], None] = None,
+                 on_batch_callback: Callable[[List[Tick]], None] = None, speed: float = None,
+                 batch_size: int = None):
+        config = get_config().replay
+        self.paths = list(paths or [])
+        self.on_tick_callback = on_tick_callback
+        self.on_batch_callback = on_batch_callback
+        self.speed = config.speed if speed is None else speed
+        self.batch_size = batch_size or config.batch_size
+        self.running = False
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._reset_counters()
+        logger.info(f"Replay source initialized (speed: {self._speed_label()})")
+
+    def _reset_counters(self):
+        self._tick_count = 0
+        self._skipped = 0
+        self._first_ts = None
+        self._last_ts = None
+        self._started_at = None
+        self._finished_at = None
+        self.symbols: List[str] = []
+
+    def _speed_label(self) -> str:
+        return "max" if self.speed <= 0 else f"{self.speed:g}x"
+
+    def start(self):
+        if self.running:
+            logger.warning("Replay already running")
+            return
+        missing = [p for p in self.paths if not Path(p).is_file()]
+        if missing:
+            raise FileNotFoundError(f"Replay files not found: {missing}")
+        self._reset_counters()
+        self._stop_event.clear()
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="tick-replay", daemon=True)
+        self._thread.start()
+        logger.info(f"Replay started: {len(self.paths)} file(s) at {self._speed_label()}")
+
+    def stop(self):
+        self.running = False
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        logger.info("Replay stopped")
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the replay finishes; returns False on timeout."""
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def _read_file(self, path: str) -> Iterator[TickRecord]:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield parse_line(line)
+                except Exception as e:
+                    self._skipped += 1
+                    logger.warning(f"Skipping {path}:{line_no}: {e}")
+
+    def _merged(self) -> Iterator[TickRecord]:
+        return heapq.merge(*(self._read_file(p) for p in self.paths), key=lambda t: t.timestamp)
+
+    def _run(self):
+        self._started_at = time.perf_counter()
+        try:
+            if self.speed <= 0 and self.on_batch_callback:
+                self._run_batched()
+            else:
+                self._run_paced()
+        except Exception as e:
+            logger.error(f"Replay error: {e}")
+        finally:
+            self._finished_at = time.perf_counter()
+            self.running = False
+            logger.info(f"Replay finished: {self._tick_count} ticks, {self._skipped} lines skipped")
+
+    def _run_paced(self):
+        wall_start = time.perf_counter()
+        for tick in self._merged():
+            if not self.running:
+                return
+            if self.speed > 0 and self._first_ts is not None:
+                due = wall_start + (tick.timestamp - self._first_ts) / 1000 / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0 and self._stop_event.wait(delay):
+                    return
+            self._track(tick)
+            if self.on_tick_callback:
+                self.on_tick_callback(tick)
+
+    def _run_batched(self):
+        batch = []
+        for tick in self._merged():
+            if not self.running:
+                return
+            self._track(tick)
+            batch.append(tick)
+            if len(batch) >= self.batch_size:
+                self.on_batch_callback(batch)
+                batch = []
+        if batch:
+            self.on_batch_callback(batch)
+
+    def _track(self, tick: TickRecord):
+        if self._first_ts is None:
+            self._first_ts = tick.timestamp
+        self._last_ts = tick.timestamp
+        self._tick_count += 1
+        if tick.symbol not in self.symbols:
+            self.symbols.append(tick.symbol)
+
+    def get_tick_count(self) -> int:
+        return self._tick_count
+
+    def get_stats(self) -> Dict[str, Any]:
+        elapsed = None
+        if self._started_at is not None:
+            elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+        replayed_ms = (self._last_ts - self._first_ts) if self._first_ts is not None else 0
+        return {
+            'running': self.running,
+            'paths': self.paths,
+            'speed': self._speed_label(),
+            'symbols': list(self.symbols),
+            'tick_count': self._tick_count,
+            'skipped_lines': self._skipped,
+            'first_timestamp': self._first_ts,
+            'last_timestamp': self._last_ts,
+            'replayed_seconds': replayed_ms / 1000,
+            'elapsed_seconds': elapsed,
+            'ticks_per_second': self._tick_count / elapsed if elapsed else None
+        }
@@ -1,52 +1,157 @@
 """Data router for QuantStream RTQAE."""
 
-from typing import List, Callable
-from threading import Lock
+import time
+from typing import List, Callable, Optional, Tuple
+from threading import Lock, Thread, Event
 
 from storage.models import Tick
 from core.logger import get_logger
+from core.config import get_config
 
 logger = get_logger("ingestion.router")
 
+BatchHandler = Callable[[List[Tick]], None]
+
+
+class SingleTickAdapter:
+    """Adapts a single-tick handler to the batch handler interface."""
+
+    def __init__(self, handler: Callable[[Tick], None]):
+        self.handler = handler
+
+    def __call__(self, ticks: List[Tick]):
+        for tick in ticks:
+            try:
+                self.handler(tick)
+            except Exception as e:
+                logger.error(f"Handler error: {e}")
+
 
 class DataRouter:
-    """Routes incoming tick data to registered handlers."""
+    """Routes incoming tick data to registered handlers.
+
+    With batch_size > 1 the router accumulates ticks and dispatches them as a
+    list once batch_size ticks are pending or the oldest pending tick is
+    batch_max_delay_us old, whichever comes first. Single-tick handlers are
+    wrapped in a SingleTickAdapter so both kinds can be registered.
+    """
 
-    def __init__(self):
-        self.handlers: List[Callable[[Tick], None]] = []
+    def __init__(self, batch_size: int = None, batch_max_delay_us: int = None):
+        config = get_config().router
+        self.batch_size = batch_size or config.batch_size
+        self.batch_max_delay_us = batch_max_delay_us or config.batch_max_delay_us
+        # Published as an immutable tuple so routing never takes the lock
+        self.handlers: Tuple[BatchHandler, ...] = ()
         self.lock = Lock()
         self._routed_count = 0
-        logger.info("Data router initialized")
+        self._batch_count = 0
+
+        self._pending: List[Tick] = []
+        self._pending_since = 0.0
+        self._pending_lock = Lock()
+        # Serializes dispatch so batches reach handlers in order
+        self._dispatch_lock = Lock()
+        self._stop_event = Event()
+        self._flusher: Optional[Thread] = None
+        logger.info(f"Data router initialized (batch size: {self.batch_size})")
+
+    @property
+    def batching(self) -> bool:
+        return self.batch_size > 1
+
+    def start(self):
+        """Start the background flusher that enforces the batch delay bound."""
+        if not self.batching or self._flusher:
+            return
+        self._stop_event.clear()
+        self._flusher = Thread(target=self._flush_loop, name="router-flush", daemon=True)
+        self._flusher.start()
+        logger.info(f"Batch routing enabled (max {self.batch_size} ticks / {self.batch_max_delay_us}us)")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._flusher:
+            self._flusher.join(timeout=5)
+            self._flusher = None
+        self.flush()
 
     def register_handler(self, handler: Callable[[Tick], None]):
+        self.register_batch_handler(SingleTickAdapter(handler))
+
+    def register_batch_handler(self, handler: BatchHandler):
         with self.lock:
-            self.handlers.append(handler)
+            self.handlers = self.handlers + (handler,)
             logger.info(f"Handler registered (total: {len(self.handlers)})")
 
-    def unregister_handler(self, handler: Callable[[Tick], None]):
+    def unregister_handler(self, handler: Callable):
         with self.lock:
-            if handler in self.handlers:
-                self.handlers.remove(handler)
+            remaining = tuple(h for h in self.handlers if h is not handler and getattr(h, 'handler', None) is not handler)
+            if len(remaining) != len(self.handlers):
+                self.handlers = remaining
                 logger.info("Handler unregistered")
 
     def route_tick(self, tick: Tick):
-        with self.lock:
-            handlers = self.handlers.copy()
-        for handler in handlers:
+        if not self.batching:
+            self._dispatch([tick])
+            return
+        with self._pending_lock:
+            if not self._pending:
+                self._pending_since = time.perf_counter()
+            self._pending.append(tick)
+            if len(self._pending) < self.batch_size:
+                return
+        self.flush()
+
+    def route_batch(self, ticks: List[Tick]):
+        if not ticks:
+            return
+        with self._dispatch_lock:
+            # Ticks routed one at a time before this batch go out first
+            with self._pending_lock:
+                batch = self._take_pending()
+            batch.extend(ticks)
+            self._dispatch(batch)
+
+    def flush(self):
+        with self._dispatch_lock:
+            with self._pending_lock:
+                batch = self._take_pending()
+            if batch:
+                self._dispatch(batch)
+
+    def _take_pending(self) -> List[Tick]:
+        batch = self._pending
+        self._pending = []
+        return batch
+
+    def _flush_loop(self):
+        delay = self.batch_max_delay_us / 1e6
+        while not self._stop_event.wait(delay):
+            with self._pending_lock:
+                stale = self._pending and time.perf_counter() - self._pending_since >= delay
+            if stale:
+                self.flush()
+
+    def _dispatch(self, ticks: List[Tick]):
+        for handler in self.handlers:
             try:
-                handler(tick)
+                handler(ticks)
             except Exception as e:
                 logger.error(f"Handler error: {e}")
-        self._routed_count += 1
+        self._routed_count += len(ticks)
+        self._batch_count += 1
 
     def get_routed_count(self) -> int:
         return self._routed_count
 
+    def get_batch_count(self) -> int:
+        return self._batch_count
+
     def get_handler_count(self) -> int:
         with self.lock:
             return len(self.handlers)
 
     def clear_handlers(self):
         with self.lock:
-            self.handlers.clear()
+            self.handlers = ()
             logger.info("All handlers cleared")
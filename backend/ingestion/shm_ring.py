@@ -0,0 +1,231 @@
+"""Shared-memory tick ring for out-of-process consumers in QuantStream RTQAE.
+
+The ingestion process publishes every routed tick into a fixed-size ring in
+multiprocessing.shared_memory. Any local process can attach by name and
+follow the live stream without opening its own exchange connection:
+
+    from ingestion.shm_ring import SharedTickReader
+
+    reader = SharedTickReader("quantstream_ticks")
+    while True:
+        records, lost = reader.poll()
+        ...  # records is a structured array with TICK_DTYPE fields
+"""
+
+from typing import Dict, List, Optional, Tuple
+from multiprocessing import shared_memory
+import os
+import numpy as np
+
+from storage.models import Tick, TickRecord
+from core.logger import get_logger
+from core.config import get_config
+
+logger = get_logger("ingestion.shm_ring")
+
+TICK_DTYPE = np.dtype([
+    ('symbol', 'S16'),
+    ('timestamp', '<i8'),
+    ('price', '<f8'),
+    ('size', '<f8'),
+    ('trade_id', '<i8'),
+    ('side', 'i1'),
+    ('trade_count', '<i4'),
+], align=True)
+
+MAGIC = 0x5153544B  # "QSTK"
+# Header: magic, capacity, record size, published sequence (total ticks
+# written), writer pid, and the sequence the writer is writing up to
+HEADER_FIELDS = 6
+HEADER_BYTES = HEADER_FIELDS * 8
+SEQ = 3
+PID = 4
+WRITING = 5
+
+NO_TRADE_ID = -1
+SIDE_UNKNOWN = -1
+
+# Segments created by this process; their tracker registration must be kept
+_created: set = set()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without letting this process's resource tracker unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _created:
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        return shm
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if os.name == 'nt':
+        # os.kill would terminate it; Windows frees a segment with its last handle anyway
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _reclaim(name: str):
+    """Unlink a segment left behind by a tick ring whose writer has died; raise if it is live or not ours."""
+    stale = _attach(name)
+    try:
+        header = np.ndarray((HEADER_FIELDS,), dtype='<i8', buffer=stale.buf) if stale.size >= HEADER_BYTES else None
+        if header is None or header[0] != MAGIC:
+            raise FileExistsError(f"Shared memory segment '{name}' exists and is not a tick ring; "
+                                  f"set shared_memory.name to another name")
+        pid = int(header[PID])
+        del header
+        if _pid_alive(pid):
+            raise FileExistsError(f"Shared tick ring '{name}' is in use by process {pid}; "
+                                  f"stop it or set shared_memory.name to another name")
+        logger.warning(f"Reclaiming shared tick ring '{name}' left by process {pid}")
+    finally:
+        stale.close()
+    stale.unlink()
+
+
+class SharedTickRing:
+    """Single-writer tick ring in shared memory.
+
+    Before writing, the writer announces in the header the sequence it is
+    writing up to (a whole batch at once); records are written next and
+    the published sequence is bumped afterwards. Readers never see a
+    sequence number ahead of its data, and can tell which slots a write in
+    flight may be overwriting. An existing segment of the same name is only reclaimed if it is
+    a tick ring whose writer process (pid in the header) has exited.
+    """
+
+    def __init__(self, name: str = None, capacity: int = None):
+        config = get_config().shared_memory
+        self.name = name or config.name
+        self.capacity = capacity or config.capacity
+        size = HEADER_BYTES + self.capacity * TICK_DTYPE.itemsize
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a previous run that did not shut down cleanly
+            _reclaim(self.name)
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        _created.add(self.name)
+
+        self.header = np.ndarray((HEADER_FIELDS,), dtype='<i8', buffer=self.shm.buf, offset=0)
+        self.records = np.ndarray((self.capacity,), dtype=TICK_DTYPE, buffer=self.shm.buf, offset=HEADER_BYTES)
+        self.header[:] = (MAGIC, self.capacity, TICK_DTYPE.itemsize, 0, os.getpid(), 0)
+        self._seq = 0
+        self._symbols: Dict[str, bytes] = {}
+        logger.info(f"Shared tick ring '{self.name}' created ({self.capacity} records, {size / 1e6:.1f} MB)")
+
+    def _row(self, tick: Tick) -> tuple:
+        symbol = self._symbols.get(tick.symbol)
+        if symbol is None:
+            symbol = self._symbols[tick.symbol] = tick.symbol.encode()
+        return (
+            symbol,
+            tick.timestamp,
+            tick.price,
+            tick.size,
+            NO_TRADE_ID if tick.trade_id is None else tick.trade_id,
+            SIDE_UNKNOWN if tick.is_buyer_maker is None else int(tick.is_buyer_maker),
+            tick.trade_count
+        )
+
+    def publish(self, tick: Tick):
+        self.header[WRITING] = self._seq + 1
+        self.records[self._seq % self.capacity] = self._row(tick)
+        self._seq += 1
+        self.header[SEQ] = self._seq
+
+    def publish_batch(self, ticks: List[Tick]):
+        self.header[WRITING] = self._seq + len(ticks)
+        for tick in ticks:
+            self.records[self._seq % self.capacity] = self._row(tick)
+            self._seq += 1
+        self.header[SEQ] = self._seq
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'name': self.name, 'capacity': self.capacity, 'published': self._seq}
+
+    def close(self):
+        del self.header, self.records
+        self.shm.close()
+        self.shm.unlink()
+        _created.discard(self.name)
+        logger.info(f"Shared tick ring '{self.name}' closed")
+
+
+class SharedTickReader:
+    """Reader side of a SharedTickRing, attachable from any local process.
+
+    Each reader keeps its own cursor. If it falls more than a ring's worth
+    behind, the overwritten ticks are skipped and reported as lost.
+    """
+
+    def __init__(self, name: str = None, from_start: bool = False):
+        self.name = name or get_config().shared_memory.name
+        self.shm = _attach(self.name)
+        self.header = np.ndarray((HEADER_FIELDS,), dtype='<i8', buffer=self.shm.buf, offset=0)
+        if self.header[0] != MAGIC or self.header[2] != TICK_DTYPE.itemsize:
+            raise ValueError(f"Shared memory segment '{self.name}' is not a tick ring")
+        self.capacity = int(self.header[1])
+        self.records = np.ndarray((self.capacity,), dtype=TICK_DTYPE, buffer=self.shm.buf, offset=HEADER_BYTES)
+        seq = int(self.header[SEQ])
+        self.cursor = max(0, seq - self.capacity + 1) if from_start else seq
+        self.lost = 0
+
+    def poll(self, max_items: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """Copy out ticks published since the last poll; returns (records, ticks lost this poll)."""
+        seq = int(self.header[SEQ])
+        lost = 0
+        if seq - self.cursor > self.capacity:
+            lost = seq - self.cursor - self.capacity
+            self.cursor = seq - self.capacity
+        end = seq if max_items is None else min(seq, self.cursor + max_items)
+        if end <= self.cursor:
+            return np.empty(0, dtype=TICK_DTYPE), lost
+
+        start_slot = self.cursor % self.capacity
+        end_slot = end % self.capacity
+        if start_slot < end_slot:
+            out = self.records[start_slot:end_slot].copy()
+        else:
+            out = np.concatenate((self.records[start_slot:], self.records[:end_slot]))
+
+        # Drop rows the writer may have overwritten while we were copying,
+        # up to the end of the batch it is writing.
+        overwritten = int(self.header[WRITING]) - self.capacity - self.cursor
+        if overwritten > 0:
+            out = out[overwritten:]
+            lost += min(overwritten, end - self.cursor)
+        self.cursor = end
+        self.lost += lost
+        return out, lost
+
+    def poll_ticks(self, max_items: Optional[int] = None) -> List[TickRecord]:
+        records, _ = self.poll(max_items)
+        return [
+            TickRecord(
+                symbol.decode(), timestamp, price, size,
+                None if trade_id == NO_TRADE_ID else trade_id,
+                None if side == SIDE_UNKNOWN else bool(side),
+                trade_count
+            )
+            for symbol, timestamp, price, size, trade_id, side, trade_count in records.tolist()
+        ]
+
+    def close(self):
+        del self.header, self.records
+        self.shm.close()
@@ -2,14 +2,16 @@
 
 import asyncio
 import json
+import time
 import threading
-from typing import List, Callable, Optional
+from typing import Any, Dict, List, Callable, Optional
 import websockets
 
 from storage.models import Tick
 from core.logger import get_logger
 from core.config import get_config
-from core.utils import current_timestamp_iso
+from core.utils import current_timestamp_ms
+from ingestion.decoder import decode_trade, JSON_BACKEND
 
 logger = get_logger("ingestion.ws_client")
 
@@ -26,8 +28,10 @@ class BinanceWSClient:
         self._loop = None
         self._ws = None
         self._tick_count = 0
-        self._connected_symbols = []
-        logger.info(f"WebSocket client initialized for symbols: {self.symbols}")
+        self._shards: Dict[int, Dict[str, Any]] = {}
+        logger.info(f"WebSocket client initialized for symbols: {self.symbols} (stream: {self.config.stream_type})")
+        if self.config.fast_decode:
+            logger.info(f"Fast trade decoding enabled (JSON backend: {JSON_BACKEND})")
 
     def start(self):
         if self.running:
@@ -44,6 +48,7 @@ class BinanceWSClient:
             self._loop.call_soon_threadsafe(self._loop.stop)
         if self._thread:
             self._thread.join(timeout=5)
+        self._shards.clear()
         logger.info("WebSocket client stopped")
 
     def _run_async_loop(self):
@@ -57,58 +62,128 @@ class BinanceWSClient:
             self._loop.close()
 
     async def _connect_and_listen(self):
-        streams = "/".join([f"{s}@trade" for s in self.symbols])
-        url = f"{self.config.base_stream_url}/{streams}"
+        if self.config.sharded:
+            shards = self._build_shards()
+            logger.info(f"Sharded ingestion: {len(self.symbols)} symbols across {len(shards)} connections")
+            await asyncio.gather(*(
+                self._listen(shard_id, self._combined_url(symbols), symbols)
+                for shard_id, symbols in enumerate(shards)
+            ))
+        else:
+            streams = "/".join([f"{s}@{self.config.stream_type}" for s in self.symbols])
+            url = f"{self.config.base_stream_url}/{streams}"
+            await self._listen(0, url, self.symbols)
+
+    def _build_shards(self) -> List[List[str]]:
+        cap = max(1, self.config.max_streams_per_connection)
+        shard_count = max(1, -(-len(self.symbols) // cap))
+        return [self.symbols[i::shard_count] for i in range(shard_count) if self.symbols[i::shard_count]]
+
+    def _combined_url(self, symbols: List[str]) -> str:
+        streams = "/".join([f"{s}@{self.config.stream_type}" for s in symbols])
+        return f"{self.config.combined_stream_url}?streams={streams}"
+
+    async def _listen(self, shard_id: int, url: str, symbols: List[str]):
+        shard = {'shard_id': shard_id, 'symbols': symbols, 'connected': False, 'reconnects': 0, 'tick_count': 0}
+        self._shards[shard_id] = shard
         reconnect_attempts = 0
 
         while self.running and reconnect_attempts < self.config.max_reconnect_attempts:
+            failed = False
+            connected_at = None
             try:
-                logger.info(f"Connecting to Binance: {url}")
+                logger.info(f"Connecting shard {shard_id} to Binance ({len(symbols)} streams)")
                 async with websockets.connect(url, ping_interval=self.config.ping_interval) as ws:
                     self._ws = ws
-                    self._connected_symbols = self.symbols.copy()
+                    shard['connected'] = True
+                    connected_at = time.monotonic()
                     reconnect_attempts = 0
-                    logger.info("Connected to Binance WebSocket")
+                    logger.info(f"Shard {shard_id} connected to Binance WebSocket")
 
                     while self.running:
                         try:
                             message = await asyncio.wait_for(ws.recv(), timeout=30)
-                            self._process_message(message)
+                            if self._process_message(message):
+                                shard['tick_count'] += 1
                         except asyncio.TimeoutError:
                             continue
                         except websockets.ConnectionClosed:
-                            logger.warning("WebSocket connection closed")
+                            logger.warning(f"Shard {shard_id} WebSocket connection closed")
                             break
 
             except Exception as e:
-                logger.error(f"WebSocket error: {e}")
+                logger.error(f"Shard {shard_id} WebSocket error: {e}")
                 reconnect_attempts += 1
+                failed = True
+            finally:
+                if shard['connected']:
+                    shard['connected'] = False
+                    shard['reconnects'] += 1
+
+            # A connection that stayed up and then closed cleanly (e.g. Binance's
+            # 24h rotation) reconnects at once; errors and connections dropped
+            # sooner than reconnect_delay back off
+            if failed or connected_at is None or time.monotonic() - connected_at < self.config.reconnect_delay:
                 if self.running:
                     await asyncio.sleep(self.config.reconnect_delay)
 
         if reconnect_attempts >= self.config.max_reconnect_attempts:
-            logger.error("Max reconnection attempts reached")
+            logger.error(f"Shard {shard_id}: max reconnection attempts reached")
 
-    def _process_message(self, message: str):
+    def _process_message(self, message: str) -> bool:
+        if self.config.fast_decode:
+            return self._process_message_fast(message)
         try:
             data = json.loads(message)
-            if 'e' in data and data['e'] == 'trade':
+            # Combined streams wrap the payload as {"stream": ..., "data": {...}}
+            if 'data' in data and 'stream' in data:
+                data = data['data']
+            if 'e' in data and data['e'] in ('trade', 'aggTrade'):
+                aggregated = data['e'] == 'aggTrade'
                 tick = Tick(
                     symbol=data['s'].upper(),
-                    timestamp=current_timestamp_iso(),
+                    timestamp=data.get('T') or current_timestamp_ms(),
                     price=float(data['p']),
                     size=float(data['q']),
-                    trade_id=data.get('t'),
-                    is_buyer_maker=data.get('m', False)
+                    trade_id=data.get('a') if aggregated else data.get('t'),
+                    is_buyer_maker=data.get('m', False),
+                    trade_count=data['l'] - data['f'] + 1 if aggregated else 1
                 )
                 self._tick_count += 1
                 if self.on_tick_callback:
                     self.on_tick_callback(tick)
+                return True
         except Exception as e:
             logger.error(f"Error processing message: {e}")
+        return False
+
+    def _process_message_fast(self, message: str) -> bool:
+        try:
+            tick = decode_trade(message)
+            if tick is None:
+                return False
+            self._tick_count += 1
+            if self.on_tick_callback:
+                self.on_tick_callback(tick)
+            return True
+        except Exception as e:
+            logger.error(f"Error decoding message: {e}")
+        return False
 
     def get_tick_count(self) -> int:
         return self._tick_count
 
     def get_connected_symbols(self) -> List[str]:
-        return self._connected_symbols
+        return [s for shard in list(self._shards.values()) if shard['connected'] for s in shard['symbols']]
+
+    def get_shard_status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'shard_id': shard['shard_id'],
+                'symbol_count': len(shard['symbols']),
+                'connected': shard['connected'],
+                'reconnects': shard['reconnects'],
+                'tick_count': shard['tick_count']
+            }
+            for shard in list(self._shards.values())
+        ]
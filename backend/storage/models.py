@@ -15,19 +15,59 @@ class AlertSeverity(str, Enum):
 
 
 class Tick(BaseModel):
-    """Tick data model."""
+    """Tick data model (timestamp is the exchange trade time in epoch milliseconds).
+
+    From an aggTrade stream, trade_id is the aggregate trade id and
+    trade_count the number of fills it collapses.
+    """
     symbol: str
-    timestamp: str
+    timestamp: int
     price: float
     size: float
     trade_id: Optional[int] = None
     is_buyer_maker: Optional[bool] = None
+    trade_count: int = 1
+
+
+class TickRecord:
+    """Lightweight tick record for the hot ingestion path.
+
+    Mirrors the attributes of Tick but skips pydantic validation.
+    """
+
+    __slots__ = ('symbol', 'timestamp', 'price', 'size', 'trade_id', 'is_buyer_maker', 'trade_count')
+
+    def __init__(self, symbol: str, timestamp: int, price: float, size: float,
+                 trade_id: Optional[int] = None, is_buyer_maker: Optional[bool] = None, trade_count: int = 1):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.price = price
+        self.size = size
+        self.trade_id = trade_id
+        self.is_buyer_maker = is_buyer_maker
+        self.trade_count = trade_count
+
+    def dict(self) -> Dict[str, Any]:
+        return {
+            'symbol': self.symbol,
+            'timestamp': self.timestamp,
+            'price': self.price,
+            'size': self.size,
+            'trade_id': self.trade_id,
+            'is_buyer_maker': self.is_buyer_maker,
+            'trade_count': self.trade_count
+        }
+
+    model_dump = dict
+
+    def to_tick(self) -> Tick:
+        return Tick(**self.dict())
 
 
 class OHLCV(BaseModel):
-    """OHLCV candlestick data model."""
+    """OHLCV candlestick data model (timestamp is the candle open in epoch milliseconds)."""
     symbol: str
-    timestamp: str
+    timestamp: int
     timeframe: str
     open: float
     high: float
@@ -61,11 +101,12 @@ SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS ticks (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     symbol TEXT NOT NULL,
-    timestamp TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
     price REAL NOT NULL,
     size REAL NOT NULL,
     trade_id INTEGER,
     is_buyer_maker INTEGER,
+    trade_count INTEGER DEFAULT 1,
     created_at TEXT DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -75,7 +116,7 @@ CREATE INDEX IF NOT EXISTS idx_ticks_timestamp ON ticks(timestamp);
 CREATE TABLE IF NOT EXISTS ohlcv (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     symbol TEXT NOT NULL,
-    timestamp TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
     timeframe TEXT NOT NULL,
     open REAL NOT NULL,
     high REAL NOT NULL,
@@ -1,11 +1,11 @@
 """Tick to OHLCV resampler for QuantStream RTQAE."""
 
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
 from collections import defaultdict
 
 from storage.models import Tick, OHLCV
 from core.logger import get_logger
+from core.utils import current_timestamp_ms
 
 logger = get_logger("storage.resampler")
 
@@ -13,7 +13,7 @@ logger = get_logger("storage.resampler")
 class CandleBuilder:
     """Builds a single OHLCV candle from ticks."""
 
-    def __init__(self, symbol: str, timeframe: str, start_time: datetime):
+    def __init__(self, symbol: str, timeframe: str, start_time: int):
         self.symbol = symbol
         self.timeframe = timeframe
         self.start_time = start_time
@@ -33,16 +33,14 @@ class CandleBuilder:
         self.low = min(self.low, price) if self.low else price
         self.close = price
         self.volume += size
-        self.trade_count += 1
+        self.trade_count += tick.trade_count
 
     def to_ohlcv(self) -> Optional[OHLCV]:
         if self.open is None:
             return None
-        # Use ISO format without the extra 'Z' since we have timezone info
-        timestamp_str = self.start_time.strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
         return OHLCV(
             symbol=self.symbol,
-            timestamp=timestamp_str,
+            timestamp=self.start_time,
             timeframe=self.timeframe,
             open=self.open,
             high=self.high,
@@ -75,10 +73,7 @@ class Resampler:
 
     def add_tick(self, tick: Tick) -> List[OHLCV]:
         completed_candles = []
-        try:
-            tick_time = datetime.fromisoformat(tick.timestamp.replace('Z', '+00:00'))
-        except:
-            tick_time = datetime.now()
+        tick_time = tick.timestamp or current_timestamp_ms()
 
         for timeframe in self.timeframes:
             candle_start = self._get_candle_start(tick_time, timeframe)
@@ -98,11 +93,9 @@ class Resampler:
 
         return completed_candles
 
-    def _get_candle_start(self, tick_time: datetime, timeframe: str) -> datetime:
-        seconds = self.TIMEFRAME_SECONDS.get(timeframe, 60)
-        timestamp = tick_time.timestamp()
-        candle_timestamp = (timestamp // seconds) * seconds
-        return datetime.fromtimestamp(candle_timestamp, tz=tick_time.tzinfo)
+    def _get_candle_start(self, tick_time: int, timeframe: str) -> int:
+        period_ms = self.TIMEFRAME_SECONDS.get(timeframe, 60) * 1000
+        return tick_time - tick_time % period_ms
 
     def get_current_candle(self, symbol: str, timeframe: str) -> Optional[OHLCV]:
         key = f"{symbol}_{timeframe}"
@@ -4,10 +4,10 @@ import sqlite3
 import json
 from typing import List, Dict, Any, Optional
 from pathlib import Path
-from datetime import datetime, timedelta
 
 from storage.models import Tick, OHLCV, AnalyticMetric, Alert, SCHEMA_SQL
 from core.logger import get_logger
+from core.utils import current_timestamp_ms
 
 logger = get_logger("storage.sqlite")
 
@@ -29,18 +29,53 @@ class SQLiteClient:
     def _init_database(self):
         conn = self._get_connection()
         try:
+            self._migrate_text_timestamps(conn)
             conn.executescript(SCHEMA_SQL)
+            self._add_tick_trade_count(conn)
+            self._copy_legacy_rows(conn)
             conn.commit()
             logger.info("Database schema initialized")
         finally:
             conn.close()
 
+    def _migrate_text_timestamps(self, conn: sqlite3.Connection):
+        """Move tables created with ISO string timestamps aside before recreating them."""
+        for table in ('ticks', 'ohlcv'):
+            columns = {row['name']: row['type'] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if columns.get('timestamp') == 'TEXT':
+                logger.info(f"Migrating {table}.timestamp from ISO text to epoch milliseconds")
+                conn.execute(f"DROP INDEX IF EXISTS idx_{table}_symbol")
+                conn.execute(f"DROP INDEX IF EXISTS idx_{table}_timestamp")
+                conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+
+    def _add_tick_trade_count(self, conn: sqlite3.Connection):
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(ticks)")}
+        if 'trade_count' not in columns:
+            logger.info("Adding ticks.trade_count column")
+            conn.execute("ALTER TABLE ticks ADD COLUMN trade_count INTEGER DEFAULT 1")
+
+    def _copy_legacy_rows(self, conn: sqlite3.Connection):
+        to_ms = "CAST(ROUND((julianday(timestamp) - 2440587.5) * 86400000) AS INTEGER)"
+        legacy = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%_legacy'")}
+        if 'ticks_legacy' in legacy:
+            conn.execute(
+                f"INSERT INTO ticks (symbol, timestamp, price, size, trade_id, is_buyer_maker, created_at) "
+                f"SELECT symbol, {to_ms}, price, size, trade_id, is_buyer_maker, created_at FROM ticks_legacy"
+            )
+            conn.execute("DROP TABLE ticks_legacy")
+        if 'ohlcv_legacy' in legacy:
+            conn.execute(
+                f"INSERT OR REPLACE INTO ohlcv (symbol, timestamp, timeframe, open, high, low, close, volume, trade_count, created_at) "
+                f"SELECT symbol, {to_ms}, timeframe, open, high, low, close, volume, trade_count, created_at FROM ohlcv_legacy"
+            )
+            conn.execute("DROP TABLE ohlcv_legacy")
+
     def insert_tick(self, tick: Tick):
         conn = self._get_connection()
         try:
             conn.execute(
-                "INSERT INTO ticks (symbol, timestamp, price, size, trade_id, is_buyer_maker) VALUES (?, ?, ?, ?, ?, ?)",
-                (tick.symbol, tick.timestamp, tick.price, tick.size, tick.trade_id, tick.is_buyer_maker)
+                "INSERT INTO ticks (symbol, timestamp, price, size, trade_id, is_buyer_maker, trade_count) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tick.symbol, tick.timestamp, tick.price, tick.size, tick.trade_id, tick.is_buyer_maker, tick.trade_count)
             )
             conn.commit()
         finally:
@@ -52,8 +87,8 @@ class SQLiteClient:
         conn = self._get_connection()
         try:
             conn.executemany(
-                "INSERT INTO ticks (symbol, timestamp, price, size, trade_id, is_buyer_maker) VALUES (?, ?, ?, ?, ?, ?)",
-                [(t.symbol, t.timestamp, t.price, t.size, t.trade_id, t.is_buyer_maker) for t in ticks]
+                "INSERT INTO ticks (symbol, timestamp, price, size, trade_id, is_buyer_maker, trade_count) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(t.symbol, t.timestamp, t.price, t.size, t.trade_id, t.is_buyer_maker, t.trade_count) for t in ticks]
             )
             conn.commit()
         finally:
@@ -70,6 +105,19 @@ class SQLiteClient:
         finally:
             conn.close()
 
+    def insert_ohlcv_bulk(self, candles: List[OHLCV]):
+        if not candles:
+            return
+        conn = self._get_connection()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO ohlcv (symbol, timestamp, timeframe, open, high, low, close, volume, trade_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(c.symbol, c.timestamp, c.timeframe, c.open, c.high, c.low, c.close, c.volume, c.trade_count) for c in candles]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
     def insert_alert(self, alert: Alert):
         conn = self._get_connection()
         try:
@@ -81,7 +129,7 @@ class SQLiteClient:
         finally:
             conn.close()
 
-    def query_ticks(self, symbol: str = None, start_time: str = None, end_time: str = None, limit: int = 1000) -> List[Dict]:
+    def query_ticks(self, symbol: str = None, start_time: int = None, end_time: int = None, limit: int = 1000) -> List[Dict]:
         conn = self._get_connection()
         try:
             query = "SELECT * FROM ticks WHERE 1=1"
@@ -89,10 +137,10 @@ class SQLiteClient:
             if symbol:
                 query += " AND symbol = ?"
                 params.append(symbol)
-            if start_time:
+            if start_time is not None:
                 query += " AND timestamp >= ?"
                 params.append(start_time)
-            if end_time:
+            if end_time is not None:
                 query += " AND timestamp <= ?"
                 params.append(end_time)
             query += " ORDER BY timestamp DESC LIMIT ?"
@@ -102,15 +150,15 @@ class SQLiteClient:
         finally:
             conn.close()
 
-    def query_ohlcv(self, symbol: str, timeframe: str = "1min", start_time: str = None, end_time: str = None, limit: int = 500) -> List[Dict]:
+    def query_ohlcv(self, symbol: str, timeframe: str = "1min", start_time: int = None, end_time: int = None, limit: int = 500) -> List[Dict]:
         conn = self._get_connection()
         try:
             query = "SELECT * FROM ohlcv WHERE symbol = ? AND timeframe = ?"
             params = [symbol, timeframe]
-            if start_time:
+            if start_time is not None:
                 query += " AND timestamp >= ?"
                 params.append(start_time)
-            if end_time:
+            if end_time is not None:
                 query += " AND timestamp <= ?"
                 params.append(end_time)
             query += " ORDER BY timestamp DESC LIMIT ?"
@@ -157,7 +205,7 @@ class SQLiteClient:
             conn.close()
 
     def delete_old_ticks(self, days: int = 7):
-        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        cutoff = current_timestamp_ms() - days * 86400 * 1000
         conn = self._get_connection()
         try:
             conn.execute("DELETE FROM ticks WHERE timestamp < ?", (cutoff,))